@@ -13,8 +13,10 @@ from apps.athletes.models import AthleteProfile
 from apps.coaches.models import CoachProfile
 from apps.events.models import Event
 from apps.attendance.models import AttendanceRecord
-from apps.audit.models import AuditLog
 from apps.audit.models.audit_log import ACTION_CHOICES
+from apps.audit.services import partitions
+from apps.admin_rb.services import log_reader
+from apps.notifications.services import outbox
 
 def check_admin_permission(user):
     """Проверка прав администратора"""
@@ -142,43 +144,62 @@ def assign_role(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_system_logs(request):
-    """Получить логи системы"""
+    """Получить логи системы
+
+    type — audit, django или оба (по умолчанию). Аудит фильтруется параметрами
+    from, to (дата или дата-время), action, user_id, limit (по умолчанию 100,
+    не больше 500). Лог Django читается с конца файла: level (минимальный
+    уровень), search (подстрока), lines (по умолчанию 100, не больше 1000),
+    cursor (django_logs_next_cursor предыдущего ответа — более ранние записи).
+    """
     if not check_admin_permission(request.user):
         return Response({"error": "Доступ запрещён"}, status=status.HTTP_403_FORBIDDEN)
     
-    # Получаем логи из файла и из БД
     from django.conf import settings
-    import os
     
+    log_type = request.query_params.get('type')
     logs_data = {
         'audit_logs': [],
-        'django_logs': []
+        'django_logs': [],
+        'django_logs_next_cursor': None
     }
     
-    # Аудит логи из БД
-    audit_logs = AuditLog.objects.select_related('user').order_by('-created_at')[:100]
-    for log in audit_logs:
-        action_display = dict(ACTION_CHOICES).get(log.action, log.action)
-        logs_data['audit_logs'].append({
-            'id': log.id,
-            'user': log.user.email if log.user else 'Система',
-            'action': action_display,
-            'action_code': log.action,
-            'timestamp': log.created_at,
-            'ip_address': log.ip_address,
-            'details': log.details
-        })
-    
-    # Django логи из файла
-    log_file_path = os.path.join(settings.BASE_DIR, 'logs', 'django.log')
-    if os.path.exists(log_file_path):
+    # Аудит логи из БД: читаются только месяцы, попадающие в диапазон
+    if log_type in (None, '', 'audit'):
         try:
-            with open(log_file_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-                # Последние 100 строк
-                logs_data['django_logs'] = [line.strip() for line in lines[-100:] if line.strip()]
-        except Exception as e:
-            logs_data['django_logs'] = [f'Ошибка чтения логов: {str(e)}']
+            start, end, conditions, limit = partitions.filters_from_params(request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        audit_logs = partitions.query_range(start, end, conditions, limit)
+        for log in audit_logs:
+            action_display = dict(ACTION_CHOICES).get(log.action, log.action)
+            logs_data['audit_logs'].append({
+                'id': log.id,
+                'user': log.user.email if log.user else 'Система',
+                'action': action_display,
+                'action_code': log.action,
+                'timestamp': log.created_at,
+                'ip_address': log.ip_address,
+                'details': log.details
+            })
+    
+    # Django логи из файла: чтение с конца блоками, без загрузки файла целиком
+    if log_type in (None, '', 'django'):
+        try:
+            lines = min(max(int(request.query_params.get('lines', 100)), 1), 1000)
+            result = log_reader.tail(
+                str(settings.DJANGO_LOG_FILE),
+                limit=lines,
+                level=request.query_params.get('level') or None,
+                contains=request.query_params.get('search') or None,
+                cursor=request.query_params.get('cursor') or None
+            )
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except OSError as e:
+            result = {'lines': [f'Ошибка чтения логов: {str(e)}'], 'next_cursor': None}
+        logs_data['django_logs'] = result['lines']
+        logs_data['django_logs_next_cursor'] = result['next_cursor']
     
     return Response(logs_data)
 
@@ -314,15 +335,12 @@ def create_notification(request):
     notification_type = data.get('notification_type', 'mass_notification')
     
     # Определяем получателей
-    recipients = CustomUser.objects.filter(is_active=True)
-    
     if data.get('target_all'):
         # Все пользователи
-        pass
+        audience = {'all': True}
     elif data.get('target_roles'):
         # Фильтр по ролям
-        roles = data['target_roles']
-        recipients = recipients.filter(roles__role__in=roles, roles__is_active=True).distinct()
+        audience = {'roles': list(data['target_roles'])}
     elif data.get('target_event_id'):
         # Участники мероприятия
         event_id = data['target_event_id']
@@ -331,38 +349,32 @@ def create_notification(request):
         except Event.DoesNotExist:
             return Response({"error": "Мероприятие не найдено"}, status=status.HTTP_404_NOT_FOUND)
         
-        # Получаем всех зарегистрированных участников
-        registrations = EventRegistration.objects.filter(event=event, status='registered').select_related('athlete__user', 'coach__user')
+        # Пользователи всех зарегистрированных участников — одним запросом
         user_ids = set()
-        for reg in registrations:
-            if reg.athlete and reg.athlete.user:
-                user_ids.add(reg.athlete.user.id)
-            elif reg.coach and reg.coach.user:
-                user_ids.add(reg.coach.user.id)
-        recipients = recipients.filter(id__in=user_ids)
+        for athlete_user_id, coach_user_id in EventRegistration.objects.filter(
+            event=event, status='registered'
+        ).values_list('athlete__user_id', 'coach__user_id'):
+            if athlete_user_id:
+                user_ids.add(athlete_user_id)
+            elif coach_user_id:
+                user_ids.add(coach_user_id)
+        audience = {'user_ids': sorted(user_ids)}
     else:
         return Response({"error": "Необходимо указать получателей"}, status=status.HTTP_400_BAD_REQUEST)
     
-    # Создаём уведомления
-    notifications = []
-    for user in recipients:
-        notifications.append(
-            Notification(
-                recipient=user,
-                sender=request.user,
-                notification_type=notification_type,
-                title=title,
-                body=body,
-                is_read=False
-            )
-        )
-    
-    # Массовое создание
-    Notification.objects.bulk_create(notifications, batch_size=100)
+    # Рассылка ставится в очередь одной записью, получателей разворачивает воркер
+    recipients_count = outbox.resolve_audience(audience).count()
+    outbox.enqueue_broadcast(
+        audience,
+        notification_type,
+        title=title,
+        body=body,
+        sender=request.user
+    )
     
     return Response({
-        "message": f"Уведомление отправлено {len(notifications)} пользователям",
-        "recipients_count": len(notifications)
+        "message": f"Уведомление поставлено в очередь для {recipients_count} пользователей",
+        "recipients_count": recipients_count
     }, status=status.HTTP_201_CREATED)
 
 @api_view(['GET', 'POST'])
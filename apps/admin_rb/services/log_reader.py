@@ -0,0 +1,159 @@
+# apps/admin_rb/services/log_reader.py
+"""
+Чтение хвоста лог-файлов Django без загрузки файла целиком.
+
+Файл читается с конца блоками по BLOCK_SIZE байт; строки собираются в записи
+(строка с уровнем и следующие за ней строки traceback). Поддерживаются
+фильтры по минимальному уровню и подстроке и постраничное чтение назад:
+курсор — «inode:смещение» начала самой старой отданной записи. Файлы,
+ротированные RotatingFileHandler (django.log.1, django.log.2, …), читаются
+следом за текущим; по inode курсор находит свой файл и после ротации.
+За один запрос просматривается не больше MAX_SCAN_BYTES, поэтому редкий
+фильтр возвращает неполную страницу с курсором для продолжения.
+"""
+import os
+import re
+
+BLOCK_SIZE = 64 * 1024
+MAX_SCAN_BYTES = 8 * 1024 * 1024
+MAX_ROTATED_FILES = 20
+
+LEVELS = ['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL']
+RECORD_START = re.compile(rb'^(DEBUG|INFO|WARNING|ERROR|CRITICAL) ')
+
+
+class InvalidLogCursor(ValueError):
+    """Курсор не удалось разобрать"""
+
+
+def log_files(path):
+    """Текущий файл и ротированные копии от новых к старым: [(путь, inode)]"""
+    files = []
+    for index in range(MAX_ROTATED_FILES + 1):
+        candidate = path if index == 0 else f'{path}.{index}'
+        try:
+            files.append((candidate, os.stat(candidate).st_ino))
+        except FileNotFoundError:
+            if index > 0:
+                break
+    return files
+
+
+def encode_cursor(inode, offset):
+    return f'{inode}:{offset}'
+
+
+def decode_cursor(cursor):
+    try:
+        inode, offset = (int(part) for part in cursor.split(':'))
+    except (AttributeError, ValueError):
+        raise InvalidLogCursor('Некорректный курсор')
+    if offset < 0:
+        raise InvalidLogCursor('Некорректный курсор')
+    return inode, offset
+
+
+def lines_backwards(f, end, block_size=BLOCK_SIZE):
+    """Строки файла от позиции end к началу: (смещение начала, bytes без \\n)"""
+    position = end
+    tail = b''
+    while position > 0:
+        size = min(block_size, position)
+        position -= size
+        f.seek(position)
+        pieces = (f.read(size) + tail).split(b'\n')
+        line_end = position + sum(len(piece) + 1 for piece in pieces) - 1
+        for piece in reversed(pieces[1:]):
+            start = line_end - len(piece)
+            if piece:
+                yield start, piece
+            line_end = start - 1
+        tail = pieces[0]
+    if tail:
+        yield 0, tail
+
+
+def _level_index(line):
+    match = RECORD_START.match(line)
+    return LEVELS.index(match.group(1).decode()) if match else None
+
+
+def _records_backwards(f, end):
+    """Записи от end к началу: (смещение, минимальный уровень или None, bytes).
+
+    Строки без уровня (traceback) относятся к предыдущей строке с уровнем.
+    """
+    continuation = []
+    for offset, line in lines_backwards(f, end):
+        level = _level_index(line)
+        if level is None:
+            continuation.append(line)
+            continue
+        yield offset, level, b'\n'.join([line] + continuation[::-1])
+        continuation = []
+    if continuation:
+        yield 0, None, b'\n'.join(continuation[::-1])
+
+
+def tail(path, limit=100, level=None, contains=None, cursor=None, max_scan_bytes=MAX_SCAN_BYTES):
+    """Последние limit записей лога, подходящих под фильтры, перед cursor.
+
+    level — минимальный уровень (WARNING покажет WARNING, ERROR, CRITICAL),
+    contains — подстрока без учёта регистра. Возвращает словарь: lines —
+    записи в хронологическом порядке, next_cursor — курсор для более ранних
+    записей или None, scanned_bytes — сколько байт просмотрено.
+    """
+    if level and level.upper() not in LEVELS:
+        raise ValueError(f'Неизвестный уровень: {level}')
+    min_level = LEVELS.index(level.upper()) if level else None
+    needle = contains.lower() if contains else None
+    files = log_files(path)
+    if not files:
+        return {'lines': [], 'next_cursor': None, 'scanned_bytes': 0}
+
+    start_index, end = 0, None
+    if cursor:
+        inode, end = decode_cursor(cursor)
+        positions = [index for index, (_, file_inode) in enumerate(files) if file_inode == inode]
+        if not positions:
+            # Файл курсора удалён ротацией — более ранних записей нет
+            return {'lines': [], 'next_cursor': None, 'scanned_bytes': 0}
+        start_index = positions[0]
+
+    found = []
+    total_scanned = 0
+    next_cursor = None
+    for index in range(start_index, len(files)):
+        file_path, inode = files[index]
+        scanned = 0
+        done = False
+        with open(file_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            file_end = min(end, size) if end is not None and index == start_index else size
+            for offset, record_level, record in _records_backwards(f, file_end):
+                scanned = file_end - offset
+                if min_level is None or (record_level is not None and record_level >= min_level):
+                    text = record.decode('utf-8', errors='replace')
+                    if needle is None or needle in text.lower():
+                        found.append(text)
+                if len(found) >= limit or total_scanned + scanned >= max_scan_bytes:
+                    next_cursor = encode_cursor(inode, offset) if offset > 0 else _next_file_cursor(files, index)
+                    done = True
+                    break
+        total_scanned += scanned
+        if done:
+            break
+        if total_scanned >= max_scan_bytes:
+            next_cursor = _next_file_cursor(files, index)
+            break
+
+    found.reverse()
+    return {'lines': found, 'next_cursor': next_cursor, 'scanned_bytes': total_scanned}
+
+
+def _next_file_cursor(files, index):
+    """Курсор на конец следующего (более старого) файла или None"""
+    if index + 1 >= len(files):
+        return None
+    file_path, inode = files[index + 1]
+    return encode_cursor(inode, os.path.getsize(file_path))
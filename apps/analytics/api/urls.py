@@ -4,6 +4,7 @@ from .views import (
     population_coverage_report,
     sport_activity_report,
     export_to_excel,
+    export_to_csv,
     track_event,
     track_batch
 )
@@ -12,6 +13,7 @@ urlpatterns = [
     path('reports/population/', population_coverage_report, name='analytics-population'),
     path('reports/sport-activity/', sport_activity_report, name='analytics-sport-activity'),
     path('export/<str:report_type>/excel/', export_to_excel, name='analytics-export-excel'),
+    path('export/<str:report_type>/csv/', export_to_csv, name='analytics-export-csv'),
     path('track/', track_event, name='analytics-track'),
     path('track-batch/', track_batch, name='analytics-track-batch'),
 ]
\ No newline at end of file
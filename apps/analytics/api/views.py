@@ -1,81 +1,121 @@
 # apps/analytics/api/views.py
-import pandas as pd
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from django.http import HttpResponse
 from datetime import datetime
-from io import BytesIO
 from .serializers import AnalyticsReportSerializer
+from apps.analytics.exports import reports
+from apps.attendance.services.statistics import resolve_period
+from apps.city_committee.analytics import population, sport_coverage
+from apps.geography.models import City
+
+# Допустимые периоды отчётов (дни)
+REPORT_PERIOD_DAYS = (30, 90, 180, 365)
+
+# Отчёты и выгрузки содержат персональные данные спортсменов
+EXPORT_ROLES = ['admin_rb', 'committee_staff']
+
+
+def _forbidden(request):
+    """Ответ 403 для пользователя без роли из EXPORT_ROLES, иначе None"""
+    if not request.user.roles.filter(role__in=EXPORT_ROLES).exists():
+        return Response({"error": "Доступ запрещён"}, status=403)
+    return None
+
+
+def _report_scope(request):
+    """Город и период отчёта: (city, start_date, end_date, ответ с ошибкой или None).
+
+    Сотрудник спорткомитета видит только свой город; остальным город задаётся
+    параметром city_id, без него отчёт строится по всем городам.
+    """
+    try:
+        start_date, end_date = resolve_period(
+            request.query_params, allowed=REPORT_PERIOD_DAYS, default=365
+        )
+    except ValueError as e:
+        return None, None, None, Response({"error": str(e)}, status=400)
+
+    staff = getattr(request.user, 'committee_role', None)
+    if staff is not None:
+        return staff.city, start_date, end_date, None
+
+    city = None
+    city_id = request.query_params.get('city_id')
+    if city_id:
+        try:
+            city = City.objects.get(id=int(city_id))
+        except (ValueError, City.DoesNotExist):
+            return None, None, None, Response({"error": "Город не найден"}, status=404)
+    return city, start_date, end_date, None
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def population_coverage_report(request):
-    """Отчёт: Охват населения"""
-    # Пример данных (в реальности — агрегация из БД)
-    data = {
-        "total_athletes": 1250,
-        "monthly_growth": [
-            {"month": "Янв", "count": 100},
-            {"month": "Фев", "count": 120},
-            # ... до декабря
-        ],
-        "age_distribution": {
-            "6-10": 300,
-            "11-14": 400,
-            "15-17": 250,
-            "18+": 300
-        }
-    }
+    """Отчёт: Охват населения
+
+    Параметры: period=30|90|180|365 (по умолчанию 365) или start_date/end_date,
+    city_id — город (сотруднику спорткомитета всегда отдаётся его город).
+    Доступен ролям EXPORT_ROLES.
+    """
+    forbidden = _forbidden(request)
+    if forbidden:
+        return forbidden
+    city, start_date, end_date, error = _report_scope(request)
+    if error:
+        return error
     report = {
         "title": "Охват населения",
-        "data": data,
+        "data": population.get_population_report(city, start_date, end_date),
         "generated_at": datetime.now().isoformat()
     }
     return Response(report)
 
 
+def _export(request, report_type, fmt):
+    """Потоковая выгрузка отчёта (город и период — как у отчётов)"""
+    forbidden = _forbidden(request)
+    if forbidden:
+        return forbidden
+    if report_type not in reports.REPORTS:
+        return Response({
+            "error": "Отчёт не найден",
+            "available": sorted(reports.REPORTS),
+        }, status=404)
+    city, start_date, end_date, error = _report_scope(request)
+    if error:
+        return error
+    return reports.export_response(request, report_type, fmt, city, start_date, end_date)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def export_to_excel(request, report_type):
-    """Экспорт отчёта в Excel"""
-    # Генерация данных
-    if report_type == 'population':
-        df = pd.DataFrame({
-            'Месяц': ['Янв', 'Фев', 'Мар'],
-            'Количество': [100, 120, 130]
-        })
-    else:
-        df = pd.DataFrame({'Ошибка': ['Отчёт не найден']})
-
-    buffer = BytesIO()
-    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='Отчёт')
-
-    buffer.seek(0)
-    response = HttpResponse(
-        buffer.getvalue(),
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
-    response['Content-Disposition'] = f'attachment; filename={report_type}_report.xlsx'
-    return response
+    """Экспорт отчёта в Excel (XLSX)"""
+    return _export(request, report_type, 'xlsx')
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_to_csv(request, report_type):
+    """Экспорт отчёта в CSV"""
+    return _export(request, report_type, 'csv')
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def sport_activity_report(request):
-    """Активность по видам спорта"""
-    data = {
-        "sports": [
-            {"name": "Футбол", "participants": 320, "events": 15},
-            {"name": "Лёгкая атлетика", "participants": 280, "events": 12},
-            # ...
-        ]
-    }
+    """Активность по видам спорта (параметры и доступ — как у population_coverage_report)"""
+    forbidden = _forbidden(request)
+    if forbidden:
+        return forbidden
+    city, start_date, end_date, error = _report_scope(request)
+    if error:
+        return error
     return Response({
         "title": "Активность по видам спорта",
-        "data": data,
+        "data": sport_coverage.get_sport_activity_report(city, start_date, end_date),
         "generated_at": datetime.now().isoformat()
     })
 
@@ -83,8 +123,8 @@ def sport_activity_report(request):
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def track_event(request):
-    """Отслеживание события пользователя"""
-    from apps.audit.models import AuditLog
+    """Отслеживание события пользователя (запись аудита сохраняется фоново)"""
+    from apps.audit.services import writer
     
     event_name = request.data.get('name', '')
     properties = request.data.get('properties', {})
@@ -93,11 +133,11 @@ def track_event(request):
         return Response({"error": "Имя события обязательно"}, status=400)
     
     # Сохраняем в audit log
-    AuditLog.objects.create(
+    writer.record(
         user=request.user,
         action=f'analytics_{event_name}',
         details=properties,
-        ip_address=request.META.get('REMOTE_ADDR', ''),
+        ip_address=writer.client_ip(request),
         user_agent=request.META.get('HTTP_USER_AGENT', '')
     )
     
@@ -108,34 +148,31 @@ def track_event(request):
 @permission_classes([IsAuthenticated])
 def track_batch(request):
     """Пакетное отслеживание событий"""
-    from apps.audit.models import AuditLog
+    from apps.audit.services import writer
     
     events = request.data.get('events', [])
     
     if not events or not isinstance(events, list):
         return Response({"error": "Список событий обязателен"}, status=400)
     
-    # Создаем записи в audit log
-    audit_logs = []
+    ip_address = writer.client_ip(request)
+    user_agent = request.META.get('HTTP_USER_AGENT', '')
+    tracked = 0
     for event in events[:100]:  # Ограничиваем до 100 событий за раз
         event_name = event.get('name', '')
         properties = event.get('properties', {})
         
         if event_name:
-            audit_logs.append(
-                AuditLog(
-                    user=request.user,
-                    action=f'analytics_{event_name}',
-                    details=properties,
-                    ip_address=request.META.get('REMOTE_ADDR', ''),
-                    user_agent=request.META.get('HTTP_USER_AGENT', '')
-                )
+            writer.record(
+                user=request.user,
+                action=f'analytics_{event_name}',
+                details=properties,
+                ip_address=ip_address,
+                user_agent=user_agent
             )
-    
-    if audit_logs:
-        AuditLog.objects.bulk_create(audit_logs, batch_size=50)
+            tracked += 1
     
     return Response({
         "status": "ok",
-        "tracked": len(audit_logs)
+        "tracked": tracked
     }, status=201)
\ No newline at end of file
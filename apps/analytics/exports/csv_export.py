@@ -0,0 +1,56 @@
+# apps/analytics/exports/csv_export.py
+"""
+Потоковая выгрузка в CSV.
+
+Строки форматируются csv.writer и отдаются пачками примерно по CHUNK_SIZE
+символов по мере чтения из БД. Разделитель «;» и BOM в начале — чтобы файл
+без настройки открывался в Excel с русской локалью. Строки, начинающиеся
+с символов формулы, экранируются апострофом (CSV injection).
+"""
+import csv
+from datetime import datetime
+
+from django.utils import timezone
+
+CHUNK_SIZE = 64 * 1024
+CONTENT_TYPE = 'text/csv; charset=utf-8'
+DELIMITER = ';'
+
+# Начало значения, которое Excel и LibreOffice примут за формулу
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+class _Echo:
+    """Псевдофайл: csv.writer возвращает отформатированную строку"""
+
+    def write(self, value):
+        return value
+
+
+def _text(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.strftime('%Y-%m-%d %H:%M')
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        # Пользовательский текст вида «=HYPERLINK(...)» не должен выполняться
+        return "'" + value
+    return value
+
+
+def csv_chunks(headers, rows, chunk_size=CHUNK_SIZE):
+    """Текст CSV-файла пачками: заголовок и строки rows (итератор)"""
+    writer = csv.writer(_Echo(), delimiter=DELIMITER)
+    buffer = ['\ufeff', writer.writerow(headers)]
+    size = 0
+    for row in rows:
+        line = writer.writerow([_text(value) for value in row])
+        buffer.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            yield ''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield ''.join(buffer)
@@ -0,0 +1,199 @@
+# apps/analytics/exports/excel.py
+"""
+Потоковая выгрузка в XLSX.
+
+XLSX — zip-архив с XML-частями. Служебные части (книга, стили) маленькие и
+пишутся сразу, а лист сериализуется построчно прямо в запись архива:
+zipfile пишет в поток без перемотки (размеры — в дескрипторе после данных),
+поэтому сжатые байты отдаются блоками по CHUNK_SIZE по мере чтения строк из
+БД. Клиент и прокси получают первые байты сразу, а память процесса не
+зависит от числа строк — ни книга, ни временный файл целиком не собираются.
+
+Строки пишутся inline-строками (без таблицы общих строк), поэтому текст
+вида «=HYPERLINK(...)» остаётся текстом и не становится формулой.
+"""
+import math
+import re
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from xml.sax.saxutils import escape, quoteattr
+
+from django.utils import timezone
+
+CHUNK_SIZE = 64 * 1024
+CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Символы, недопустимые в XML 1.0
+ILLEGAL_CHARACTERS_RE = re.compile(r'[\000-\010]|[\013-\014]|[\016-\037]')
+INVALID_TITLE_RE = re.compile(r'[\\*?:/\[\]]')
+EXCEL_EPOCH = datetime(1899, 12, 30)
+
+# Индексы cellXfs в STYLES
+STYLE_HEADER = 1
+STYLE_DATETIME = 2
+STYLE_DATE = 3
+
+CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name={title} sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/>'
+    '</Relationships>'
+)
+STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<numFmts count="2">'
+    '<numFmt numFmtId="164" formatCode="yyyy-mm-dd hh:mm"/>'
+    '<numFmt numFmtId="165" formatCode="yyyy-mm-dd"/>'
+    '</numFmts>'
+    '<fonts count="2">'
+    '<font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font>'
+    '</fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="4">'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="165" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '</cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+SHEET_END = '</sheetData></worksheet>'
+
+
+class _Sink:
+    """Поток без перемотки: zipfile пишет в него, генератор забирает накопленное"""
+
+    def __init__(self):
+        self.parts = []
+        self.size = 0
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data = b''.join(self.parts)
+        self.parts, self.size = [], 0
+        return data
+
+
+def _column(index):
+    """Буквы столбца по номеру с нуля: 0 → A, 26 → AA"""
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _serial(value):
+    """Дата/время как число дней от эпохи Excel"""
+    return (value - EXCEL_EPOCH).total_seconds() / 86400
+
+
+def _text_cell(ref, text, style=0):
+    text = escape(ILLEGAL_CHARACTERS_RE.sub('', text))
+    style_attr = f' s="{style}"' if style else ''
+    return f'<c r="{ref}" t="inlineStr"{style_attr}><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _cell(ref, value):
+    """XML ячейки; None — пустая ячейка не пишется"""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return f'<c r="{ref}" t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, Decimal)) or (isinstance(value, float) and math.isfinite(value)):
+        return f'<c r="{ref}"><v>{value}</v></c>'
+    if isinstance(value, datetime):
+        # Excel не хранит часовой пояс: aware datetime переводится в местное время
+        if timezone.is_aware(value):
+            value = timezone.localtime(value).replace(tzinfo=None)
+        return f'<c r="{ref}" s="{STYLE_DATETIME}"><v>{_serial(value)}</v></c>'
+    if isinstance(value, date):
+        return f'<c r="{ref}" s="{STYLE_DATE}"><v>{_serial(datetime.combine(value, datetime.min.time()))}</v></c>'
+    return _text_cell(ref, str(value))
+
+
+def _row(number, values, header=False):
+    cells = []
+    for index, value in enumerate(values):
+        ref = f'{_column(index)}{number}'
+        if header:
+            cells.append(_text_cell(ref, '' if value is None else str(value), STYLE_HEADER))
+        else:
+            cells.append(_cell(ref, value))
+    return f'<row r="{number}">{"".join(cells)}</row>'
+
+
+def _sheet_title(title):
+    return INVALID_TITLE_RE.sub('', title)[:31] or 'Лист1'
+
+
+def xlsx_chunks(headers, rows, sheet_title='Отчёт', chunk_size=CHUNK_SIZE):
+    """Байты XLSX-файла блоками: заголовок и строки rows (итератор)"""
+    sink = _Sink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', CONTENT_TYPES)
+        archive.writestr('_rels/.rels', ROOT_RELS)
+        archive.writestr('xl/workbook.xml', WORKBOOK.format(title=quoteattr(_sheet_title(sheet_title))))
+        archive.writestr('xl/_rels/workbook.xml.rels', WORKBOOK_RELS)
+        archive.writestr('xl/styles.xml', STYLES)
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(SHEET_START.encode())
+            sheet.write(_row(1, headers, header=True).encode())
+            for number, values in enumerate(rows, start=2):
+                sheet.write(_row(number, values).encode())
+                if sink.size >= chunk_size:
+                    yield sink.take()
+            sheet.write(SHEET_END.encode())
+    yield sink.take()
@@ -0,0 +1,211 @@
+# apps/analytics/exports/reports.py
+"""
+Отчёты для выгрузки в CSV/XLSX.
+
+Каждый отчёт — заголовки и функция, возвращающая итератор строк по городу
+и периоду. Строки читаются из БД через values_list().iterator(): модели не
+создаются, а записи приходят пачками по ITERATOR_CHUNK_SIZE (на PostgreSQL —
+серверным курсором), поэтому выгрузка по всему городу не держит в памяти
+весь набор. export_response оборачивает отчёт в StreamingHttpResponse
+(под ASGI — через асинхронный итератор, см. apps.core.utils.streaming).
+"""
+from collections import namedtuple
+
+from django.db.models import Count, Q
+
+from apps.athletes.models import AthleteProfile
+from apps.attendance.models import AttendanceRecord
+from apps.city_committee.analytics import gto_plan
+from apps.city_committee.analytics.population import MONTH_LABELS, period_bounds
+from apps.core.utils.streaming import streaming_response
+from apps.events.models import EventRegistration
+from apps.organizations.models import Organization
+
+from . import csv_export, excel
+
+ITERATOR_CHUNK_SIZE = 2000
+
+GENDERS = {'M': 'М', 'F': 'Ж'}
+ATTENDANCE_STATUSES = {'present': 'Присутствовал', 'absent': 'Отсутствовал', 'late': 'Опоздал'}
+REGISTRATION_STATUSES = {'registered': 'Зарегистрирован', 'confirmed': 'Подтверждён', 'cancelled': 'Отменён'}
+REGISTRATION_TYPES = {'athlete': 'Спортсмен', 'coach': 'Тренер'}
+ORG_TYPES = {'state': 'Государственная', 'private': 'Частная'}
+ORG_STATUSES = {'pending': 'Ожидает модерации', 'approved': 'Одобрено', 'rejected': 'Отклонено'}
+
+Report = namedtuple('Report', ['title', 'headers', 'rows'])
+
+
+def _full_name(last_name, first_name, patronymic):
+    return ' '.join(part for part in (last_name, first_name, patronymic) if part)
+
+
+def population_rows(city, start_date, end_date):
+    """Спортсмены, зарегистрированные до конца периода"""
+    _, end = period_bounds(start_date, end_date)
+    queryset = AthleteProfile.objects.filter(created_at__lt=end)
+    if city is not None:
+        queryset = queryset.filter(city=city)
+    rows = (
+        queryset.annotate(active_groups=Count('enrollments', filter=Q(enrollments__status='active')))
+        .order_by('id')
+        .values_list(
+            'id', 'user__last_name', 'user__first_name', 'user__patronymic',
+            'user__birth_date', 'user__gender', 'city__name', 'main_sport__name',
+            'health_group', 'active_groups', 'created_at',
+        )
+        .iterator(chunk_size=ITERATOR_CHUNK_SIZE)
+    )
+    for (athlete_id, last_name, first_name, patronymic, birth_date, gender,
+         city_name, sport, health_group, active_groups, created_at) in rows:
+        yield (
+            athlete_id, _full_name(last_name, first_name, patronymic), birth_date,
+            GENDERS.get(gender, ''), city_name, sport, health_group, active_groups, created_at,
+        )
+
+
+def attendance_rows(city, start_date, end_date):
+    """Отметки посещаемости за период"""
+    queryset = AttendanceRecord.objects.filter(date__gte=start_date, date__lte=end_date)
+    if city is not None:
+        queryset = queryset.filter(group__organization__city=city)
+    rows = (
+        queryset.order_by('date', 'group_id', 'athlete_id')
+        .values_list(
+            'date', 'group__organization__name', 'group__name', 'group__sport__name',
+            'athlete__user__last_name', 'athlete__user__first_name', 'athlete__user__patronymic',
+            'status', 'comment',
+        )
+        .iterator(chunk_size=ITERATOR_CHUNK_SIZE)
+    )
+    for day, organization, group, sport, last_name, first_name, patronymic, status, comment in rows:
+        yield (
+            day, organization, group, sport, _full_name(last_name, first_name, patronymic),
+            ATTENDANCE_STATUSES.get(status, status), comment,
+        )
+
+
+def event_participant_rows(city, start_date, end_date):
+    """Регистрации на мероприятия, начинающиеся в периоде"""
+    start, end = period_bounds(start_date, end_date)
+    queryset = EventRegistration.objects.filter(event__start_date__gte=start, event__start_date__lt=end)
+    if city is not None:
+        queryset = queryset.filter(event__city=city)
+    rows = (
+        queryset.order_by('event__start_date', 'event_id', 'id')
+        .values_list(
+            'event_id', 'event__title', 'event__start_date', 'event__venue', 'registration_type',
+            'athlete__user__last_name', 'athlete__user__first_name', 'athlete__user__patronymic',
+            'coach__user__last_name', 'coach__user__first_name', 'coach__user__patronymic',
+            'athlete__main_sport__name', 'status', 'created_at',
+        )
+        .iterator(chunk_size=ITERATOR_CHUNK_SIZE)
+    )
+    for (event_id, title, start_at, venue, registration_type, *names,
+         sport, status, registered_at) in rows:
+        name = _full_name(*names[:3]) if registration_type == 'athlete' else _full_name(*names[3:])
+        yield (
+            event_id, title, start_at, venue, REGISTRATION_TYPES.get(registration_type, registration_type),
+            name, sport, REGISTRATION_STATUSES.get(status, status), registered_at,
+        )
+
+
+def organization_rows(city, start_date, end_date):
+    """Организации города с числом групп, спортсменов и тренеров (на текущий момент)"""
+    queryset = Organization.objects.all()
+    if city is not None:
+        queryset = queryset.filter(city=city)
+    rows = (
+        queryset.annotate(
+            groups_count=Count('groups', filter=Q(groups__is_active=True), distinct=True),
+            athletes_count=Count(
+                'groups__enrollments__athlete', filter=Q(groups__enrollments__status='active'), distinct=True
+            ),
+            coaches_count=Count('coachmembership', filter=Q(coachmembership__status='active'), distinct=True),
+        )
+        .order_by('id')
+        .values_list(
+            'id', 'name', 'org_type', 'city__name', 'address', 'inn', 'status',
+            'groups_count', 'athletes_count', 'coaches_count', 'created_at',
+        )
+        .iterator(chunk_size=ITERATOR_CHUNK_SIZE)
+    )
+    for (org_id, name, org_type, city_name, address, inn, status,
+         groups_count, athletes_count, coaches_count, created_at) in rows:
+        yield (
+            org_id, name, ORG_TYPES.get(org_type, org_type), city_name, address, inn,
+            ORG_STATUSES.get(status, status), groups_count, athletes_count, coaches_count, created_at,
+        )
+
+
+def gto_plan_rows(city, start_date, end_date):
+    """План и факт ГТО по ступеням за год end_date (итог — последней строкой)"""
+    report = gto_plan.get_gto_plan_report(city, end_date.year)
+    for level in report['levels']:
+        yield (
+            level['label'], level['plan'], level['fact'], level['projected'],
+            level['attainment'], level['projected_attainment'],
+            *(level['badges'][badge] for badge in gto_plan.BADGES), *level['monthly'],
+        )
+    totals = report['totals']
+    yield (
+        'Итого', totals['plan'], totals['fact'], totals['projected'],
+        totals['attainment'], totals['projected_attainment'],
+        *(totals['badges'][badge] for badge in gto_plan.BADGES),
+        *(month['count'] for month in report['monthly']),
+    )
+
+
+REPORTS = {
+    'population': Report(
+        'Спортсмены',
+        ['ID', 'ФИО', 'Дата рождения', 'Пол', 'Город', 'Основной вид спорта',
+         'Группа здоровья', 'Активных групп', 'Дата регистрации'],
+        population_rows,
+    ),
+    'attendance': Report(
+        'Посещаемость',
+        ['Дата', 'Организация', 'Группа', 'Вид спорта', 'Спортсмен', 'Статус', 'Комментарий'],
+        attendance_rows,
+    ),
+    'event_participants': Report(
+        'Участники мероприятий',
+        ['ID мероприятия', 'Мероприятие', 'Начало', 'Место', 'Тип участника', 'ФИО',
+         'Вид спорта', 'Статус', 'Дата регистрации'],
+        event_participant_rows,
+    ),
+    'organizations': Report(
+        'Организации',
+        ['ID', 'Название', 'Тип', 'Город', 'Адрес', 'ИНН', 'Статус', 'Групп',
+         'Спортсменов', 'Тренеров', 'Дата создания'],
+        organization_rows,
+    ),
+    'gto_plan': Report(
+        'План ГТО',
+        ['Ступень', 'План', 'Факт', 'Прогноз на конец года', '% плана', '% плана (прогноз)',
+         'Бронзовых', 'Серебряных', 'Золотых', *MONTH_LABELS],
+        gto_plan_rows,
+    ),
+}
+
+FORMATS = {
+    'csv': (csv_export.CONTENT_TYPE, 'csv'),
+    'xlsx': (excel.CONTENT_TYPE, 'xlsx'),
+}
+
+
+def export_response(request, report_type, fmt, city=None, start_date=None, end_date=None):
+    """StreamingHttpResponse с отчётом report_type в формате fmt ('csv' или 'xlsx')"""
+    report = REPORTS[report_type]
+    content_type, extension = FORMATS[fmt]
+    rows = report.rows(city, start_date, end_date)
+    if fmt == 'xlsx':
+        content = excel.xlsx_chunks(report.headers, rows, sheet_title=report.title)
+    else:
+        content = csv_export.csv_chunks(report.headers, rows)
+
+    response = streaming_response(request, content, content_type=content_type)
+    filename = f'{report_type}_{start_date:%Y%m%d}-{end_date:%Y%m%d}.{extension}'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    # Не буферизовать ответ в nginx — строки уходят клиенту по мере чтения
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -5,8 +5,10 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from .serializers import AthleteProfileSerializer, ParentRequestSerializer, ClubForAthleteSerializer, \
     EnrollmentRequestSerializer, SectionEnrollmentRequestSerializer
-from ...notifications.models import Notification
+from ...notifications.services import outbox
 from ...organizations.models import Organization
+from apps.core.search.index import rank_queryset
+from apps.coaches.services import club_search
 from ...parents.models import ParentChildLink
 
 
@@ -163,7 +165,7 @@ def confirm_parent_request(request, request_id):
         link.save()
 
         # Уведомление родителю
-        Notification.objects.create(
+        outbox.enqueue(
             recipient=link.parent,
             notification_type='child_linked',
             title='Ребёнок подтвердил связь',
@@ -186,7 +188,7 @@ def reject_parent_request(request, request_id):
         )
         link.delete()  # или пометить как отклонённый — по желанию
 
-        Notification.objects.create(
+        outbox.enqueue(
             recipient=link.parent,
             notification_type='child_rejected',
             title='Ребёнок отклонил запрос',
@@ -208,17 +210,35 @@ def search_clubs_for_athlete(request):
     city = request.query_params.get('city')
     sport_id = request.query_params.get('sport_id')
 
-    if name:
-        queryset = queryset.filter(name__icontains=name)
     if city:
         queryset = queryset.filter(city__name__icontains=city)
     if sport_id:
         queryset = queryset.filter(sport_directions__sport_id=sport_id)
+    if name:
+        # Полнотекстовый поиск с ранжированием по релевантности
+        queryset = rank_queryset(queryset, 'organization', name).order_by('-search_rank', 'name')
 
     serializer = ClubForAthleteSerializer(queryset.distinct(), many=True)
     return Response(serializer.data)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def search_nearby_clubs_for_athlete(request):
+    """Ближайшие клубы к точке для спортсмена: lat, lon, radius (км), limit, sport_id"""
+    try:
+        query = club_search.parse_query(request.query_params)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    queryset = Organization.objects.select_related('city').prefetch_related('sport_directions__sport')
+    results = club_search.nearest_organizations(queryset, **query)
+    data = ClubForAthleteSerializer([org for org, _ in results], many=True).data
+    for item, (_, distance) in zip(data, results):
+        item['distance_km'] = round(distance, 2)
+    return Response(data)
+
+
 # apps/athletes/api/views.py
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -228,10 +248,10 @@ def request_enrollment(request):
     if serializer.is_valid():
         enrollment = serializer.save()
         # Уведомление директору организации
-        from apps.notifications.models import Notification
+        from apps.notifications.services import outbox
         organization = enrollment.group.organization
         if hasattr(organization, 'director'):
-            Notification.objects.create(
+            outbox.enqueue(
                 recipient=organization.director.user,
                 notification_type='athlete_group_request',
                 title='Новая заявка на вступление в группу',
@@ -240,7 +260,7 @@ def request_enrollment(request):
         # Уведомление тренерам группы
         coach_memberships = enrollment.group.coach_memberships.filter(status='active')
         for membership in coach_memberships:
-            Notification.objects.create(
+            outbox.enqueue(
                 recipient=membership.coach.user,
                 notification_type='athlete_request',
                 title='Новая заявка на вступление',
@@ -258,10 +278,10 @@ def request_section_enrollment(request):
     if serializer.is_valid():
         section_request = serializer.save()
         # Уведомление директору организации
-        from apps.notifications.models import Notification
+        from apps.notifications.services import outbox
         organization = section_request.organization
         if hasattr(organization, 'director'):
-            Notification.objects.create(
+            outbox.enqueue(
                 recipient=organization.director.user,
                 notification_type='athlete_section_request',
                 title='Новая заявка на вступление в секцию',
@@ -1,6 +1,6 @@
 # apps/attendance/admin.py
 from django.contrib import admin
-from .models import AttendanceRecord, AbsenceReason
+from .models import AttendanceRecord, AbsenceReason, AttendanceDailyRollup
 
 
 @admin.register(AttendanceRecord)
@@ -21,3 +21,14 @@ class AbsenceReasonAdmin(admin.ModelAdmin):
     list_filter = ('created_at',)
     search_fields = ('name',)
     readonly_fields = ('created_at', 'updated_at')
+
+
+@admin.register(AttendanceDailyRollup)
+class AttendanceDailyRollupAdmin(admin.ModelAdmin):
+    """Админка для дневных свёрток посещаемости"""
+    list_display = ('group', 'organization', 'date', 'total', 'present', 'absent', 'late')
+    list_filter = ('date',)
+    search_fields = ('group__name', 'organization__name')
+    raw_id_fields = ('group', 'organization')
+    date_hierarchy = 'date'
+    readonly_fields = ('created_at', 'updated_at')
@@ -1,7 +1,10 @@
 # apps/attendance/api/serializers.py
 from rest_framework import serializers
 from apps.attendance.models import AttendanceRecord, AbsenceReason
+from apps.attendance.models.attendance import ATTENDANCE_STATUS_CHOICES
 from apps.athletes.models import AthleteProfile
+from apps.organizations.staff.coach_membership import CoachMembership
+from apps.training.models import TrainingGroup
 
 class AbsenceReasonSerializer(serializers.ModelSerializer):
     class Meta:
@@ -11,7 +14,6 @@ class AbsenceReasonSerializer(serializers.ModelSerializer):
 class AttendanceRecordSerializer(serializers.ModelSerializer):
     athlete_name = serializers.CharField(source='athlete.user.get_full_name', read_only=True)
     group_name = serializers.CharField(source='group.name', read_only=True)
-    absence_reason = AbsenceReasonSerializer(read_only=True)
 
     class Meta:
         model = AttendanceRecord
@@ -48,4 +50,38 @@ class AttendanceMarkSerializer(serializers.ModelSerializer):
                 record.save()
             except AbsenceReason.DoesNotExist:
                 pass
-        return record
\ No newline at end of file
+        return record
+
+class AttendanceBulkEntrySerializer(serializers.Serializer):
+    athlete_id = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=ATTENDANCE_STATUS_CHOICES)
+    comment = serializers.CharField(required=False, allow_blank=True, default='')
+
+class AttendanceBulkMarkSerializer(serializers.Serializer):
+    """Отметка посещаемости всей группы за одну тренировку"""
+    group = serializers.PrimaryKeyRelatedField(queryset=TrainingGroup.objects.all())
+    date = serializers.DateField()
+    records = AttendanceBulkEntrySerializer(many=True, allow_empty=False)
+
+    def validate(self, attrs):
+        # Проверка: тренер имеет доступ к группе
+        request = self.context['request']
+        group = attrs['group']
+        if not CoachMembership.objects.filter(
+            coach__user=request.user, groups=group, status='active'
+        ).exists():
+            raise serializers.ValidationError("Нет доступа к этой группе.")
+
+        athlete_ids = [entry['athlete_id'] for entry in attrs['records']]
+        if len(athlete_ids) != len(set(athlete_ids)):
+            raise serializers.ValidationError({"records": "Спортсмен указан несколько раз."})
+
+        enrolled = set(group.enrollments.filter(
+            athlete_id__in=athlete_ids, status='active'
+        ).values_list('athlete_id', flat=True))
+        unknown = sorted(set(athlete_ids) - enrolled)
+        if unknown:
+            raise serializers.ValidationError({
+                "records": f"Спортсмены не состоят в группе: {', '.join(map(str, unknown))}"
+            })
+        return attrs
@@ -1,7 +1,7 @@
 # apps/attendance/api/urls.py
 from django.urls import path
 from .views import (
-    get_absence_reasons, mark_attendance,
+    get_absence_reasons, mark_attendance, mark_attendance_bulk,
     get_group_attendance, get_athlete_attendance,
     get_group_attendance_stats, get_organization_attendance_stats
 )
@@ -9,6 +9,7 @@ from .views import (
 urlpatterns = [
     path('reasons/', get_absence_reasons, name='attendance-reasons'),
     path('mark/', mark_attendance, name='attendance-mark'),
+    path('mark/bulk/', mark_attendance_bulk, name='attendance-mark-bulk'),
     path('group/<int:group_id>/', get_group_attendance, name='attendance-group'),
     path('group/<int:group_id>/stats/', get_group_attendance_stats, name='attendance-group-stats'),
     path('organization/<int:org_id>/stats/', get_organization_attendance_stats, name='attendance-organization-stats'),
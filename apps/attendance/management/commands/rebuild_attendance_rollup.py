@@ -0,0 +1,59 @@
+# apps/attendance/management/commands/rebuild_attendance_rollup.py
+"""
+Management команда для пересборки дневных свёрток посещаемости
+Использование: python manage.py rebuild_attendance_rollup --days 365
+"""
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.attendance.services.rollup import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает таблицу AttendanceDailyRollup из записей посещаемости'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=None,
+            help='Пересобрать только последние N дней (по умолчанию вся история)',
+        )
+        parser.add_argument(
+            '--start-date',
+            type=str,
+            default=None,
+            help='Дата начала периода (YYYY-MM-DD)',
+        )
+        parser.add_argument(
+            '--end-date',
+            type=str,
+            default=None,
+            help='Дата окончания периода (YYYY-MM-DD)',
+        )
+        parser.add_argument(
+            '--organization',
+            type=int,
+            default=None,
+            help='ID организации (по умолчанию все организации)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            start_date = date.fromisoformat(options['start_date']) if options['start_date'] else None
+            end_date = date.fromisoformat(options['end_date']) if options['end_date'] else None
+        except ValueError:
+            raise CommandError('Неверный формат даты. Используйте YYYY-MM-DD')
+
+        if options['days'] is not None:
+            start_date = timezone.now().date() - timedelta(days=options['days'])
+
+        self.stdout.write('Пересборка свёрток посещаемости...')
+        created = rebuild_rollups(
+            start_date=start_date,
+            end_date=end_date,
+            organization_id=options['organization'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'✓ Создано строк свёртки: {created}'))
@@ -0,0 +1,38 @@
+# Generated by Django 6.0.1 on 2026-10-18 10:53
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0002_initial'),
+        ('organizations', '0006_organizationrolerequest'),
+        ('training', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('date', models.DateField()),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('present', models.PositiveIntegerField(default=0)),
+                ('absent', models.PositiveIntegerField(default=0)),
+                ('late', models.PositiveIntegerField(default=0)),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_rollups', to='training.traininggroup')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_rollups', to='organizations.organization')),
+            ],
+            options={
+                'db_table': 'attendance_daily_rollup',
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['organization', 'date'], name='attendance__organiz_b9b2e0_idx'), models.Index(fields=['date'], name='attendance__date_cc9c7b_idx')],
+                'unique_together': {('group', 'date')},
+            },
+        ),
+    ]
@@ -1,2 +1,3 @@
 from .absence_reason import AbsenceReason
-from .attendance import AttendanceRecord
\ No newline at end of file
+from .attendance import AttendanceRecord
+from .rollup import AttendanceDailyRollup
\ No newline at end of file
@@ -0,0 +1,27 @@
+# apps/attendance/models/rollup.py
+from django.db import models
+from apps.core.models.base import TimeStampedModel
+from apps.organizations.models.organization import Organization
+from apps.training.models.group import TrainingGroup
+
+class AttendanceDailyRollup(TimeStampedModel):
+    """Предагрегированные счётчики посещаемости группы за день"""
+    group = models.ForeignKey(TrainingGroup, on_delete=models.CASCADE, related_name='attendance_rollups')
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name='attendance_rollups')
+    date = models.DateField()
+    total = models.PositiveIntegerField(default=0)
+    present = models.PositiveIntegerField(default=0)
+    absent = models.PositiveIntegerField(default=0)
+    late = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'attendance_daily_rollup'
+        unique_together = ('group', 'date')
+        indexes = [
+            models.Index(fields=['organization', 'date']),
+            models.Index(fields=['date']),
+        ]
+        ordering = ['-date']
+
+    def __str__(self):
+        return f"{self.group_id} {self.date}: {self.present}/{self.total}"
@@ -0,0 +1,140 @@
+# apps/attendance/services/marking.py
+import logging
+
+from django.db import transaction
+from django.db.models import Count, Q
+
+from apps.attendance.models import AttendanceRecord
+from . import rollup
+
+logger = logging.getLogger(__name__)
+
+
+def has_medical_data(athlete):
+    """Есть ли у спортсмена медицинские данные, требующие внимания тренера"""
+    from apps.athletes.models import MedicalInfo
+
+    try:
+        medical_info = athlete.medical_info
+    except MedicalInfo.DoesNotExist:
+        # Если medical_info не создан, проверяем только health_group
+        return bool(athlete.health_group)
+    return bool(
+        (medical_info.conditions and len(medical_info.conditions) > 0) or
+        (medical_info.other_conditions and medical_info.other_conditions.strip()) or
+        (medical_info.allergies and medical_info.allergies.strip()) or
+        athlete.health_group
+    )
+
+
+def notify_first_visits(group, athletes):
+    """Уведомить тренеров организации о первом посещении спортсменов с мед. данными.
+
+    Все уведомления ставятся в outbox одним bulk_create. Возвращает их количество.
+    """
+    from apps.notifications.services import outbox
+    from apps.organizations.staff.coach_membership import CoachMembership
+
+    athletes = [athlete for athlete in athletes if has_medical_data(athlete)]
+    if not athletes:
+        return 0
+
+    coaches = CoachMembership.objects.filter(
+        organization_id=group.organization_id,
+        status='active'
+    ).select_related('coach')
+
+    notifications = []
+    for membership in coaches:
+        for athlete in athletes:
+            athlete_name = athlete.user.get_full_name() or 'Спортсмен'
+            notifications.append({
+                'recipient_id': membership.coach.user_id,
+                'notification_type': 'athlete_medical_info',
+                'title': 'Ознакомьтесь с медицинскими данными ученика',
+                'body': f'Спортсмен {athlete_name} впервые посетил группу "{group.name}". У него есть медицинские данные, которые требуют внимания.',
+                'related_object_id': athlete.id,
+            })
+    outbox.enqueue_many(notifications)
+    return len(notifications)
+
+
+def mark_session(group, date, entries):
+    """Отметить посещаемость всей группы за тренировку.
+
+    ``entries`` — список словарей {'athlete_id', 'status', 'comment'}.
+    Все записи сохраняются одним upsert по ключу (athlete, group, date) в одной
+    транзакции; спортсмены, впервые посетившие группу, определяются одним
+    агрегирующим запросом в той же транзакции.
+    Возвращает словарь с записями и счётчиками created/updated/notified.
+    """
+    from apps.athletes.models import AthleteProfile
+
+    athlete_ids = [entry['athlete_id'] for entry in entries]
+
+    records = [
+        AttendanceRecord(
+            athlete_id=entry['athlete_id'],
+            group=group,
+            date=date,
+            status=entry['status'],
+            comment=entry.get('comment', '')
+        )
+        for entry in entries
+    ]
+
+    with transaction.atomic():
+        # Одним агрегирующим запросом: у кого уже есть запись на эту дату и кто
+        # посещал группу в другие дни — по строке на спортсмена, без истории
+        history = (
+            AttendanceRecord.objects.filter(group=group, athlete_id__in=athlete_ids)
+            .order_by()
+            .values('athlete_id')
+            .annotate(
+                marked=Count('id', filter=Q(date=date)),
+                other_days=Count('id', filter=~Q(date=date)),
+            )
+        )
+        marked_today = set()
+        visited_before = set()
+        for row in history:
+            if row['marked']:
+                marked_today.add(row['athlete_id'])
+            if row['other_days']:
+                visited_before.add(row['athlete_id'])
+
+        AttendanceRecord.objects.bulk_create(
+            records,
+            update_conflicts=True,
+            unique_fields=['athlete', 'group', 'date'],
+            update_fields=['status', 'comment', 'updated_at'],
+        )
+        rollup.refresh_rollups(group.id, [date])
+
+    first_visit_ids = [
+        entry['athlete_id'] for entry in entries
+        if entry['status'] == 'present'
+        and entry['athlete_id'] not in visited_before
+        and entry['athlete_id'] not in marked_today
+    ]
+    notified = 0
+    if first_visit_ids:
+        try:
+            athletes = AthleteProfile.objects.filter(
+                id__in=first_visit_ids
+            ).select_related('user', 'medical_info')
+            notified = notify_first_visits(group, athletes)
+        except Exception as e:
+            # Логируем ошибку, но не прерываем процесс
+            logger.warning(f'Ошибка при отправке уведомления тренеру: {str(e)}')
+
+    saved = AttendanceRecord.objects.filter(
+        group=group, date=date, athlete_id__in=athlete_ids
+    ).select_related('athlete__user', 'group')
+
+    return {
+        'records': list(saved),
+        'created': len(set(athlete_ids) - marked_today),
+        'updated': len(marked_today),
+        'notified': notified,
+    }
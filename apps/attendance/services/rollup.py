@@ -0,0 +1,126 @@
+# apps/attendance/services/rollup.py
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from apps.attendance.models import AttendanceRecord, AttendanceDailyRollup
+from .statistics import summarize
+
+ROLLUP_BATCH_SIZE = 1000
+
+
+def _daily_counts(records):
+    """Счётчики статусов по (группа, дата) одним агрегирующим запросом"""
+    return (
+        records
+        .order_by()
+        .values('group_id', 'group__organization_id', 'date')
+        .annotate(
+            total=Count('id'),
+            present=Count('id', filter=Q(status='present')),
+            absent=Count('id', filter=Q(status='absent')),
+            late=Count('id', filter=Q(status='late')),
+        )
+    )
+
+
+def _rollup_from_row(row):
+    return AttendanceDailyRollup(
+        group_id=row['group_id'],
+        organization_id=row['group__organization_id'],
+        date=row['date'],
+        total=row['total'],
+        present=row['present'],
+        absent=row['absent'],
+        late=row['late'],
+    )
+
+
+@transaction.atomic
+def refresh_rollups(group_id, dates):
+    """Пересчитать свёртки группы за указанные даты.
+
+    Вызывается после записи посещаемости: пересчитывается только затронутый
+    день группы, поэтому стоимость не зависит от объёма истории.
+    Строки вставляются upsert'ом по (group, date): параллельные отметки той
+    же группы за тот же день не конфликтуют на уникальном ключе.
+    """
+    dates = set(dates)
+    if not dates:
+        return
+    rows = list(_daily_counts(
+        AttendanceRecord.objects.filter(group_id=group_id, date__in=dates)
+    ))
+    AttendanceDailyRollup.objects.bulk_create(
+        [_rollup_from_row(row) for row in rows],
+        update_conflicts=True,
+        unique_fields=['group', 'date'],
+        update_fields=['organization', 'total', 'present', 'absent', 'late', 'updated_at'],
+    )
+    # Дни, в которых отметок не осталось
+    AttendanceDailyRollup.objects.filter(group_id=group_id, date__in=dates).exclude(
+        date__in=[row['date'] for row in rows]
+    ).delete()
+
+
+@transaction.atomic
+def rebuild_rollups(start_date=None, end_date=None, organization_id=None):
+    """Полностью пересобрать свёртки за период (для первичного заполнения).
+
+    Возвращает количество созданных строк свёртки.
+    """
+    records = AttendanceRecord.objects.all()
+    rollups = AttendanceDailyRollup.objects.all()
+    if start_date:
+        records = records.filter(date__gte=start_date)
+        rollups = rollups.filter(date__gte=start_date)
+    if end_date:
+        records = records.filter(date__lte=end_date)
+        rollups = rollups.filter(date__lte=end_date)
+    if organization_id:
+        records = records.filter(group__organization_id=organization_id)
+        rollups = rollups.filter(organization_id=organization_id)
+
+    rollups.delete()
+
+    created = 0
+    batch = []
+    for row in _daily_counts(records).iterator(chunk_size=ROLLUP_BATCH_SIZE):
+        batch.append(_rollup_from_row(row))
+        if len(batch) >= ROLLUP_BATCH_SIZE:
+            AttendanceDailyRollup.objects.bulk_create(batch)
+            created += len(batch)
+            batch = []
+    if batch:
+        AttendanceDailyRollup.objects.bulk_create(batch)
+        created += len(batch)
+    return created
+
+
+def get_rollup_totals(start_date, end_date, **filters):
+    """Суммарная посещаемость за период по свёрткам (фильтры: organization, group и т.п.)"""
+    values = AttendanceDailyRollup.objects.filter(
+        date__gte=start_date, date__lte=end_date, **filters
+    ).aggregate(
+        total=Sum('total'),
+        present=Sum('present'),
+        absent=Sum('absent'),
+        late=Sum('late'),
+    )
+    return summarize(values)
+
+
+def get_rollup_totals_by(group_by, start_date, end_date, **filters):
+    """Посещаемость за период по свёрткам с группировкой (organization / group)"""
+    rows = (
+        AttendanceDailyRollup.objects
+        .filter(date__gte=start_date, date__lte=end_date, **filters)
+        .order_by()
+        .values(group_by)
+        .annotate(
+            total=Sum('total'),
+            present=Sum('present'),
+            absent=Sum('absent'),
+            late=Sum('late'),
+        )
+    )
+    return {row[group_by]: summarize(row) for row in rows}
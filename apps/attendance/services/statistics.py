@@ -0,0 +1,156 @@
+# apps/attendance/services/statistics.py
+from datetime import date, timedelta
+
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from apps.attendance.models import AttendanceRecord
+
+ALLOWED_PERIOD_DAYS = (7, 30, 90)
+DEFAULT_PERIOD_DAYS = 30
+
+STATUS_KEYS = ('present', 'absent', 'late')
+
+
+def resolve_period(params, allowed=ALLOWED_PERIOD_DAYS, default=DEFAULT_PERIOD_DAYS):
+    """Определить период статистики по параметрам запроса.
+
+    Поддерживаются ``period`` (по умолчанию 7/30/90 дней) или пара
+    ``start_date``/``end_date`` в формате ISO. Возвращает кортеж
+    (start_date, end_date), при ошибке — ValueError.
+    """
+    today = timezone.now().date()
+    start_raw = params.get('start_date')
+    end_raw = params.get('end_date')
+
+    if start_raw or end_raw:
+        try:
+            start_date = date.fromisoformat(start_raw) if start_raw else None
+            end_date = date.fromisoformat(end_raw) if end_raw else today
+        except ValueError:
+            raise ValueError('Неверный формат даты. Используйте YYYY-MM-DD')
+        if start_date is None:
+            start_date = end_date - timedelta(days=default)
+        if start_date > end_date:
+            raise ValueError('Дата начала не может быть позже даты окончания')
+        return start_date, end_date
+
+    try:
+        days = int(params.get('period', default))
+    except (TypeError, ValueError):
+        raise ValueError('Неверный период')
+    if days not in allowed:
+        raise ValueError(f'Период должен быть одним из: {", ".join(map(str, allowed))}')
+    return today - timedelta(days=days), today
+
+
+def period_payload(start_date, end_date):
+    """Описание периода для ответа API"""
+    return {
+        'start_date': start_date.isoformat(),
+        'end_date': end_date.isoformat(),
+        'days': (end_date - start_date).days,
+    }
+
+
+def attendance_rate(present, total):
+    """Процент посещаемости с округлением до десятых"""
+    return round((present / total * 100) if total > 0 else 0, 1)
+
+
+def summarize(row):
+    """Счётчики статусов и процент посещаемости из строки агрегата"""
+    totals = {key: row.get(key) or 0 for key in ('total',) + STATUS_KEYS}
+    totals['attendance_rate'] = attendance_rate(totals['present'], totals['total'])
+    return totals
+
+
+def _sum_totals(rows):
+    summary = {key: 0 for key in ('total',) + STATUS_KEYS}
+    for row in rows:
+        for key in summary:
+            summary[key] += row.get(key) or 0
+    summary['attendance_rate'] = attendance_rate(summary['present'], summary['total'])
+    return summary
+
+
+def aggregate_attendance(records, group_by):
+    """Сгруппированные счётчики статусов одним агрегирующим запросом.
+
+    Возвращает словарь {значение group_by: {'total', 'present', 'absent', 'late'}}.
+    """
+    rows = (
+        records
+        .order_by()
+        .values(group_by)
+        .annotate(
+            total=Count('id'),
+            present=Count('id', filter=Q(status='present')),
+            absent=Count('id', filter=Q(status='absent')),
+            late=Count('id', filter=Q(status='late')),
+        )
+    )
+    return {row[group_by]: row for row in rows}
+
+
+def get_group_stats(group, start_date, end_date):
+    """Статистика посещаемости группы: общая и по активным спортсменам"""
+    from apps.training.models import Enrollment
+    from apps.users.models import UserRole
+
+    records = AttendanceRecord.objects.filter(
+        group=group, date__gte=start_date, date__lte=end_date
+    )
+    by_athlete = aggregate_attendance(records, 'athlete')
+
+    enrollments = list(
+        Enrollment.objects.filter(group=group, status='active')
+        .select_related('athlete__user')
+    )
+    role_ids = dict(
+        UserRole.objects.filter(
+            user_id__in=[e.athlete.user_id for e in enrollments],
+            role='athlete',
+            is_active=True,
+        ).values_list('user_id', 'unique_id')
+    )
+
+    athletes_stats = []
+    for enrollment in enrollments:
+        athlete = enrollment.athlete
+        athletes_stats.append({
+            'athlete_id': athlete.id,
+            'athlete_name': athlete.user.get_full_name(),
+            'athlete_role_id': role_ids.get(athlete.user_id) or None,
+            **summarize(by_athlete.get(athlete.id, {})),
+        })
+
+    return {
+        'overall': _sum_totals(by_athlete.values()),
+        'athletes': athletes_stats,
+    }
+
+
+def get_groups_stats(groups, start_date, end_date):
+    """Статистика посещаемости по набору групп: общая и по каждой группе"""
+    groups = list(groups)
+    by_group = aggregate_attendance(
+        AttendanceRecord.objects.filter(
+            group__in=groups, date__gte=start_date, date__lte=end_date
+        ),
+        'group',
+    )
+
+    groups_stats = [
+        {
+            'group_id': group.id,
+            'group_name': group.name,
+            **summarize(by_group.get(group.id, {})),
+        }
+        for group in groups
+    ]
+
+    return {
+        'overall': _sum_totals(by_group.values()),
+        'groups': groups_stats,
+    }
@@ -3,12 +3,11 @@ from rest_framework import serializers
 from apps.audit.models import AuditLog
 
 class AuditLogSerializer(serializers.ModelSerializer):
-    actor_name = serializers.CharField(source='actor.get_full_name', read_only=True)
-    target_type = serializers.CharField(source='content_type.model', read_only=True)
+    actor_name = serializers.CharField(source='user.get_full_name', read_only=True, default=None)
 
     class Meta:
         model = AuditLog
         fields = [
-            'id', 'action', 'timestamp', 'actor_name',
-            'target_type', 'target_id', 'details'
-        ]
\ No newline at end of file
+            'id', 'action', 'created_at', 'actor_name',
+            'ip_address', 'user_agent', 'details'
+        ]
@@ -4,34 +4,37 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.db.models import Q
 from .serializers import AuditLogSerializer
-from apps.audit.models import AuditLog
-from apps.users.models import UserRole
+from apps.audit.services import partitions
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def list_audit_logs(request):
-    """Список аудит-логов (только для админов)"""
+    """Список аудит-логов (только для админов)
+
+    Параметры: from, to (дата или дата-время), action, user_id, limit
+    (по умолчанию 100, не больше 500). Читаются только месяцы из диапазона.
+    """
     # Проверка ролей
     allowed_roles = ['admin_rb', 'moderator', 'committee_staff']
     if not request.user.roles.filter(role__in=allowed_roles).exists():
         return Response({"error": "Доступ запрещён"}, status=403)
 
-    # Фильтрация по городу (для committee_staff)
-    logs = AuditLog.objects.select_related('actor', 'content_type')
+    try:
+        start, end, conditions, limit = partitions.filters_from_params(request.query_params)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=400)
 
+    # Фильтрация по городу (для committee_staff)
     if request.user.roles.filter(role='committee_staff').exists():
         from apps.city_committee.models import CommitteeStaff
         try:
             staff = request.user.committee_role
-            # Логи только по организациям из города
-            org_ids = staff.city.organizations.values_list('id', flat=True)
-            logs = logs.filter(
-                Q(target_type__model='organization', target_id__in=org_ids) |
-                Q(actor__city=staff.city)
-            )
+            # Логи только пользователей из города
+            conditions &= Q(user__city=staff.city.name)
         except CommitteeStaff.DoesNotExist:
             return Response({"error": "Нет доступа к городу"}, status=403)
 
-    serializer = AuditLogSerializer(logs.order_by('-timestamp')[:100], many=True)
-    return Response(serializer.data)
\ No newline at end of file
+    logs = partitions.query_range(start, end, conditions, limit)
+    serializer = AuditLogSerializer(logs, many=True)
+    return Response(serializer.data)
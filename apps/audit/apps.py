@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AuditConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.audit'
+
+    def ready(self):
+        from apps.audit.services.partitions import connect_signals
+        connect_signals()  # Обнуление user_id в помесячных таблицах аудита при удалении пользователя
@@ -0,0 +1,71 @@
+# apps/audit/management/commands/prune_audit_logs.py
+"""
+Management команда — обслуживание помесячного хранения аудита
+Использование:
+    python manage.py prune_audit_logs                    # для cron, раз в сутки
+    python manage.py prune_audit_logs --retention-months 6
+    python manage.py prune_audit_logs --dry-run          # только показать устаревшие месяцы
+    python manage.py prune_audit_logs --partition        # PostgreSQL: перевести таблицу в секции
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.audit.services import partitions
+from apps.core.utils import partitioning
+
+
+class Command(BaseCommand):
+    help = 'Раскладывает аудит по месяцам и удаляет месяцы старше срока хранения'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retention-months',
+            type=int,
+            default=getattr(settings, 'AUDIT_RETENTION_MONTHS', 12),
+            help='Срок хранения в месяцах (по умолчанию AUDIT_RETENTION_MONTHS)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать, какие месяцы будут удалены',
+        )
+        parser.add_argument(
+            '--partition',
+            action='store_true',
+            help='Перевести audit_auditlog в помесячные секции (только PostgreSQL, '
+                 'блокирует таблицу на время копирования)',
+        )
+
+    def handle(self, *args, **options):
+        retention = options['retention_months']
+        if retention < 1:
+            raise CommandError('Срок хранения должен быть не меньше 1 месяца')
+
+        if options['dry_run']:
+            tables, cutoff = partitions.expired_tables(retention)
+            self.stdout.write(f'Будут удалены записи до {cutoff:%Y-%m}: {", ".join(tables) or "таблиц нет"}')
+            return
+
+        if options['partition']:
+            if not partitioning.is_supported():
+                raise CommandError('Секционирование поддерживается только на PostgreSQL')
+            try:
+                converted = partitions.enable_partitioning()
+            except RuntimeError as e:
+                raise CommandError(str(e))
+            self.stdout.write(self.style.SUCCESS(
+                '✓ Таблица аудита секционирована' if converted else 'Таблица аудита уже секционирована'
+            ))
+
+        if partitioning.is_partitioned(partitions.TABLE):
+            created = partitions.ensure_future_partitions()
+            if created:
+                self.stdout.write(f'  Создано секций: {len(created)}')
+        else:
+            for table, count in partitions.roll_closed_months().items():
+                self.stdout.write(f'  {table}: перенесено {count}')
+
+        tables, deleted = partitions.prune(retention)
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Удалено месяцев: {len(tables)}, отдельных записей: {deleted}'
+        ))
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 11:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='auditlog',
+            name='action',
+            field=models.CharField(choices=[('login', 'Вход'), ('role_assigned', 'Назначена роль'), ('org_verified', 'Организация подтверждена'), ('data_export', 'Экспорт данных'), ('2fa_enabled', 'Включена 2FA'), ('http_get', 'Запрос GET'), ('http_post', 'Запрос POST'), ('http_put', 'Запрос PUT'), ('http_patch', 'Запрос PATCH'), ('http_delete', 'Запрос DELETE')], max_length=50),
+        ),
+    ]
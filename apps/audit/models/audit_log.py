@@ -9,18 +9,32 @@ ACTION_CHOICES = [
     ('org_verified', 'Организация подтверждена'),
     ('data_export', 'Экспорт данных'),
     ('2fa_enabled', 'Включена 2FA'),
+    ('http_get', 'Запрос GET'),
+    ('http_post', 'Запрос POST'),
+    ('http_put', 'Запрос PUT'),
+    ('http_patch', 'Запрос PATCH'),
+    ('http_delete', 'Запрос DELETE'),
 ]
 
-class AuditLog(TimeStampedModel):
-    user = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True)
+class AuditLogBase(TimeStampedModel):
+    """Поля записи аудита; общие для AuditLog и моделей его помесячных таблиц
+    (см. apps.audit.services.partitions). Пользователь у них разный: у AuditLog —
+    внешний ключ, у помесячных моделей — просто user_id"""
     action = models.CharField(max_length=50, choices=ACTION_CHOICES)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.TextField(blank=True)
     details = models.JSONField(default=dict)
 
+    class Meta:
+        abstract = True
+
+
+class AuditLog(AuditLogBase):
+    user = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True)
+
     class Meta:
         db_table = 'audit_auditlog'
         indexes = [
             models.Index(fields=['user', 'action']),
             models.Index(fields=['created_at']),
-        ]
\ No newline at end of file
+        ]
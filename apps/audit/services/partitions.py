@@ -0,0 +1,323 @@
+# apps/audit/services/partitions.py
+"""
+Хранение аудита по месяцам и чтение только нужных месяцев.
+
+PostgreSQL: audit_auditlog переводится в секционированную по created_at
+таблицу (apps.core.utils.partitioning), секции — audit_auditlog_pYYYYMM.
+SQLite: секционирования нет, поэтому закрытые месяцы «скатываются» из
+audit_auditlog в отдельные таблицы audit_auditlog_pYYYYMM той же структуры,
+но без внешнего ключа на пользователя (roll_closed_months), а в основной
+таблице остаются свежие записи. Иначе удаление пользователя падало бы на
+ключе таблицы, о которой ORM не знает; вместо ON DELETE SET NULL user_id в
+помесячных таблицах обнуляется обработчиком удаления пользователя.
+
+Модели помесячных таблиц создаются на лету в собственном реестре приложений
+и вместо внешнего ключа имеют просто user_id: они не становятся обратной
+связью CustomUser, поэтому удаление пользователя не обращается к таблицам
+месяцев (в том числе уже удалённым). Условия по user__… query_range заменяет
+подзапросом по пользователям, а пользователей подставляет одним запросом.
+
+Для чтения диапазона времени query_range перебирает от новых к старым только
+источники, пересекающиеся с диапазоном (помесячные таблицы и основную), и
+останавливается, как только набрано limit записей и более старые месяцы не
+могут их вытеснить. Устаревшие месяцы удаляются целиком (prune).
+"""
+import re
+from datetime import datetime, time as dt_time, timedelta, timezone as dt_timezone
+
+from django.apps.registry import Apps
+from django.db import connection, models, transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from apps.audit.models import AuditLog
+from apps.audit.models.audit_log import AuditLogBase
+from apps.core.utils import partitioning
+from apps.users.models.user import CustomUser
+
+TABLE = AuditLog._meta.db_table
+
+_REFERENCES = re.compile(r'\s+REFERENCES\s+"[^"]+"\s*\("[^"]+"\)(\s+DEFERRABLE\s+INITIALLY\s+DEFERRED)?', re.I)
+
+_models = {}
+# Отдельный реестр: модели месяцев не видны в apps и не связаны с CustomUser
+_month_apps = Apps()
+
+
+def month_table_model(table):
+    """Модель (managed=False, только для чтения) помесячной таблицы аудита; одна на процесс"""
+    if table not in _models:
+        meta = type('Meta', (), {
+            'db_table': table, 'managed': False, 'app_label': 'audit', 'apps': _month_apps,
+        })
+        name = 'AuditLog' + table[len(TABLE):].replace('_', '').capitalize()
+        _models[table] = type(name, (AuditLogBase,), {
+            'Meta': meta,
+            '__module__': __name__,
+            'user_id': models.BigIntegerField(null=True),
+            'user': None,  # подставляется query_range
+        })
+    return _models[table]
+
+
+def _month_filters(filters):
+    """Условия Q для модели месяца: user__… → user_id или подзапрос по пользователям"""
+    children = []
+    for child in filters.children:
+        if isinstance(child, Q):
+            children.append(_month_filters(child))
+            continue
+        key, value = child
+        if key == 'user':
+            child = ('user_id', getattr(value, 'pk', value))
+        elif key.startswith('user__'):
+            lookup = key[len('user__'):]
+            first = lookup.split('__')[0]
+            if first in ('id', 'pk'):
+                child = ('user_id' + lookup[len(first):], value)
+            elif first in ('exact', 'in', 'isnull'):
+                child = ('user_id__' + lookup, value)
+            else:
+                child = ('user_id__in', CustomUser.objects.filter(**{lookup: value}).values('pk'))
+        children.append(child)
+    return Q(*children, _connector=filters.connector, _negated=filters.negated)
+
+
+def _attach_users(logs):
+    users = CustomUser.objects.in_bulk({log.user_id for log in logs if log.user_id})
+    for log in logs:
+        log.user = users.get(log.user_id)
+
+
+def _month_start_datetime(month):
+    # Границы секций PostgreSQL считаются в UTC (часовой пояс соединения Django)
+    return datetime.combine(month, dt_time.min, tzinfo=dt_timezone.utc)
+
+
+# === Список источников ===
+
+def _sqlite_month_tables():
+    prefix = f'{TABLE}_p'
+    with connection.cursor() as cursor:
+        names = connection.introspection.table_names(cursor)
+    tables = []
+    for name in names:
+        suffix = name[len(prefix):]
+        if name.startswith(prefix) and len(suffix) == 6 and suffix.isdigit():
+            tables.append((name, datetime(int(suffix[:4]), int(suffix[4:]), 1).date()))
+    return sorted(tables, key=lambda item: item[1])
+
+
+def month_tables():
+    """Помесячные таблицы: [(имя, первый день месяца)] по возрастанию"""
+    if partitioning.is_supported():
+        return partitioning.list_partitions(TABLE)
+    if connection.vendor == 'sqlite':
+        return _sqlite_month_tables()
+    return []
+
+
+def sources(start=None, end=None):
+    """Источники для диапазона [start, end) от новых к старым: [(модель, месяц или None)].
+
+    Месяц None — источник без границ по времени (основная таблица на SQLite,
+    несекционированная таблица, секция по умолчанию на PostgreSQL).
+    """
+    if partitioning.is_partitioned(TABLE):
+        names = set(partitioning.partitions_for_range(TABLE, start, end))
+        result = [
+            (month_table_model(name), month)
+            for name, month in reversed(partitioning.list_partitions(TABLE)) if name in names
+        ]
+        default = TABLE + partitioning.DEFAULT_PARTITION_SUFFIX
+        return result + [(month_table_model(default), None)]
+
+    result = [(AuditLog, None)]
+    for name, month in reversed(month_tables()):
+        if start is not None and partitioning.add_months(month, 1) <= partitioning.month_start(start):
+            continue
+        if end is not None and _month_start_datetime(month) >= end:
+            continue
+        result.append((month_table_model(name), month))
+    return result
+
+
+def query_range(start=None, end=None, filters=None, limit=100, select_related=('user',)):
+    """Последние limit записей аудита в диапазоне [start, end) с условием filters (Q).
+
+    Возвращает список, упорядоченный по created_at от новых к старым.
+    """
+    collected = []
+    for model, month in sources(start, end):
+        if month is not None and len(collected) >= limit:
+            # Все записи этого и более старых месяцев старше уже набранных
+            if collected[limit - 1].created_at >= _month_start_datetime(partitioning.add_months(month, 1)):
+                break
+        queryset = model.objects.all()
+        is_main = model is AuditLog
+        if select_related and is_main:
+            queryset = queryset.select_related(*select_related)
+        if start is not None:
+            queryset = queryset.filter(created_at__gte=start)
+        if end is not None:
+            queryset = queryset.filter(created_at__lt=end)
+        if filters is not None:
+            queryset = queryset.filter(filters if is_main else _month_filters(filters))
+        logs = list(queryset.order_by('-created_at', '-id')[:limit])
+        if select_related and 'user' in select_related and not is_main:
+            _attach_users(logs)
+        collected.extend(logs)
+        collected.sort(key=lambda log: (log.created_at, log.id), reverse=True)
+        del collected[limit:]
+    return collected
+
+
+def _parse_moment(value):
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f'Некорректная дата: {value}')
+        moment = datetime.combine(day, dt_time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def filters_from_params(params, max_limit=500):
+    """Разобрать параметры запроса from, to, action, user_id, limit.
+
+    Возвращает (start, end, Q, limit); ValueError — некорректное значение.
+    Дата без времени в to включается целиком.
+    """
+    start = _parse_moment(params['from']) if params.get('from') else None
+    end = None
+    if params.get('to'):
+        end = _parse_moment(params['to'])
+        if parse_datetime(params['to']) is None:
+            end += timedelta(days=1)
+    conditions = Q()
+    if params.get('action'):
+        conditions &= Q(action=params['action'])
+    if params.get('user_id'):
+        conditions &= Q(user_id=int(params['user_id']))
+    limit = min(max(int(params.get('limit', 100)), 1), max_limit)
+    return start, end, conditions, limit
+
+
+# === Обслуживание ===
+
+def _sqlite_month_schema(cursor, table):
+    """CREATE TABLE для таблицы месяца по схеме основной, без внешних ключей"""
+    cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = %s", [TABLE])
+    schema = _REFERENCES.sub('', cursor.fetchone()[0])
+    return schema.replace(f'CREATE TABLE "{TABLE}"', f'CREATE TABLE IF NOT EXISTS "{table}"', 1)
+
+
+def _sqlite_create_month_table(cursor, table):
+    """Таблица месяца по схеме основной (те же типы и ключ, без внешних ключей)"""
+    cursor.execute(_sqlite_month_schema(cursor, table))
+    cursor.execute(f'CREATE INDEX IF NOT EXISTS "{table}_created_at" ON "{table}" (created_at)')
+    cursor.execute(f'CREATE INDEX IF NOT EXISTS "{table}_user_action" ON "{table}" (user_id, action)')
+
+
+def _sqlite_drop_month_foreign_keys():
+    """Пересоздать без внешних ключей таблицы месяцев, созданные с ними раньше.
+
+    Возвращает имена пересозданных таблиц.
+    """
+    rebuilt = []
+    for table, _ in _sqlite_month_tables():
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = %s", [table])
+            if not _REFERENCES.search(cursor.fetchone()[0]):
+                continue
+            cursor.execute(f'ALTER TABLE "{table}" RENAME TO "{table}_old"')
+            cursor.execute(f'DROP INDEX IF EXISTS "{table}_created_at"')
+            cursor.execute(f'DROP INDEX IF EXISTS "{table}_user_action"')
+            _sqlite_create_month_table(cursor, table)
+            cursor.execute(f'INSERT INTO "{table}" SELECT * FROM "{table}_old"')
+            cursor.execute(f'DROP TABLE "{table}_old"')
+        rebuilt.append(table)
+    return rebuilt
+
+
+def roll_closed_months(now=None, batch_size=5000):
+    """SQLite: перенести записи закрытых месяцев в таблицы audit_auditlog_pYYYYMM.
+
+    Возвращает {имя таблицы: перенесено строк}.
+    """
+    if connection.vendor != 'sqlite':
+        return {}
+    _sqlite_drop_month_foreign_keys()
+    current = _month_start_datetime(partitioning.month_start(now or timezone.now()))
+    moved = {}
+    while True:
+        oldest = AuditLog.objects.filter(created_at__lt=current).order_by('created_at').values_list(
+            'created_at', flat=True
+        ).first()
+        if oldest is None:
+            return moved
+        month = partitioning.month_start(oldest)
+        table = partitioning.partition_name(TABLE, month)
+        month_end = _month_start_datetime(partitioning.add_months(month, 1))
+        ids = list(
+            AuditLog.objects.filter(created_at__lt=min(month_end, current))
+            .order_by('created_at').values_list('id', flat=True)[:batch_size]
+        )
+        id_list = ', '.join(str(int(log_id)) for log_id in ids)
+        with transaction.atomic(), connection.cursor() as cursor:
+            _sqlite_create_month_table(cursor, table)
+            cursor.execute(f'INSERT INTO "{table}" SELECT * FROM "{TABLE}" WHERE id IN ({id_list})')
+            cursor.execute(f'DELETE FROM "{TABLE}" WHERE id IN ({id_list})')
+        moved[table] = moved.get(table, 0) + len(ids)
+
+
+def enable_partitioning(months_ahead=3):
+    """PostgreSQL: перевести audit_auditlog в помесячные секции"""
+    return partitioning.convert_to_partitioned(TABLE, 'created_at', months_ahead)
+
+
+def ensure_future_partitions(months_ahead=3, now=None):
+    current = partitioning.month_start(now or timezone.now())
+    return partitioning.ensure_partitions(TABLE, current, partitioning.add_months(current, months_ahead))
+
+
+def expired_tables(retention_months, now=None):
+    """Помесячные таблицы старше retention_months месяцев (текущий месяц не считается)"""
+    cutoff = partitioning.add_months(partitioning.month_start(now or timezone.now()), -retention_months)
+    return [name for name, month in month_tables() if month < cutoff], cutoff
+
+
+def prune(retention_months, now=None):
+    """Удалить помесячные таблицы старше срока хранения и такие же записи
+    основной таблицы. Возвращает (удалённые таблицы, удалено строк)"""
+    tables, cutoff = expired_tables(retention_months, now)
+    with connection.cursor() as cursor:
+        for name in tables:
+            cursor.execute(f'DROP TABLE "{name}"')
+    # Записи, не попавшие в секции (не скатанные или в секции по умолчанию)
+    deleted = 0
+    boundary = _month_start_datetime(cutoff)
+    if partitioning.is_partitioned(TABLE):
+        deleted = month_table_model(TABLE + partitioning.DEFAULT_PARTITION_SUFFIX).objects.filter(
+            created_at__lt=boundary
+        ).delete()[0]
+    else:
+        deleted = AuditLog.objects.filter(created_at__lt=boundary).delete()[0]
+    return tables, deleted
+
+
+def _on_user_delete(sender, instance, **kwargs):
+    # ON DELETE SET NULL для помесячных таблиц SQLite, у которых нет внешнего ключа
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for table, _ in _sqlite_month_tables():
+            cursor.execute(f'UPDATE "{table}" SET user_id = NULL WHERE user_id = %s', [instance.pk])
+
+
+def connect_signals():
+    post_delete.connect(_on_user_delete, sender=CustomUser, dispatch_uid='audit_month_tables_user_delete')
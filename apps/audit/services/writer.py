@@ -0,0 +1,220 @@
+# apps/audit/services/writer.py
+"""
+Буферизованная запись аудита.
+
+Запросы и события аналитики не пишут AuditLog сами: запись кладётся в
+кольцевой буфер процесса (record — это append в deque под блокировкой),
+а фоновый поток-писатель раз в AUDIT_FLUSH_INTERVAL секунд или при
+накоплении AUDIT_BATCH_SIZE записей сохраняет их одним bulk_create.
+Буфер ограничен AUDIT_BUFFER_SIZE: при переполнении вытесняются самые
+старые записи и растёт счётчик dropped — аудит не должен ни тормозить
+запросы, ни съедать память, если БД недоступна. Счётчики доступны через
+stats(). При AUDIT_ASYNC = False записи сохраняются сразу (тесты, команды).
+"""
+import atexit
+import ipaddress
+import logging
+import os
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+BUFFER_SIZE = getattr(settings, 'AUDIT_BUFFER_SIZE', 10000)
+BATCH_SIZE = getattr(settings, 'AUDIT_BATCH_SIZE', 500)
+FLUSH_INTERVAL = getattr(settings, 'AUDIT_FLUSH_INTERVAL', 1.0)
+ASYNC = getattr(settings, 'AUDIT_ASYNC', True)
+
+
+class AuditWriter:
+    """Кольцевой буфер записей аудита и фоновый поток, сохраняющий их пачками"""
+
+    def __init__(self, buffer_size=BUFFER_SIZE, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.buffer = deque(maxlen=buffer_size)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.counters = {'recorded': 0, 'written': 0, 'dropped': 0, 'failed': 0, 'flushes': 0}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def record(self, **fields):
+        """Добавить запись (поля AuditLog) в буфер. Не обращается к БД"""
+        fields.setdefault('created_at', timezone.now())
+        with self._lock:
+            if len(self.buffer) == self.buffer.maxlen:
+                self.counters['dropped'] += 1
+            self.buffer.append(fields)
+            self.counters['recorded'] += 1
+            pending = len(self.buffer)
+        self._ensure_thread()
+        if pending >= self.batch_size:
+            self._wakeup.set()
+
+    def _take(self):
+        with self._lock:
+            count = min(self.batch_size, len(self.buffer))
+            return [self.buffer.popleft() for _ in range(count)]
+
+    def flush(self):
+        """Сохранить всё накопленное. Возвращает число записанных строк"""
+        from apps.audit.models import AuditLog
+
+        written = 0
+        with self._flush_lock:
+            while True:
+                batch = self._take()
+                if not batch:
+                    break
+                try:
+                    AuditLog.objects.bulk_create([AuditLog(**fields) for fields in batch])
+                    saved = len(batch)
+                except Exception:
+                    logger.exception('Не удалось сохранить пачку из %s записей аудита, запись по одной', len(batch))
+                    saved = self._write_each(batch)
+                    if not saved:
+                        # Ни одна запись не сохранилась — вероятно, недоступна БД
+                        break
+                written += saved
+                with self._lock:
+                    self.counters['written'] += saved
+                    self.counters['flushes'] += 1
+        return written
+
+    def _write_each(self, batch):
+        """Сохранить пачку по одной записи: ошибочная строка не теряет остальные"""
+        from apps.audit.models import AuditLog
+
+        saved = 0
+        for fields in batch:
+            try:
+                AuditLog.objects.create(**fields)
+                saved += 1
+            except Exception:
+                logger.warning('Запись аудита отброшена: %r', fields, exc_info=True)
+                with self._lock:
+                    self.counters['failed'] += 1
+        return saved
+
+    def _ensure_thread(self):
+        # После fork (gunicorn --preload) поток родителя в дочернем процессе не работает
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            close_old_connections()
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
+
+    def stats(self):
+        with self._lock:
+            return {**self.counters, 'pending': len(self.buffer)}
+
+
+_writer = AuditWriter()
+
+
+def get_writer():
+    return _writer
+
+
+def record(user=None, action='', ip_address=None, user_agent='', details=None, **fields):
+    """Записать событие аудита (в буфер или сразу, если AUDIT_ASYNC = False)"""
+    entry = {
+        'user_id': getattr(user, 'pk', user),
+        'action': action[:50],
+        'ip_address': ip_address or None,
+        'user_agent': user_agent or '',
+        'details': details or {},
+        **fields,
+    }
+    if not ASYNC:
+        from apps.audit.models import AuditLog
+        AuditLog.objects.create(**entry)
+        return
+    _writer.record(**entry)
+
+
+def stats():
+    return _writer.stats()
+
+
+def flush():
+    return _writer.flush()
+
+
+def _parse_ip(value):
+    """Нормализованный IP-адрес или None, если value — не адрес"""
+    try:
+        return str(ipaddress.ip_address((value or '').strip()))
+    except ValueError:
+        return None
+
+
+def _trusted_proxies():
+    networks = []
+    for value in getattr(settings, 'AUDIT_TRUSTED_PROXIES', ()):
+        try:
+            networks.append(ipaddress.ip_network(value, strict=False))
+        except ValueError:
+            logger.warning('Некорректный адрес в AUDIT_TRUSTED_PROXIES: %s', value)
+    return networks
+
+
+def _is_trusted(ip, networks):
+    address = ipaddress.ip_address(ip)
+    return any(address in network for network in networks)
+
+
+def client_ip(request):
+    """IP клиента.
+
+    X-Forwarded-For читается, только если запрос пришёл от доверенного
+    прокси (AUDIT_TRUSTED_PROXIES): адреса перебираются справа налево, и
+    клиентом считается первый адрес не из доверенных. Значения, не
+    являющиеся IP-адресом, отбрасываются — клиент не может подставить
+    произвольный адрес или строку, ломающую запись аудита.
+    """
+    remote = _parse_ip(request.META.get('REMOTE_ADDR'))
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+    if remote is None or not forwarded:
+        return remote
+    networks = _trusted_proxies()
+    if not _is_trusted(remote, networks):
+        return remote
+    for value in reversed(forwarded.split(',')):
+        ip = _parse_ip(value)
+        if ip is None:
+            # Дальше — значения, которые доверенный прокси не проверял
+            break
+        if not _is_trusted(ip, networks):
+            return ip
+    return remote
+
+
+@atexit.register
+def _flush_on_exit():
+    if _writer.buffer:
+        try:
+            _writer.flush()
+        except Exception:
+            pass
+        finally:
+            connection.close()
@@ -1,6 +1,6 @@
 # apps/city_committee/admin.py
 from django.contrib import admin
-from .models import CommitteeStaff, CityPermission, ManagedEvent, CommitteeRegistrationCode
+from .models import CommitteeStaff, CityPermission, ManagedEvent, CommitteeRegistrationCode, AnalyticsCubeRefresh, GtoPlan, MobilitySnapshot
 
 
 @admin.register(CommitteeStaff)
@@ -65,3 +65,40 @@ class CommitteeRegistrationCodeAdmin(admin.ModelAdmin):
         if obj:  # Если объект уже существует
             readonly.append('code')
         return readonly
+
+
+@admin.register(AnalyticsCubeRefresh)
+class AnalyticsCubeRefreshAdmin(admin.ModelAdmin):
+    """Журнал обновлений куба аналитики (только просмотр)"""
+    list_display = ('started_at', 'finished_at', 'full', 'cells')
+    list_filter = ('full',)
+    date_hierarchy = 'started_at'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(GtoPlan)
+class GtoPlanAdmin(admin.ModelAdmin):
+    """Админка для планов ГТО"""
+    list_display = ('city', 'year', 'level', 'target', 'updated_at')
+    list_filter = ('year', 'level')
+    search_fields = ('city__name',)
+    raw_id_fields = ('city',)
+    readonly_fields = ('created_at', 'updated_at')
+
+
+@admin.register(MobilitySnapshot)
+class MobilitySnapshotAdmin(admin.ModelAdmin):
+    """Расчёты переходов спортсменов (только просмотр)"""
+    list_display = ('period_start', 'period_end', 'athletes', 'enrollments', 'created_at', 'finished_at')
+    date_hierarchy = 'created_at'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
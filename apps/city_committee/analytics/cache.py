@@ -0,0 +1,40 @@
+# apps/city_committee/analytics/cache.py
+"""
+Кэш отчётов аналитики.
+
+Отчёт считается по городу (или по всей республике) за период, поэтому ключ
+составляется из имени отчёта, id города и границ периода. Кэш задаётся
+ANALYTICS_CACHE (алиас из CACHES), время жизни — ANALYTICS_CACHE_TIMEOUT.
+"""
+from django.conf import settings
+from django.core.cache import caches
+
+
+def _cache():
+    return caches[getattr(settings, 'ANALYTICS_CACHE', 'default')]
+
+
+def report_key(name, city=None, start_date=None, end_date=None, **params):
+    city_id = getattr(city, 'pk', city)
+    parts = [
+        'analytics', name, str(city_id or 'all'),
+        start_date.isoformat() if start_date else '-',
+        end_date.isoformat() if end_date else '-',
+    ]
+    parts += [f'{key}={params[key]}' for key in sorted(params)]
+    return ':'.join(parts)
+
+
+def cached_report(name, compute, city=None, start_date=None, end_date=None, **params):
+    """Результат compute() из кэша или посчитанный и сохранённый"""
+    key = report_key(name, city, start_date, end_date, **params)
+    cache = _cache()
+    result = cache.get(key)
+    if result is None:
+        result = compute()
+        cache.set(key, result, getattr(settings, 'ANALYTICS_CACHE_TIMEOUT', 15 * 60))
+    return result
+
+
+def invalidate_report(name, city=None, start_date=None, end_date=None, **params):
+    _cache().delete(report_key(name, city, start_date, end_date, **params))
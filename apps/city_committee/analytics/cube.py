@@ -0,0 +1,280 @@
+# apps/city_committee/analytics/cube.py
+"""
+Куб аналитики спорткомитета: город × вид спорта × возраст × пол × месяц.
+
+Показатели ячейки (AnalyticsCubeCell):
+- athletes — спортсмены, зарегистрированные к концу месяца (по городу
+  и основному виду спорта спортсмена);
+- enrollments — зачисления в группы, действующие на конец месяца (город
+  организации, вид спорта группы);
+- new_athletes, new_enrollments — появившиеся за месяц;
+- attendance_total, attendance_present — отметки посещаемости за месяц;
+- event_participants — спортсмены, зарегистрированные на мероприятия месяца.
+Возраст считается на последний день месяца.
+
+Месяц пересчитывается целиком: четыре сгруппированных запроса, затем строки
+месяца заменяются одной транзакцией. Инкрементальное обновление находит
+изменённые с прошлого обновления записи (updated_at) и пересчитывает только
+затронутые месяцы: для показателей «на конец месяца» — от месяца изменения
+до текущего, для событийных — только месяц события. Удаления по updated_at
+не видны, поэтому раз в неделю стоит делать полное обновление (--full).
+
+Дашборды читают куб суммированием по индексу (city, month, …) — без
+обращения к исходным таблицам.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import CharField, Count, F, Max, Min, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.athletes.models import AthleteProfile
+from apps.attendance.models import AttendanceRecord
+from apps.city_committee.models import AnalyticsCubeCell, AnalyticsCubeRefresh
+from apps.core.utils import partitioning
+from apps.events.models import EventRegistration
+from apps.training.models import Enrollment
+
+from .population import AGE_BUCKETS, UNKNOWN, age_bucket_expression, period_bounds
+
+# Показатели «на конец месяца» не суммируются по месяцам
+STOCK_MEASURES = ('athletes', 'enrollments')
+FLOW_MEASURES = (
+    'new_athletes', 'new_enrollments', 'attendance_total', 'attendance_present', 'event_participants',
+)
+MEASURES = STOCK_MEASURES + FLOW_MEASURES
+DIMENSIONS = ('city', 'sport', 'age_bucket', 'gender', 'month')
+
+CREATE_BATCH_SIZE = 1000
+
+
+def month_end(month):
+    """Последний день месяца"""
+    return partitioning.add_months(month, 1) - timedelta(days=1)
+
+
+def _cells_for(queryset, city_field, sport_field, user_field, reference_date, **aggregates):
+    rows = (
+        queryset.order_by()
+        .annotate(
+            cube_city=F(city_field),
+            cube_sport=F(sport_field),
+            cube_age=age_bucket_expression(reference_date, f'{user_field}__birth_date'),
+            cube_gender=Coalesce(f'{user_field}__gender', Value('', output_field=CharField())),
+        )
+        .values('cube_city', 'cube_sport', 'cube_age', 'cube_gender')
+        .annotate(**aggregates)
+    )
+    for row in rows:
+        key = (row.pop('cube_city'), row.pop('cube_sport'), row.pop('cube_age'), row.pop('cube_gender'))
+        yield key, row
+
+
+def compute_month(month):
+    """Ячейки куба за месяц: {(city_id, sport_id, age_bucket, gender): {показатель: значение}}"""
+    last_day = month_end(month)
+    start, end = period_bounds(month, last_day)
+    cells = {}
+
+    def merge(rows):
+        for key, values in rows:
+            cell = cells.setdefault(key, dict.fromkeys(MEASURES, 0))
+            for measure, value in values.items():
+                cell[measure] += value or 0
+
+    merge(_cells_for(
+        AthleteProfile.objects.filter(created_at__lt=end),
+        'city_id', 'main_sport_id', 'user', last_day,
+        athletes=Count('id'),
+        new_athletes=Count('id', filter=Q(created_at__gte=start)),
+    ))
+    # Зачисление действует на конец месяца, если началось до него и
+    # не завершено (или завершено позже — по дате изменения статуса)
+    enrollments = (
+        Enrollment.objects
+        .annotate(started=Coalesce('joined_at', 'created_at'))
+        .filter(started__lt=end)
+        .filter(Q(status='active') | Q(status='left', updated_at__gte=end))
+    )
+    merge(_cells_for(
+        enrollments, 'group__organization__city_id', 'group__sport_id', 'athlete__user', last_day,
+        enrollments=Count('id'),
+        new_enrollments=Count('id', filter=Q(started__gte=start)),
+    ))
+    merge(_cells_for(
+        AttendanceRecord.objects.filter(date__gte=month, date__lte=last_day),
+        'group__organization__city_id', 'group__sport_id', 'athlete__user', last_day,
+        attendance_total=Count('id'),
+        attendance_present=Count('id', filter=Q(status='present')),
+    ))
+    merge(_cells_for(
+        EventRegistration.objects.filter(
+            registration_type='athlete',
+            athlete__isnull=False,
+            status__in=('registered', 'confirmed'),
+            event__start_date__gte=start,
+            event__start_date__lt=end,
+        ).exclude(event__status__in=('draft', 'cancelled')),
+        'event__city_id', 'athlete__main_sport_id', 'athlete__user', last_day,
+        event_participants=Count('athlete', distinct=True),
+    ))
+    return cells
+
+
+@transaction.atomic
+def refresh_month(month):
+    """Пересчитать месяц и заменить его строки в кубе. Возвращает число ячеек"""
+    month = partitioning.month_start(month)
+    cells = compute_month(month)
+    AnalyticsCubeCell.objects.filter(month=month).delete()
+    AnalyticsCubeCell.objects.bulk_create(
+        [
+            AnalyticsCubeCell(
+                city_id=city_id, sport_id=sport_id, age_bucket=age_bucket, gender=gender,
+                month=month, **values
+            )
+            for (city_id, sport_id, age_bucket, gender), values in cells.items()
+        ],
+        batch_size=CREATE_BATCH_SIZE,
+    )
+    return len(cells)
+
+
+def _month_of(value):
+    if value is None:
+        return None
+    if hasattr(value, 'tzinfo'):
+        value = timezone.localtime(value).date() if timezone.is_aware(value) else value.date()
+    return partitioning.month_start(value)
+
+
+def first_data_month():
+    """Самый ранний месяц, за который есть данные для куба"""
+    candidates = [
+        AthleteProfile.objects.aggregate(value=Min('created_at'))['value'],
+        Enrollment.objects.aggregate(value=Min(Coalesce('joined_at', 'created_at')))['value'],
+        AttendanceRecord.objects.aggregate(value=Min('date'))['value'],
+    ]
+    months = [_month_of(value) for value in candidates if value is not None]
+    return min(months) if months else None
+
+
+def dirty_months(since, current):
+    """Месяцы, затронутые изменениями после since (по updated_at), до current включительно"""
+    stock_from = [
+        AthleteProfile.objects.filter(Q(updated_at__gte=since) | Q(user__updated_at__gte=since))
+        .aggregate(value=Min('created_at'))['value'],
+        Enrollment.objects.filter(Q(updated_at__gte=since) | Q(athlete__user__updated_at__gte=since))
+        .aggregate(value=Min(Coalesce('joined_at', 'created_at')))['value'],
+    ]
+    months = {current}
+    stock_months = [_month_of(value) for value in stock_from if value is not None]
+    if stock_months:
+        month = min(stock_months)
+        while month <= current:
+            months.add(month)
+            month = partitioning.add_months(month, 1)
+    for day in (
+        AttendanceRecord.objects.filter(updated_at__gte=since)
+        .order_by().values_list('date', flat=True).distinct()
+    ):
+        months.add(partitioning.month_start(day))
+    for start_date in (
+        EventRegistration.objects.filter(Q(updated_at__gte=since) | Q(event__updated_at__gte=since))
+        .order_by().values_list('event__start_date', flat=True).distinct()
+    ):
+        months.add(_month_of(start_date))
+    return sorted(month for month in months if month <= current)
+
+
+def refresh(full=False, months=None, now=None):
+    """Обновить куб.
+
+    full — пересчитать всю историю; months — пересчитать последние N месяцев;
+    иначе — инкрементально по изменениям с прошлого обновления (первый запуск
+    строит куб целиком). Возвращает запись AnalyticsCubeRefresh.
+    """
+    started_at = timezone.now()
+    current = partitioning.month_start(timezone.localdate(now) if now else timezone.localdate())
+    last = AnalyticsCubeRefresh.objects.filter(finished_at__isnull=False).first()
+
+    if full or last is None:
+        first = first_data_month()
+        selected = []
+        month = first
+        while month is not None and month <= current:
+            selected.append(month)
+            month = partitioning.add_months(month, 1)
+        full = True
+    elif months:
+        selected = [partitioning.add_months(current, -offset) for offset in reversed(range(months))]
+    else:
+        selected = dirty_months(last.started_at, current)
+
+    log = AnalyticsCubeRefresh.objects.create(started_at=started_at, full=full)
+    cells = 0
+    for month in selected:
+        cells += refresh_month(month)
+    if full:
+        # Месяцы без данных, оставшиеся от прошлых построений
+        AnalyticsCubeCell.objects.exclude(month__in=selected).delete()
+    log.months = [month.isoformat() for month in selected]
+    log.cells = cells
+    log.finished_at = timezone.now()
+    log.save(update_fields=['months', 'cells', 'finished_at', 'updated_at'])
+    return log
+
+
+# === Чтение ===
+
+def cube_queryset(city=None):
+    queryset = AnalyticsCubeCell.objects.all()
+    if city is not None:
+        queryset = queryset.filter(city=city)
+    return queryset
+
+
+def latest_month(city=None):
+    return cube_queryset(city).aggregate(value=Max('month'))['value']
+
+
+def snapshot(city=None, month=None, group_by=()):
+    """Показатели «на конец месяца» (по умолчанию последнего построенного).
+
+    Без group_by — словарь показателей, иначе список строк с полями group_by.
+    """
+    month = month or latest_month(city)
+    queryset = cube_queryset(city).filter(month=month)
+    return _aggregate(queryset, group_by, MEASURES)
+
+
+def series(city=None, start_month=None, end_month=None, group_by=()):
+    """Показатели по месяцам диапазона: список строк с month и полями group_by"""
+    queryset = cube_queryset(city)
+    if start_month:
+        queryset = queryset.filter(month__gte=partitioning.month_start(start_month))
+    if end_month:
+        queryset = queryset.filter(month__lte=partitioning.month_start(end_month))
+    return _aggregate(queryset, ('month',) + tuple(group_by), MEASURES, order_by=('month',))
+
+
+def _aggregate(queryset, group_by, measures, order_by=()):
+    aggregates = {measure: Coalesce(Sum(measure), 0) for measure in measures}
+    if not group_by:
+        return queryset.aggregate(**aggregates)
+    return list(
+        queryset.order_by(*order_by).values(*group_by).annotate(**aggregates)
+    )
+
+
+def age_distribution(city=None, month=None):
+    """Спортсмены по возрастным группам на конец месяца: {метка: count}"""
+    counts = {row['age_bucket']: row['athletes'] for row in snapshot(city, month, ('age_bucket',))}
+    distribution = {label: counts.get(label, 0) for label, _, _ in AGE_BUCKETS}
+    distribution[UNKNOWN] = counts.get(UNKNOWN, 0)
+    return distribution
+
+
+def last_refresh():
+    return AnalyticsCubeRefresh.objects.filter(finished_at__isnull=False).first()
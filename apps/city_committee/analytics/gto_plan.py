@@ -0,0 +1,212 @@
+# apps/city_committee/analytics/gto_plan.py
+"""
+ГТО: план и факт по городу, организациям и ступеням.
+
+Факт — число знаков ГТО (GtoResult) с датой выполнения в году. Данные
+собираются сгруппированными запросами в матрицы «ступень × месяц» и
+«организация × месяц», дальше всё считается векторно в NumPy:
+- накопленный итог по месяцам (cumsum);
+- темп — среднее за последние TREND_MONTHS завершённых месяцев (если
+  завершённых месяцев ещё нет — темп по прошедшей части года);
+- прогноз на конец года — факт + темп × оставшиеся месяцы;
+- выполнение плана и прогноз выполнения в процентах.
+План задаётся GtoPlan по ступеням или общей цифрой на город. Организация
+спортсмена — по активным зачислениям (спортсмен в двух организациях
+учитывается в обеих). Отчёт кэшируется по городу, году и организации.
+"""
+from datetime import date
+from calendar import monthrange
+
+import numpy as np
+from django.db.models import Count, Sum
+from django.db.models.functions import ExtractMonth
+from django.utils import timezone
+
+from apps.achievements.models import GtoResult
+from apps.achievements.models.gto_result import GTO_BADGE_CHOICES, GTO_LEVEL_CHOICES
+from apps.city_committee.models import GtoPlan
+from apps.organizations.models import Organization
+
+from .cache import cached_report
+from .population import MONTH_LABELS
+
+LEVELS = [code for code, _ in GTO_LEVEL_CHOICES]
+LEVEL_LABELS = dict(GTO_LEVEL_CHOICES)
+BADGES = [code for code, _ in GTO_BADGE_CHOICES]
+TREND_MONTHS = 3
+
+
+def results_queryset(city=None, year=None, organization=None):
+    queryset = GtoResult.objects.filter(
+        completion_date__gte=date(year, 1, 1), completion_date__lte=date(year, 12, 31)
+    )
+    if city is not None:
+        queryset = queryset.filter(athlete__city=city)
+    if organization is not None:
+        queryset = queryset.filter(
+            athlete__enrollments__group__organization=organization,
+            athlete__enrollments__status='active',
+        )
+    return queryset
+
+
+def _matrix(queryset, row_field, column_field, rows, columns, **annotate):
+    """Матрица счётчиков rows × columns из одного GROUP BY"""
+    matrix = np.zeros((len(rows), len(columns)), dtype=np.int64)
+    row_index = {value: index for index, value in enumerate(rows)}
+    column_index = {value: index for index, value in enumerate(columns)}
+    values = (
+        queryset.order_by()
+        .annotate(**annotate)
+        .values(row_field, column_field)
+        .annotate(count=Count('id', distinct=True))
+    )
+    for row in values:
+        if row[row_field] in row_index and row[column_field] in column_index:
+            matrix[row_index[row[row_field]], column_index[row[column_field]]] = row['count']
+    return matrix
+
+
+def elapsed_months(year, today=None):
+    """Сколько месяцев года прошло на today (дробное, 0…12)"""
+    today = today or timezone.localdate()
+    if year < today.year:
+        return 12.0
+    if year > today.year:
+        return 0.0
+    return today.month - 1 + today.day / monthrange(today.year, today.month)[1]
+
+
+def project(monthly, elapsed):
+    """Прогноз на конец года для каждой строки матрицы monthly (n × 12).
+
+    Возвращает (прогноз, темп в месяц) — векторы длины n.
+    """
+    monthly = np.asarray(monthly, dtype=float)
+    fact = monthly.sum(axis=1)
+    if elapsed >= 12:
+        return fact, np.zeros_like(fact)
+    complete = int(elapsed)
+    if complete:
+        velocity = monthly[:, max(complete - TREND_MONTHS, 0):complete].mean(axis=1)
+    elif elapsed > 0:
+        velocity = fact / elapsed
+    else:
+        velocity = np.zeros_like(fact)
+    return fact + velocity * (12 - elapsed), velocity
+
+
+def _percent(values, plan):
+    values = np.asarray(values, dtype=float)
+    plan = np.asarray(plan, dtype=float)
+    result = np.zeros_like(values)
+    np.divide(values * 100, plan, out=result, where=plan > 0)
+    return np.round(result, 1)
+
+
+def plan_targets(city=None, year=None):
+    """План на год: ({ступень: план}, общий план или None)"""
+    queryset = GtoPlan.objects.filter(year=year)
+    if city is not None:
+        queryset = queryset.filter(city=city)
+    targets = dict(queryset.order_by().values('level').annotate(total=Sum('target')).values_list('level', 'total'))
+    return {level: targets.get(level, 0) for level in LEVELS}, targets.get('')
+
+
+def gto_plan_report(city=None, year=None, organization=None, today=None):
+    """Отчёт «План ГТО» за год (без кэша)"""
+    today = today or timezone.localdate()
+    year = year or today.year
+    results = results_queryset(city, year, organization)
+    elapsed = elapsed_months(year, today)
+
+    by_level = _matrix(results, 'level', 'month', LEVELS, list(range(1, 13)), month=ExtractMonth('completion_date'))
+    badges = _matrix(results, 'level', 'badge', LEVELS, BADGES)
+    level_plan, city_plan = plan_targets(city, year) if organization is None else ({level: 0 for level in LEVELS}, None)
+    plan_vector = np.array([level_plan[level] for level in LEVELS])
+
+    level_projected, level_velocity = project(by_level, elapsed)
+    level_fact = by_level.sum(axis=1)
+
+    monthly = by_level.sum(axis=0)
+    total_projected, total_velocity = project(monthly[np.newaxis, :], elapsed)
+    total_plan = city_plan if city_plan is not None else int(plan_vector.sum())
+    cumulative = np.cumsum(monthly)
+    plan_cumulative = np.round(total_plan * np.arange(1, 13) / 12).astype(int)
+
+    levels = []
+    for index, level in enumerate(LEVELS):
+        levels.append({
+            'level': level,
+            'label': LEVEL_LABELS[level],
+            'plan': int(plan_vector[index]),
+            'fact': int(level_fact[index]),
+            'projected': int(round(level_projected[index])),
+            'velocity': round(float(level_velocity[index]), 1),
+            'attainment': float(_percent(level_fact[index], plan_vector[index])),
+            'projected_attainment': float(_percent(level_projected[index], plan_vector[index])),
+            'badges': dict(zip(BADGES, badges[index].tolist())),
+            'monthly': by_level[index].tolist(),
+        })
+
+    organizations = []
+    if organization is None:
+        org_results = results.filter(athlete__enrollments__status='active')
+        org_field = 'athlete__enrollments__group__organization'
+        org_ids = list(
+            org_results.order_by().values_list(org_field, flat=True).distinct()
+        )
+        if org_ids:
+            by_org = _matrix(org_results, org_field, 'month', org_ids, list(range(1, 13)),
+                             month=ExtractMonth('completion_date'))
+            org_badges = _matrix(org_results, org_field, 'badge', org_ids, BADGES)
+            org_projected, _ = project(by_org, elapsed)
+            names = dict(Organization.objects.filter(id__in=org_ids).values_list('id', 'name'))
+            for index, org_id in enumerate(org_ids):
+                organizations.append({
+                    'id': org_id,
+                    'name': names.get(org_id, ''),
+                    'fact': int(by_org[index].sum()),
+                    'projected': int(round(org_projected[index])),
+                    'badges': dict(zip(BADGES, org_badges[index].tolist())),
+                })
+            organizations.sort(key=lambda row: (-row['fact'], row['name']))
+
+    fact = int(monthly.sum())
+    return {
+        'city': city.name if city is not None else None,
+        'organization': organization.name if organization is not None else None,
+        'year': year,
+        'as_of': today.isoformat(),
+        'totals': {
+            'plan': total_plan,
+            'fact': fact,
+            'projected': int(round(total_projected[0])),
+            'velocity': round(float(total_velocity[0]), 1),
+            'attainment': float(_percent(fact, total_plan)),
+            'projected_attainment': float(_percent(total_projected[0], total_plan)),
+            'badges': dict(zip(BADGES, badges.sum(axis=0).tolist())),
+        },
+        'monthly': [
+            {
+                'month': f'{year}-{index + 1:02d}',
+                'label': MONTH_LABELS[index],
+                'count': int(monthly[index]),
+                'cumulative': int(cumulative[index]),
+                'plan_cumulative': int(plan_cumulative[index]),
+            }
+            for index in range(12)
+        ],
+        'levels': levels,
+        'organizations': organizations,
+    }
+
+
+def get_gto_plan_report(city=None, year=None, organization=None):
+    """Отчёт «План ГТО» с кэшированием по городу, году и организации"""
+    year = year or timezone.localdate().year
+    return cached_report(
+        'gto_plan', lambda: gto_plan_report(city, year, organization),
+        city, date(year, 1, 1), date(year, 12, 31),
+        organization=getattr(organization, 'pk', ''),
+    )
@@ -0,0 +1,279 @@
+# apps/city_committee/analytics/mobility.py
+"""
+Мобильность спортсменов: переходы между организациями, группами и городами.
+
+История зачислений (Enrollment в статусах active и left) читается одним
+проходом, упорядоченным по спортсмену и дате начала зачисления. Чтение
+идёт порциями по ATHLETE_CHUNK_SIZE спортсменов (keyset по athlete_id),
+каждая порция содержит полные истории своих спортсменов, поэтому в памяти
+одновременно только одна порция и счётчики переходов — их число ограничено
+числом пар организаций и групп, а не числом спортсменов.
+
+Для каждого спортсмена зачисления перебираются по дате начала:
+- предшественник зачисления — последнее ещё не использованное завершённое
+  (left) зачисление, завершившееся не раньше чем за TRANSFER_WINDOW_DAYS до
+  начала нового и не позже чем через TRANSFER_WINDOW_DAYS после него (новая
+  секция часто оформляется до ухода из старой); ушедший задолго до нового
+  зачисления считается выбывшим, а новое зачисление — приходом;
+- нет предшественника — entry (первое зачисление или ещё одна секция);
+- та же организация — internal (группа → группа), другая — transfer
+  (организация → организация, города откуда и куда — для межгородских);
+- завершённое зачисление, так и не ставшее предшественником, — dropout.
+Переход относится к периоду по дате начала нового зачисления, уход — по
+дате завершения (updated_at зачисления в статусе left).
+
+Результат сохраняется в MobilitySnapshot/MobilityTransition; дашборды
+читают последний расчёт.
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.city_committee.models import MobilitySnapshot, MobilityTransition
+from apps.organizations.models import Organization
+from apps.training.models import Enrollment, TrainingGroup
+from apps.geography.models import City
+
+from .population import period_bounds
+
+ATHLETE_CHUNK_SIZE = 2000
+CREATE_BATCH_SIZE = 1000
+TRANSFER_WINDOW_DAYS = 30
+KEEP_SNAPSHOTS = 3
+
+FIELDS = ('athlete_id', 'group_id', 'organization_id', 'city_id', 'status', 'started', 'left_at')
+
+
+def _enrollments():
+    return (
+        Enrollment.objects
+        .filter(status__in=('active', 'left'))
+        .annotate(
+            started=Coalesce('joined_at', 'created_at'),
+            left_at=F('updated_at'),
+            organization_id=F('group__organization_id'),
+            city_id=F('group__organization__city_id'),
+        )
+    )
+
+
+def iter_histories(chunk_size=ATHLETE_CHUNK_SIZE):
+    """Истории зачислений по спортсменам: (athlete_id, [dict зачисления по дате начала])"""
+    last_athlete = 0
+    while True:
+        athlete_ids = list(
+            Enrollment.objects.filter(status__in=('active', 'left'), athlete_id__gt=last_athlete)
+            .order_by('athlete_id').values_list('athlete_id', flat=True).distinct()[:chunk_size]
+        )
+        if not athlete_ids:
+            return
+        rows = (
+            _enrollments()
+            .filter(athlete_id__gte=athlete_ids[0], athlete_id__lte=athlete_ids[-1])
+            .order_by('athlete_id', 'started', 'id')
+            .values_list(*FIELDS)
+        )
+        current, history = None, []
+        for row in rows:
+            enrollment = dict(zip(FIELDS, row))
+            if enrollment['athlete_id'] != current:
+                if history:
+                    yield current, history
+                current, history = enrollment['athlete_id'], []
+            history.append(enrollment)
+        if history:
+            yield current, history
+        last_athlete = athlete_ids[-1]
+
+
+def transitions(history, window=timedelta(days=TRANSFER_WINDOW_DAYS)):
+    """Переходы одного спортсмена: [(вид, откуда, куда, дата)], откуда/куда — зачисления или None"""
+    events = []
+    finished = []  # завершённые зачисления, ещё не ставшие предшественниками
+    for enrollment in history:
+        predecessor = None
+        for candidate in reversed(finished):
+            if enrollment['started'] - window <= candidate['left_at'] <= enrollment['started'] + window:
+                predecessor = candidate
+                break
+        if predecessor is None:
+            events.append(('entry', None, enrollment, enrollment['started']))
+        else:
+            finished.remove(predecessor)
+            kind = 'internal' if predecessor['organization_id'] == enrollment['organization_id'] else 'transfer'
+            events.append((kind, predecessor, enrollment, enrollment['started']))
+        if enrollment['status'] == 'left':
+            finished.append(enrollment)
+    for enrollment in finished:
+        events.append(('dropout', enrollment, None, enrollment['left_at']))
+    return events
+
+
+def _edge(kind, source, target):
+    """Ключ счётчика: вид и (город, организация, группа) откуда и куда"""
+    def point(enrollment, with_group):
+        if enrollment is None:
+            return None, None, None
+        return (
+            enrollment['city_id'], enrollment['organization_id'],
+            enrollment['group_id'] if with_group else None,
+        )
+    # Переходы между организациями считаются без групп — матрица организаций
+    with_group = kind != 'transfer'
+    return (kind,) + point(source, with_group) + point(target, with_group)
+
+
+def compute(start_date, end_date, chunk_size=ATHLETE_CHUNK_SIZE):
+    """Счётчики переходов за период: (Counter ключей _edge, спортсменов, зачислений)"""
+    start, end = period_bounds(start_date, end_date)
+    counter = Counter()
+    athletes = enrollments = 0
+    for _, history in iter_histories(chunk_size):
+        athletes += 1
+        enrollments += len(history)
+        for kind, source, target, moment in transitions(history):
+            if start <= moment < end:
+                counter[_edge(kind, source, target)] += 1
+    return counter, athletes, enrollments
+
+
+def build_snapshot(start_date, end_date, chunk_size=ATHLETE_CHUNK_SIZE):
+    """Посчитать переходы за период и сохранить расчёт. Старые расчёты сверх
+    KEEP_SNAPSHOTS удаляются"""
+    counter, athletes, enrollments = compute(start_date, end_date, chunk_size)
+    with transaction.atomic():
+        snapshot = MobilitySnapshot.objects.create(
+            period_start=start_date, period_end=end_date, athletes=athletes, enrollments=enrollments,
+        )
+        MobilityTransition.objects.bulk_create(
+            [
+                MobilityTransition(
+                    snapshot=snapshot, kind=kind, count=count,
+                    from_city_id=from_city, from_organization_id=from_org, from_group_id=from_group,
+                    to_city_id=to_city, to_organization_id=to_org, to_group_id=to_group,
+                )
+                for (kind, from_city, from_org, from_group, to_city, to_org, to_group), count in counter.items()
+            ],
+            batch_size=CREATE_BATCH_SIZE,
+        )
+        snapshot.finished_at = timezone.now()
+        snapshot.save(update_fields=['finished_at', 'updated_at'])
+    stale = MobilitySnapshot.objects.filter(finished_at__isnull=False).values_list('id', flat=True)[KEEP_SNAPSHOTS:]
+    MobilitySnapshot.objects.filter(id__in=list(stale)).delete()
+    return snapshot
+
+
+# === Чтение ===
+
+def latest_snapshot():
+    return MobilitySnapshot.objects.filter(finished_at__isnull=False).first()
+
+
+def _city_filter(city, prefix):
+    return Q(**{f'{prefix}_city': city}) if city is not None else Q()
+
+
+def summary(snapshot, city=None):
+    """Итоги по городу: зачисления, переходы внутри, приход и уход из города, отток"""
+    transitions_qs = snapshot.transitions.all()
+    inside = _city_filter(city, 'from') & _city_filter(city, 'to')
+
+    def total(queryset):
+        return queryset.aggregate(value=Sum('count'))['value'] or 0
+
+    result = {
+        'entries': total(transitions_qs.filter(_city_filter(city, 'to'), kind='entry')),
+        'internal': total(transitions_qs.filter(_city_filter(city, 'from'), kind='internal')),
+        'dropouts': total(transitions_qs.filter(_city_filter(city, 'from'), kind='dropout')),
+        'transfers': total(transitions_qs.filter(inside, kind='transfer')),
+        'cross_city_in': 0,
+        'cross_city_out': 0,
+    }
+    if city is not None:
+        result['cross_city_in'] = total(
+            transitions_qs.filter(kind='transfer', to_city=city).exclude(from_city=city)
+        )
+        result['cross_city_out'] = total(
+            transitions_qs.filter(kind='transfer', from_city=city).exclude(to_city=city)
+        )
+    else:
+        result['cross_city_in'] = result['cross_city_out'] = total(
+            transitions_qs.filter(kind='transfer').exclude(from_city=F('to_city'))
+        )
+    return result
+
+
+def organization_matrix(snapshot, city=None, limit=20):
+    """Матрица переходов организация → организация для организаций города.
+
+    Организации вне города объединяются в строку/столбец «другие города».
+    Возвращает {'organizations': [{id, name}], 'matrix': [[...]], 'outside': ...}.
+    """
+    rows = list(
+        snapshot.transitions.filter(kind='transfer')
+        .filter(_city_filter(city, 'from') | _city_filter(city, 'to'))
+        .values('from_organization_id', 'from_city_id', 'to_organization_id', 'to_city_id', 'count')
+    )
+    local = Counter()
+    for row in rows:
+        for side in ('from', 'to'):
+            if city is None or row[f'{side}_city_id'] == city.pk:
+                local[row[f'{side}_organization_id']] += row['count']
+    org_ids = [org_id for org_id, _ in local.most_common(limit)]
+    index = {org_id: position for position, org_id in enumerate(org_ids)}
+    outside = len(org_ids)  # «другие города» и организации за пределами топа
+    matrix = [[0] * (len(org_ids) + 1) for _ in range(len(org_ids) + 1)]
+    for row in rows:
+        source = index.get(row['from_organization_id'], outside)
+        target = index.get(row['to_organization_id'], outside)
+        matrix[source][target] += row['count']
+    names = dict(Organization.objects.filter(id__in=org_ids).values_list('id', 'name'))
+    return {
+        'organizations': [{'id': org_id, 'name': names.get(org_id, '')} for org_id in org_ids],
+        'other_label': 'Другие организации и города',
+        'matrix': matrix,
+    }
+
+
+def dropouts_by_group(snapshot, city=None, limit=20):
+    """Группы с наибольшим оттоком: [{group, organization, dropouts}]"""
+    rows = list(
+        snapshot.transitions.filter(_city_filter(city, 'from'), kind='dropout')
+        .values('from_group_id')
+        .annotate(dropouts=Sum('count'))
+        .order_by('-dropouts')[:limit]
+    )
+    groups = TrainingGroup.objects.select_related('organization').in_bulk(
+        [row['from_group_id'] for row in rows]
+    )
+    result = []
+    for row in rows:
+        group = groups.get(row['from_group_id'])
+        result.append({
+            'group_id': row['from_group_id'],
+            'group': group.name if group else '',
+            'organization': group.organization.name if group else '',
+            'dropouts': row['dropouts'],
+        })
+    return result
+
+
+def city_flows(snapshot, city=None):
+    """Межгородские переходы: [{from_city, to_city, count}] по убыванию"""
+    queryset = snapshot.transitions.filter(kind='transfer').exclude(from_city=F('to_city'))
+    if city is not None:
+        queryset = queryset.filter(Q(from_city=city) | Q(to_city=city))
+    rows = list(
+        queryset.values('from_city_id', 'to_city_id').annotate(total=Sum('count')).order_by('-total')
+    )
+    names = dict(City.objects.filter(
+        id__in={row['from_city_id'] for row in rows} | {row['to_city_id'] for row in rows}
+    ).values_list('id', 'name'))
+    return [
+        {'from_city': names.get(row['from_city_id']), 'to_city': names.get(row['to_city_id']), 'count': row['total']}
+        for row in rows
+    ]
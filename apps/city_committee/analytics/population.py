@@ -0,0 +1,186 @@
+# apps/city_committee/analytics/population.py
+"""
+Охват населения: спортсмены города, прирост по месяцам, возраст и пол.
+
+Все показатели считаются агрегирующими запросами в БД: прирост —
+GROUP BY по TruncMonth, возрастные группы — CASE по дате рождения
+относительно конца периода (без перебора спортсменов в Python).
+Готовый отчёт кэшируется по городу и периоду (analytics.cache).
+"""
+from datetime import datetime, time as dt_time, timedelta
+
+from django.db.models import Case, CharField, Count, Q, Value, When
+from django.db.models.functions import Coalesce, TruncMonth
+from django.utils import timezone
+
+from apps.athletes.models import AthleteProfile
+from apps.attendance.services.statistics import period_payload
+from apps.training.models import Enrollment
+
+from .cache import cached_report
+
+# (метка, минимальный возраст, максимальный возраст или None)
+AGE_BUCKETS = [
+    ('0-5', 0, 5),
+    ('6-10', 6, 10),
+    ('11-14', 11, 14),
+    ('15-17', 15, 17),
+    ('18+', 18, None),
+]
+UNKNOWN = 'unknown'
+
+MONTH_LABELS = ['Янв', 'Фев', 'Мар', 'Апр', 'Май', 'Июн', 'Июл', 'Авг', 'Сен', 'Окт', 'Ноя', 'Дек']
+
+
+def years_before(day, years):
+    """Та же дата years лет назад (29 февраля → 28 февраля)"""
+    try:
+        return day.replace(year=day.year - years)
+    except ValueError:
+        return day.replace(year=day.year - years, day=28)
+
+
+def age_bucket_expression(reference_date, field='user__birth_date'):
+    """CASE: возрастная группа на reference_date по дате рождения"""
+    whens = [When(**{f'{field}__isnull': True}, then=Value(UNKNOWN))]
+    for label, _, max_age in AGE_BUCKETS:
+        if max_age is not None:
+            # Возраст ≤ max_age ⇔ родился позже, чем (max_age + 1) лет назад
+            whens.append(When(**{f'{field}__gt': years_before(reference_date, max_age + 1)}, then=Value(label)))
+    return Case(*whens, default=Value(AGE_BUCKETS[-1][0]), output_field=CharField())
+
+
+def period_bounds(start_date, end_date):
+    """Границы периода [start, end) в виде aware datetime (end_date включается)"""
+    start = timezone.make_aware(datetime.combine(start_date, dt_time.min))
+    end = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), dt_time.min))
+    return start, end
+
+
+def month_range(start_date, end_date):
+    """Первые дни месяцев от start_date до end_date включительно"""
+    month = start_date.replace(day=1)
+    months = []
+    while month <= end_date:
+        months.append(month)
+        month = (month + timedelta(days=32)).replace(day=1)
+    return months
+
+
+def _month_key(value):
+    if isinstance(value, datetime):
+        value = timezone.localtime(value) if timezone.is_aware(value) else value
+        value = value.date()
+    return value.replace(day=1)
+
+
+def athletes_queryset(city=None):
+    queryset = AthleteProfile.objects.all()
+    if city is not None:
+        queryset = queryset.filter(city=city)
+    return queryset
+
+
+def enrollments_queryset(city=None):
+    queryset = Enrollment.objects.all()
+    if city is not None:
+        queryset = queryset.filter(group__organization__city=city)
+    return queryset
+
+
+def age_distribution(city=None, reference_date=None, queryset=None):
+    """Число спортсменов по возрастным группам на reference_date: {метка: count}"""
+    reference_date = reference_date or timezone.localdate()
+    queryset = queryset if queryset is not None else athletes_queryset(city)
+    rows = (
+        queryset.order_by()
+        .annotate(age_bucket=age_bucket_expression(reference_date))
+        .values('age_bucket')
+        .annotate(count=Count('id'))
+    )
+    counts = {row['age_bucket']: row['count'] for row in rows}
+    distribution = {label: counts.get(label, 0) for label, _, _ in AGE_BUCKETS}
+    distribution[UNKNOWN] = counts.get(UNKNOWN, 0)
+    return distribution
+
+
+def gender_distribution(city=None, queryset=None):
+    """Число спортсменов по полу: {'M', 'F', 'unknown'}"""
+    queryset = queryset if queryset is not None else athletes_queryset(city)
+    rows = queryset.order_by().values('user__gender').annotate(count=Count('id'))
+    distribution = {'M': 0, 'F': 0, UNKNOWN: 0}
+    for row in rows:
+        key = row['user__gender'] if row['user__gender'] in ('M', 'F') else UNKNOWN
+        distribution[key] += row['count']
+    return distribution
+
+
+def monthly_growth(city=None, start_date=None, end_date=None):
+    """Прирост по месяцам периода: новые спортсмены, накопленный итог и новые зачисления"""
+    start, end = period_bounds(start_date, end_date)
+
+    registered = {
+        _month_key(month): count
+        for month, count in athletes_queryset(city)
+        .filter(created_at__gte=start, created_at__lt=end)
+        .annotate(month=TruncMonth('created_at'))
+        .order_by()
+        .values('month')
+        .annotate(count=Count('id'))
+        .values_list('month', 'count')
+    }
+    enrolled = {
+        _month_key(month): count
+        for month, count in enrollments_queryset(city)
+        .filter(status__in=('active', 'left'))
+        .annotate(started=Coalesce('joined_at', 'created_at'))
+        .filter(started__gte=start, started__lt=end)
+        .annotate(month=TruncMonth('started'))
+        .order_by()
+        .values('month')
+        .annotate(count=Count('id'))
+        .values_list('month', 'count')
+    }
+    total = athletes_queryset(city).filter(created_at__lt=start).count()
+
+    growth = []
+    for month in month_range(start_date, end_date):
+        count = registered.get(month, 0)
+        total += count
+        growth.append({
+            'month': month.strftime('%Y-%m'),
+            'label': f'{MONTH_LABELS[month.month - 1]} {month.year}',
+            'count': count,
+            'total': total,
+            'enrollments': enrolled.get(month, 0),
+        })
+    return growth
+
+
+def population_report(city=None, start_date=None, end_date=None):
+    """Отчёт «Охват населения» за период (без кэша)"""
+    _, end = period_bounds(start_date, end_date)
+    athletes = athletes_queryset(city).filter(created_at__lt=end)
+    totals = athletes.aggregate(
+        total=Count('id', distinct=True),
+        active=Count('id', filter=Q(enrollments__status='active'), distinct=True),
+    )
+    growth = monthly_growth(city, start_date, end_date)
+    return {
+        'city': city.name if city is not None else None,
+        'period': period_payload(start_date, end_date),
+        'total_athletes': totals['total'],
+        'active_athletes': totals['active'],
+        'new_athletes': sum(month['count'] for month in growth),
+        'monthly_growth': growth,
+        'age_distribution': age_distribution(reference_date=end_date, queryset=athletes),
+        'gender_distribution': gender_distribution(queryset=athletes),
+    }
+
+
+def get_population_report(city=None, start_date=None, end_date=None):
+    """Отчёт «Охват населения» с кэшированием по городу и периоду"""
+    return cached_report(
+        'population', lambda: population_report(city, start_date, end_date),
+        city, start_date, end_date,
+    )
@@ -0,0 +1,101 @@
+# apps/city_committee/analytics/sport_coverage.py
+"""
+Охват по видам спорта: участники секций, группы, организации и мероприятия.
+
+Каждая метрика — один сгруппированный по виду спорта запрос:
+- участники, группы и организации — активные зачисления в группы;
+- новые участники — зачисления, начавшиеся в периоде;
+- «основной вид спорта» — AthleteProfile.main_sport;
+- мероприятия — у Event нет вида спорта, поэтому мероприятие относится к
+  виду спорта зарегистрированных на него спортсменов (по main_sport).
+Отчёт кэшируется по городу и периоду (analytics.cache).
+"""
+from django.db.models import Count
+from django.db.models.functions import Coalesce
+
+from apps.attendance.services.statistics import period_payload
+from apps.events.models import EventRegistration
+from apps.sports.models import Sport
+
+from .cache import cached_report
+from .population import athletes_queryset, enrollments_queryset, period_bounds
+
+METRICS = (
+    'participants', 'groups', 'organizations', 'new_participants',
+    'main_sport_athletes', 'events', 'event_participants',
+)
+
+
+def _by_sport(queryset, sport_field, **aggregates):
+    return {
+        row.pop(sport_field): row
+        for row in queryset.order_by().values(sport_field).annotate(**aggregates)
+    }
+
+
+def sport_activity_report(city=None, start_date=None, end_date=None):
+    """Отчёт «Активность по видам спорта» за период (без кэша)"""
+    start, end = period_bounds(start_date, end_date)
+    active = enrollments_queryset(city).filter(status='active', group__is_active=True)
+
+    sections = _by_sport(
+        active, 'group__sport',
+        participants=Count('athlete', distinct=True),
+        groups=Count('group', distinct=True),
+        organizations=Count('group__organization', distinct=True),
+    )
+    new_participants = _by_sport(
+        enrollments_queryset(city)
+        .filter(status__in=('active', 'left'))
+        .annotate(started=Coalesce('joined_at', 'created_at'))
+        .filter(started__gte=start, started__lt=end),
+        'group__sport',
+        new_participants=Count('athlete', distinct=True),
+    )
+    main_sport = _by_sport(
+        athletes_queryset(city).filter(created_at__lt=end), 'main_sport',
+        main_sport_athletes=Count('id'),
+    )
+    registrations = EventRegistration.objects.filter(
+        registration_type='athlete',
+        athlete__isnull=False,
+        status__in=('registered', 'confirmed'),
+        event__start_date__gte=start,
+        event__start_date__lt=end,
+    ).exclude(event__status__in=('draft', 'cancelled'))
+    if city is not None:
+        registrations = registrations.filter(event__city=city)
+    events = _by_sport(
+        registrations, 'athlete__main_sport',
+        events=Count('event', distinct=True),
+        event_participants=Count('athlete', distinct=True),
+    )
+
+    sport_ids = set(sections) | set(new_participants) | set(main_sport) | set(events)
+    names = dict(Sport.objects.filter(id__in=sport_ids).values_list('id', 'name'))
+    total_participants = active.values('athlete').distinct().count()
+
+    sports = []
+    for sport_id in sport_ids:
+        row = {'id': sport_id, 'name': names.get(sport_id, ''), **dict.fromkeys(METRICS, 0)}
+        for source in (sections, new_participants, main_sport, events):
+            row.update(source.get(sport_id, {}))
+        row['share'] = round(row['participants'] / total_participants * 100, 1) if total_participants else 0
+        sports.append(row)
+    sports.sort(key=lambda row: (-row['participants'], -row['main_sport_athletes'], row['name']))
+
+    return {
+        'city': city.name if city is not None else None,
+        'period': period_payload(start_date, end_date),
+        # Спортсмен в нескольких секциях учитывается один раз
+        'total_participants': total_participants,
+        'sports': sports,
+    }
+
+
+def get_sport_activity_report(city=None, start_date=None, end_date=None):
+    """Отчёт «Активность по видам спорта» с кэшированием по городу и периоду"""
+    return cached_report(
+        'sport_activity', lambda: sport_activity_report(city, start_date, end_date),
+        city, start_date, end_date,
+    )
@@ -10,13 +10,17 @@ from apps.organizations.models import Organization
 from apps.athletes.models import AthleteProfile
 from apps.coaches.models import CoachProfile
 from apps.events.models import Event
-from apps.notifications.models import Notification
+from apps.notifications.services import outbox
 from apps.users.models import CustomUser
 from apps.geography.models import City
 from apps.city_committee.models import CommitteeStaff, CommitteeRegistrationCode
-from apps.attendance.models import AttendanceRecord
+from apps.attendance.services.rollup import get_rollup_totals, get_rollup_totals_by
+from apps.attendance.services.statistics import resolve_period, period_payload
 from apps.training.models import TrainingGroup
 
+# Допустимые периоды отчётов по посещаемости (дни)
+REPORT_PERIOD_DAYS = (30, 90, 365)
+
 def check_committee_staff(request):
     """Проверка, что пользователь является сотрудником спорткомитета"""
     if not request.user.is_authenticated:
@@ -29,13 +33,23 @@ def check_committee_staff(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_organization_statistics(request, organization_id=None):
-    """Статистика по организациям (для сотрудников спорткомитета)"""
+    """Статистика по организациям (для сотрудников спорткомитета)
+
+    Параметры: period=30|90|365 (по умолчанию 30) или start_date/end_date (YYYY-MM-DD).
+    """
     committee_staff = check_committee_staff(request)
     if not committee_staff:
         return Response({"error": "Доступ запрещён"}, status=status.HTTP_403_FORBIDDEN)
     
     city = committee_staff.city
     
+    try:
+        start_date, end_date = resolve_period(
+            request.query_params, allowed=REPORT_PERIOD_DAYS, default=30
+        )
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
     if organization_id:
         # Статистика по конкретной организации
         try:
@@ -56,16 +70,12 @@ def get_organization_statistics(request, organization_id=None):
         ).distinct().count()
         
         # Количество групп
-        groups_count = org.groups.filter(status='active').count()
+        groups_count = org.groups.filter(is_active=True).count()
         
-        # Посещаемость за последний месяц
-        month_ago = timezone.now() - timedelta(days=30)
-        attendance_records = AttendanceRecord.objects.filter(
-            group__organization=org,
-            date__gte=month_ago
-        )
-        total_sessions = attendance_records.count()
-        attended_sessions = attendance_records.filter(status='attended').count()
+        # Посещаемость за период по дневным свёрткам
+        attendance = get_rollup_totals(start_date, end_date, organization=org)
+        total_sessions = attendance['total']
+        attended_sessions = attendance['present']
         attendance_rate = (attended_sessions / total_sessions * 100) if total_sessions > 0 else 0
         
         # Мероприятия организации
@@ -80,6 +90,7 @@ def get_organization_statistics(request, organization_id=None):
                 'name': org.name,
                 'city': org.city.name if org.city else None,
             },
+            'period': period_payload(start_date, end_date),
             'statistics': {
                 'athletes_count': athletes_count,
                 'coaches_count': coaches_count,
@@ -97,12 +108,16 @@ def get_organization_statistics(request, organization_id=None):
             status='approved'
         ).annotate(
             athletes_count=Count('groups__enrollments', filter=Q(groups__enrollments__status='active'), distinct=True),
-            coaches_count=Count('coach_memberships', filter=Q(coach_memberships__status='active'), distinct=True),
-            groups_count=Count('groups', filter=Q(groups__status='active'))
+            coaches_count=Count('coachmembership', filter=Q(coachmembership__status='active'), distinct=True),
+            groups_count=Count('groups', filter=Q(groups__is_active=True), distinct=True)
+        )
+        attendance_by_org = get_rollup_totals_by(
+            'organization', start_date, end_date, organization__city=city
         )
         
         orgs_data = []
         for org in organizations:
+            attendance = attendance_by_org.get(org.id, {})
             orgs_data.append({
                 'id': org.id,
                 'name': org.name,
@@ -110,10 +125,12 @@ def get_organization_statistics(request, organization_id=None):
                 'athletes_count': org.athletes_count or 0,
                 'coaches_count': org.coaches_count or 0,
                 'groups_count': org.groups_count or 0,
+                'attendance_rate': attendance.get('attendance_rate', 0),
             })
         
         return Response({
             'city': city.name,
+            'period': period_payload(start_date, end_date),
             'organizations': orgs_data,
             'total_organizations': len(orgs_data)
         })
@@ -172,29 +189,20 @@ def send_global_notification(request):
     body = request.data['body']
     notification_type = request.data.get('notification_type', 'mass_notification')
     
-    # Получаем всех активных пользователей
-    users = CustomUser.objects.filter(is_active=True)
-    
-    # Создаём уведомления для всех пользователей
-    notifications = []
-    for user in users:
-        notifications.append(
-            Notification(
-                recipient=user,
-                sender=request.user,
-                notification_type=notification_type,
-                title=title,
-                body=body,
-                is_read=False
-            )
-        )
-    
-    # Массовое создание уведомлений
-    Notification.objects.bulk_create(notifications, batch_size=100)
+    # Рассылка всем активным пользователям ставится в очередь одной записью
+    audience = {'all': True}
+    recipients_count = outbox.resolve_audience(audience).count()
+    outbox.enqueue_broadcast(
+        audience,
+        notification_type,
+        title=title,
+        body=body,
+        sender=request.user
+    )
     
     return Response({
-        "message": f"Глобальное уведомление отправлено {len(notifications)} пользователям",
-        "recipients_count": len(notifications)
+        "message": f"Глобальное уведомление поставлено в очередь для {recipients_count} пользователей",
+        "recipients_count": recipients_count
     }, status=status.HTTP_201_CREATED)
 
 @api_view(['POST'])
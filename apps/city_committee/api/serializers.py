@@ -36,4 +36,5 @@ class CityOverviewSerializer(serializers.Serializer):
     athletes_by_age = serializers.DictField()
     active_sections = serializers.IntegerField()
     top_sports = serializers.ListField(child=serializers.DictField())
-    coverage_percentage = serializers.FloatField()
\ No newline at end of file
+    coverage_percentage = serializers.FloatField()
+    as_of = serializers.DateField(allow_null=True)
\ No newline at end of file
@@ -1,6 +1,6 @@
 # apps/city_committee/api/urls.py
 from django.urls import path
-from .views import get_city_overview, get_organization_map, export_gis_data
+from .views import get_city_overview, get_analytics_cube, get_gto_plan, get_mobility, get_organization_map, export_gis_data
 from .committee_views import (
     get_organization_statistics, create_event, send_global_notification,
     register_committee_staff
@@ -8,6 +8,9 @@ from .committee_views import (
 
 urlpatterns = [
     path('overview/', get_city_overview, name='city-overview'),
+    path('analytics/cube/', get_analytics_cube, name='city-analytics-cube'),
+    path('analytics/gto-plan/', get_gto_plan, name='city-gto-plan'),
+    path('analytics/mobility/', get_mobility, name='city-mobility'),
     path('map/', get_organization_map, name='city-map'),
     path('gis/export/', export_gis_data, name='gis-export'),
     # Новые endpoints для сотрудников спорткомитета
@@ -3,45 +3,70 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.db.models import Count, Q
-from django.utils import timezone
 from datetime import datetime
+from apps.core.utils.streaming import streaming_response
 from .serializers import OrganizationMapSerializer, CityOverviewSerializer
 from apps.organizations.models import Organization
 from apps.athletes.models import AthleteProfile
 from apps.sports.models import Sport
 from apps.events.models import Event
+from apps.city_committee.analytics import cube, gto_plan, mobility, population
+from apps.attendance.services.statistics import period_payload
+from apps.city_committee.gis import export as gis_export
+from apps.core.utils import partitioning
+from apps.geography.models import City
+
+# Измерения среза куба: параметр group_by → поле AnalyticsCubeCell
+CUBE_GROUP_BY = {
+    'sport': 'sport__name',
+    'age_bucket': 'age_bucket',
+    'gender': 'gender',
+}
+
+
+def _parse_month(value):
+    """Месяц из YYYY-MM (или None); ValueError — неверный формат"""
+    if not value:
+        return None
+    return datetime.strptime(value, '%Y-%m').date()
+
+
+def _cube_rows(rows):
+    for row in rows:
+        if 'sport__name' in row:
+            row['sport'] = row.pop('sport__name')
+    return rows
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_city_overview(request):
-    """Обзор по городу"""
+    """Обзор по городу (из куба аналитики; пока куб не построен — запросами к БД)"""
     # Получаем город пользователя (предполагается, что он привязан к городу)
     committee_staff = request.user.committee_role
     city = committee_staff.city
 
-    # Общее число спортсменов
-    total_athletes = AthleteProfile.objects.filter(city=city).count()
-
-    # По возрастам
-    current_year = timezone.now().year
-    age_groups = {
-        '6-10': 0,
-        '11-14': 0,
-        '15-17': 0,
-        '18+': 0
-    }
-    athletes = AthleteProfile.objects.filter(city=city).select_related('user')
-    for athlete in athletes:
-        if athlete.user.birth_date:
-            age = current_year - athlete.user.birth_date.year
-            if 6 <= age <= 10:
-                age_groups['6-10'] += 1
-            elif 11 <= age <= 14:
-                age_groups['11-14'] += 1
-            elif 15 <= age <= 17:
-                age_groups['15-17'] += 1
-            else:
-                age_groups['18+'] += 1
+    month = cube.latest_month(city)
+    if month is not None:
+        total_athletes = cube.snapshot(city, month)['athletes']
+        age_groups = cube.age_distribution(city, month)
+        top_sports_data = sorted(
+            (
+                {'name': row['sport__name'], 'count': row['athletes']}
+                for row in cube.snapshot(city, month, group_by=('sport__name',))
+                if row['athletes']
+            ),
+            key=lambda row: -row['count'],
+        )[:5]
+    else:
+        total_athletes = AthleteProfile.objects.filter(city=city).count()
+        age_groups = population.age_distribution(city)
+        top_sports = Sport.objects.annotate(
+            athlete_count=Count('main_athletes', filter=Q(main_athletes__city=city))
+        ).order_by('-athlete_count')[:5]
+        top_sports_data = [
+            {'name': sport.name, 'count': sport.athlete_count}
+            for sport in top_sports
+        ]
 
     # Активные секции
     active_sections = Organization.objects.filter(
@@ -49,16 +74,6 @@ def get_city_overview(request):
         status='approved'
     ).count()
 
-    # Популярные виды спорта
-    top_sports = Sport.objects.annotate(
-        athlete_count=Count('main_athletes', filter=Q(main_athletes__city=city))
-    ).order_by('-athlete_count')[:5]
-
-    top_sports_data = [
-        {'name': sport.name, 'count': sport.athlete_count}
-        for sport in top_sports
-    ]
-
     # Процент охвата (условно: от общего числа детей 6-17 в городе)
     # В реальности нужно брать из статистики города, здесь упрощённо
     children_6_17 = sum([age_groups['6-10'], age_groups['11-14'], age_groups['15-17']])
@@ -69,12 +84,107 @@ def get_city_overview(request):
         'athletes_by_age': age_groups,
         'active_sections': active_sections,
         'top_sports': top_sports_data,
-        'coverage_percentage': coverage_percentage
+        'coverage_percentage': coverage_percentage,
+        'as_of': month,
     }
 
     serializer = CityOverviewSerializer(data)
     return Response(serializer.data)
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_analytics_cube(request):
+    """Срез куба аналитики по городу сотрудника спорткомитета
+
+    Параметры: group_by — через запятую из sport, age_bucket, gender;
+    from/to — месяцы YYYY-MM (по умолчанию последние 12);
+    mode=series (по месяцам, по умолчанию) или snapshot (на конец месяца to).
+    """
+    committee_staff = getattr(request.user, 'committee_role', None)
+    if committee_staff is None:
+        return Response({"error": "Доступ запрещён"}, status=403)
+    city = committee_staff.city
+
+    group_by = [field for field in request.query_params.get('group_by', '').split(',') if field]
+    unknown = set(group_by) - set(CUBE_GROUP_BY)
+    if unknown:
+        return Response({"error": f"Недопустимые измерения: {', '.join(sorted(unknown))}"}, status=400)
+    group_by = tuple(CUBE_GROUP_BY[field] for field in group_by)
+
+    try:
+        end_month = _parse_month(request.query_params.get('to')) or cube.latest_month(city)
+        start_month = _parse_month(request.query_params.get('from'))
+    except ValueError:
+        return Response({"error": "Неверный формат месяца. Используйте YYYY-MM"}, status=400)
+    refreshed = cube.last_refresh()
+    payload = {
+        'city': city.name,
+        'refreshed_at': refreshed.finished_at if refreshed else None,
+    }
+    if end_month is None:
+        return Response({**payload, 'rows': []})
+
+    if request.query_params.get('mode') == 'snapshot':
+        rows = cube.snapshot(city, end_month, group_by)
+        payload['month'] = end_month
+        payload['rows'] = _cube_rows(rows if group_by else [rows])
+        return Response(payload)
+
+    start_month = start_month or partitioning.add_months(end_month, -11)
+    payload['rows'] = _cube_rows(cube.series(city, start_month, end_month, group_by))
+    return Response(payload)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_gto_plan(request):
+    """План и факт ГТО по городу сотрудника спорткомитета
+
+    Параметры: year (по умолчанию текущий), organization_id — отчёт по организации.
+    """
+    committee_staff = getattr(request.user, 'committee_role', None)
+    if committee_staff is None:
+        return Response({"error": "Доступ запрещён"}, status=403)
+    city = committee_staff.city
+
+    try:
+        year = int(request.query_params.get('year') or datetime.now().year)
+    except ValueError:
+        return Response({"error": "Неверный год"}, status=400)
+    if not 2000 <= year <= 2100:
+        return Response({"error": "Неверный год"}, status=400)
+
+    organization = None
+    organization_id = request.query_params.get('organization_id')
+    if organization_id:
+        try:
+            organization = Organization.objects.get(id=int(organization_id), city=city)
+        except (ValueError, Organization.DoesNotExist):
+            return Response({"error": "Организация не найдена"}, status=404)
+
+    return Response(gto_plan.get_gto_plan_report(city, year, organization))
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_mobility(request):
+    """Переходы спортсменов по городу сотрудника спорткомитета (последний расчёт)"""
+    committee_staff = getattr(request.user, 'committee_role', None)
+    if committee_staff is None:
+        return Response({"error": "Доступ запрещён"}, status=403)
+    city = committee_staff.city
+
+    snapshot = mobility.latest_snapshot()
+    if snapshot is None:
+        return Response({"error": "Расчёт ещё не выполнялся"}, status=404)
+    return Response({
+        'city': city.name,
+        'period': period_payload(snapshot.period_start, snapshot.period_end),
+        'calculated_at': snapshot.finished_at,
+        'summary': mobility.summary(snapshot, city),
+        'organization_matrix': mobility.organization_matrix(snapshot, city),
+        'dropouts_by_group': mobility.dropouts_by_group(snapshot, city),
+        'city_flows': mobility.city_flows(snapshot, city),
+    })
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_organization_map(request):
@@ -93,35 +203,40 @@ def get_organization_map(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def export_gis_data(request):
-    """Экспорт в GIS-формат (GeoJSON)"""
-    committee_staff = request.user.committee_role
-    city = committee_staff.city
-
-    features = []
-    organizations = Organization.objects.filter(
-        city=city,
-        status='approved',
-        latitude__isnull=False,
-        longitude__isnull=False
-    )
-
-    for org in organizations:
-        features.append({
-            "type": "Feature",
-            "geometry": {
-                "type": "Point",
-                "coordinates": [float(org.longitude), float(org.latitude)]
-            },
-            "properties": {
-                "name": org.name,
-                "type": org.org_type,
-                "sports": [sd.sport.name for sd in org.sport_directions.all()],
-                "accessibility": bool(getattr(org, 'accessibility', None))
-            }
-        })
-
-    geojson = {
-        "type": "FeatureCollection",
-        "features": features
-    }
-    return Response(geojson)
\ No newline at end of file
+    """Экспорт в GIS-формат (GeoJSON), потоково
+
+    Параметры: output=geojson|geojsonl, compress=gzip, bbox=min_lon,min_lat,max_lon,max_lat,
+    sport — id видов спорта через запятую. Сотрудник спорткомитета выгружает свой
+    город; администратор — город city_id или всю республику.
+    """
+    committee_staff = getattr(request.user, 'committee_role', None)
+    if committee_staff is not None:
+        city = committee_staff.city
+    elif request.user.roles.filter(role='admin_rb', is_active=True).exists():
+        city = None
+        if request.query_params.get('city_id'):
+            try:
+                city = City.objects.get(id=int(request.query_params['city_id']))
+            except (ValueError, City.DoesNotExist):
+                return Response({"error": "Город не найден"}, status=404)
+    else:
+        return Response({"error": "Доступ запрещён"}, status=403)
+
+    # Параметр format занят согласованием формата DRF
+    fmt = request.query_params.get('output', 'geojson')
+    if fmt not in gis_export.FORMATS:
+        return Response({"error": f"Формат должен быть одним из: {', '.join(gis_export.FORMATS)}"}, status=400)
+    compress = request.query_params.get('compress') == 'gzip'
+    try:
+        bbox = gis_export.parse_bbox(request.query_params['bbox']) if request.query_params.get('bbox') else None
+        sport_ids = gis_export.parse_ids(request.query_params.get('sport', ''))
+    except ValueError as e:
+        return Response({"error": str(e)}, status=400)
+
+    queryset = gis_export.organizations(city, bbox, sport_ids)
+    content_type, filename = gis_export.content_info(fmt, compress)
+    # Под ASGI — асинхронным итератором, иначе Django соберёт весь файл в памяти
+    response = streaming_response(request, gis_export.iter_bytes(queryset, fmt, compress), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['X-Accel-Buffering'] = 'no'
+    return response
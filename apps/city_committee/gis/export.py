@@ -0,0 +1,158 @@
+# apps/city_committee/gis/export.py
+"""
+Потоковая выгрузка организаций в GeoJSON.
+
+Организации читаются через iterator(chunk_size=CHUNK_SIZE): направления
+(виды спорта) подгружаются prefetch_related одним запросом на порцию,
+доступная среда — select_related, поэтому на порцию приходится два запроса
+независимо от числа организаций. Объекты сериализуются и отдаются по мере
+чтения, весь FeatureCollection в памяти не собирается.
+
+Форматы:
+- geojson — FeatureCollection (по умолчанию);
+- geojsonl — GeoJSON Lines: по объекту Feature на строку, удобно для
+  выгрузок по всей республике и построчной загрузки в ГИС.
+Сжатие gzip выполняется потоково (zlib), файл отдаётся как .gz.
+Фильтры: город, bbox (min_lon, min_lat, max_lon, max_lat) и виды спорта.
+"""
+import json
+import zlib
+
+from django.db.models import Exists, OuterRef
+
+from apps.organizations.models import Organization, SportDirection
+
+CHUNK_SIZE = 500
+# Размер пачки текста перед отправкой (и перед сжатием)
+BUFFER_SIZE = 64 * 1024
+
+FORMATS = {
+    'geojson': ('application/geo+json', 'geojson'),
+    'geojsonl': ('application/geo+json-seq', 'geojsonl'),
+}
+ACCESSIBILITY_FEATURES = ('wheelchair_access', 'adapted_restroom', 'sign_language_support')
+
+
+def parse_bbox(value):
+    """bbox из строки «min_lon,min_lat,max_lon,max_lat»; ValueError — некорректный"""
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(part) for part in value.split(','))
+    except (AttributeError, ValueError):
+        raise ValueError('bbox: ожидается min_lon,min_lat,max_lon,max_lat')
+    if not (-180 <= min_lon <= max_lon <= 180 and -90 <= min_lat <= max_lat <= 90):
+        raise ValueError('bbox: координаты вне допустимого диапазона')
+    return min_lon, min_lat, max_lon, max_lat
+
+
+def parse_ids(value):
+    """Список id из строки «1,2,3»; ValueError — некорректный"""
+    try:
+        return [int(part) for part in value.split(',') if part.strip()]
+    except ValueError:
+        raise ValueError('sport: ожидаются id видов спорта через запятую')
+
+
+def organizations(city=None, bbox=None, sport_ids=None):
+    """Одобренные организации с координатами по фильтрам"""
+    queryset = Organization.objects.filter(
+        status='approved', latitude__isnull=False, longitude__isnull=False
+    )
+    if city is not None:
+        queryset = queryset.filter(city=city)
+    if bbox is not None:
+        min_lon, min_lat, max_lon, max_lat = bbox
+        queryset = queryset.filter(
+            longitude__gte=min_lon, longitude__lte=max_lon,
+            latitude__gte=min_lat, latitude__lte=max_lat,
+        )
+    if sport_ids:
+        # EXISTS вместо JOIN — без дублей организаций с несколькими направлениями
+        queryset = queryset.filter(Exists(
+            SportDirection.objects.filter(organization=OuterRef('pk'), sport_id__in=sport_ids)
+        ))
+    return (
+        queryset.select_related('city', 'accessibility')
+        .prefetch_related('sport_directions__sport')
+        .order_by('id')
+    )
+
+
+def feature(org):
+    """Объект GeoJSON Feature для организации"""
+    try:
+        accessibility = org.accessibility
+    except Organization.accessibility.RelatedObjectDoesNotExist:
+        accessibility = None
+    return {
+        "type": "Feature",
+        "id": org.id,
+        "geometry": {
+            "type": "Point",
+            "coordinates": [float(org.longitude), float(org.latitude)]
+        },
+        "properties": {
+            "id": org.id,
+            "name": org.name,
+            "type": org.org_type,
+            "city": org.city.name,
+            "address": org.address,
+            "sports": [sd.sport.name for sd in org.sport_directions.all()],
+            "accessibility": accessibility is not None,
+            "accessibility_features": [
+                name for name in ACCESSIBILITY_FEATURES if accessibility is not None and getattr(accessibility, name)
+            ],
+        }
+    }
+
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+def iter_text(queryset, fmt='geojson'):
+    """Текст выгрузки кусками: FeatureCollection или GeoJSON Lines"""
+    features = (_dumps(feature(org)) for org in queryset.iterator(chunk_size=CHUNK_SIZE))
+    if fmt == 'geojsonl':
+        pieces = (text + '\n' for text in features)
+    else:
+        pieces = _collection(features)
+
+    buffer, size = [], 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= BUFFER_SIZE:
+            yield ''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def _collection(features):
+    yield '{"type":"FeatureCollection","features":['
+    for index, text in enumerate(features):
+        yield text if index == 0 else ',' + text
+    yield ']}\n'
+
+
+def iter_bytes(queryset, fmt='geojson', compress=False):
+    """Байты выгрузки; при compress — поток gzip"""
+    if not compress:
+        for text in iter_text(queryset, fmt):
+            yield text.encode('utf-8')
+        return
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for text in iter_text(queryset, fmt):
+        data = compressor.compress(text.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def content_info(fmt='geojson', compress=False):
+    """(Content-Type, имя файла) для формата"""
+    content_type, extension = FORMATS[fmt]
+    filename = f'organizations.{extension}'
+    if compress:
+        return 'application/gzip', filename + '.gz'
+    return content_type, filename
@@ -0,0 +1,73 @@
+# apps/city_committee/management/commands/build_mobility_snapshot.py
+"""
+Management команда — расчёт переходов спортсменов между организациями и городами
+Использование:
+    python manage.py build_mobility_snapshot                 # последние 365 дней, для cron (раз в сутки)
+    python manage.py build_mobility_snapshot --days 90
+    python manage.py build_mobility_snapshot --start-date 2025-09-01 --end-date 2026-05-31
+"""
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.city_committee.analytics import mobility
+
+
+class Command(BaseCommand):
+    help = 'Считает переходы спортсменов (организации, группы, города, отток) и сохраняет расчёт'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=365,
+            help='Период — последние N дней (по умолчанию 365)',
+        )
+        parser.add_argument(
+            '--start-date',
+            type=str,
+            default=None,
+            help='Дата начала периода (YYYY-MM-DD)',
+        )
+        parser.add_argument(
+            '--end-date',
+            type=str,
+            default=None,
+            help='Дата окончания периода (YYYY-MM-DD)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=mobility.ATHLETE_CHUNK_SIZE,
+            help=f'Спортсменов в порции чтения (по умолчанию {mobility.ATHLETE_CHUNK_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            end_date = date.fromisoformat(options['end_date']) if options['end_date'] else timezone.localdate()
+            start_date = (
+                date.fromisoformat(options['start_date']) if options['start_date']
+                else end_date - timedelta(days=options['days'])
+            )
+        except ValueError:
+            raise CommandError('Неверный формат даты. Используйте YYYY-MM-DD')
+        if start_date > end_date:
+            raise CommandError('Дата начала не может быть позже даты окончания')
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size должно быть не меньше 1')
+
+        self.stdout.write(f'Расчёт переходов за {start_date} — {end_date}...')
+        started = time.monotonic()
+        snapshot = mobility.build_snapshot(start_date, end_date, options['chunk_size'])
+        totals = mobility.summary(snapshot)
+        self.stdout.write(
+            f'  Зачислений: {totals["entries"]}, переходов: {totals["transfers"]} '
+            f'(межгородских {totals["cross_city_out"]}), внутри организаций: {totals["internal"]}, '
+            f'ушли: {totals["dropouts"]}'
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Обработано спортсменов: {snapshot.athletes}, зачислений: {snapshot.enrollments}, '
+            f'{time.monotonic() - started:.1f} с'
+        ))
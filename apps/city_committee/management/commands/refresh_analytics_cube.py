@@ -0,0 +1,44 @@
+# apps/city_committee/management/commands/refresh_analytics_cube.py
+"""
+Management команда — обновление куба аналитики спорткомитета
+Использование:
+    python manage.py refresh_analytics_cube              # инкрементально, для cron (раз в час)
+    python manage.py refresh_analytics_cube --months 3   # пересчитать последние 3 месяца
+    python manage.py refresh_analytics_cube --full       # пересобрать всю историю (раз в неделю)
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.city_committee.analytics import cube
+
+
+class Command(BaseCommand):
+    help = 'Обновляет куб аналитики (город × вид спорта × возраст × пол × месяц)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Пересчитать все месяцы, начиная с самых ранних данных',
+        )
+        parser.add_argument(
+            '--months',
+            type=int,
+            default=None,
+            help='Пересчитать последние N месяцев (включая текущий)',
+        )
+
+    def handle(self, *args, **options):
+        if options['months'] is not None and options['months'] < 1:
+            raise CommandError('--months должно быть не меньше 1')
+        if options['full'] and options['months']:
+            raise CommandError('Укажите либо --full, либо --months')
+
+        self.stdout.write('Обновление куба аналитики...')
+        log = cube.refresh(full=options['full'], months=options['months'])
+        if log.months:
+            self.stdout.write(f'  Месяцы: {", ".join(month[:7] for month in log.months)}')
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ {"Полное" if log.full else "Инкрементальное"} обновление: '
+            f'месяцев {len(log.months)}, ячеек {log.cells}, '
+            f'{(log.finished_at - log.started_at).total_seconds():.1f} с'
+        ))
@@ -0,0 +1,61 @@
+# Generated by Django 6.0.1 on 2026-10-18 11:28
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('city_committee', '0003_committeeregistrationcode'),
+        ('geography', '0002_city_settlement_type'),
+        ('sports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyticsCubeRefresh',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('started_at', models.DateTimeField()),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('full', models.BooleanField(default=False)),
+                ('months', models.JSONField(default=list)),
+                ('cells', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'city_committee_analytics_cube_refresh',
+                'ordering': ['-started_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='AnalyticsCubeCell',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('age_bucket', models.CharField(max_length=10)),
+                ('gender', models.CharField(blank=True, max_length=1)),
+                ('month', models.DateField()),
+                ('athletes', models.PositiveIntegerField(default=0)),
+                ('new_athletes', models.PositiveIntegerField(default=0)),
+                ('enrollments', models.PositiveIntegerField(default=0)),
+                ('new_enrollments', models.PositiveIntegerField(default=0)),
+                ('attendance_total', models.PositiveIntegerField(default=0)),
+                ('attendance_present', models.PositiveIntegerField(default=0)),
+                ('event_participants', models.PositiveIntegerField(default=0)),
+                ('city', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='geography.city')),
+                ('sport', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='sports.sport')),
+            ],
+            options={
+                'verbose_name': 'Ячейка куба аналитики',
+                'verbose_name_plural': 'Куб аналитики',
+                'db_table': 'city_committee_analytics_cube',
+                'indexes': [models.Index(fields=['month'], name='city_commit_month_8b0ff9_idx')],
+                'unique_together': {('city', 'month', 'sport', 'age_bucket', 'gender')},
+            },
+        ),
+    ]
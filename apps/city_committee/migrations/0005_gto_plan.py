@@ -0,0 +1,34 @@
+# Generated by Django 6.0.1 on 2026-10-18 11:30
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('city_committee', '0004_analytics_cube'),
+        ('geography', '0002_city_settlement_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GtoPlan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('year', models.PositiveSmallIntegerField()),
+                ('level', models.CharField(blank=True, choices=[('1', 'Ступень 1 (6–8 лет)'), ('2', 'Ступень 2 (9–10 лет)'), ('3', 'Ступень 3 (11–12 лет)'), ('4', 'Ступень 4 (13–15 лет)'), ('5', 'Ступень 5 (16–17 лет)'), ('6', 'Ступень 6 (18–29 лет)'), ('7', 'Ступень 7 (30–39 лет)')], max_length=10)),
+                ('target', models.PositiveIntegerField(help_text='Плановое число знаков за год')),
+                ('city', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='gto_plans', to='geography.city')),
+            ],
+            options={
+                'verbose_name': 'План ГТО',
+                'verbose_name_plural': 'Планы ГТО',
+                'db_table': 'city_committee_gto_plan',
+                'unique_together': {('city', 'year', 'level')},
+            },
+        ),
+    ]
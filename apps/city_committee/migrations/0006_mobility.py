@@ -0,0 +1,54 @@
+# Generated by Django 6.0.1 on 2026-10-18 11:32
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('city_committee', '0005_gto_plan'),
+        ('geography', '0002_city_settlement_type'),
+        ('organizations', '0006_organizationrolerequest'),
+        ('training', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MobilitySnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('period_start', models.DateField()),
+                ('period_end', models.DateField()),
+                ('athletes', models.PositiveIntegerField(default=0)),
+                ('enrollments', models.PositiveIntegerField(default=0)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'city_committee_mobility_snapshot',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='MobilityTransition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('entry', 'Первое зачисление'), ('transfer', 'Переход в другую организацию'), ('internal', 'Переход между группами организации'), ('dropout', 'Уход из секций')], max_length=10)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('from_city', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='geography.city')),
+                ('from_group', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='training.traininggroup')),
+                ('from_organization', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='organizations.organization')),
+                ('snapshot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transitions', to='city_committee.mobilitysnapshot')),
+                ('to_city', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='geography.city')),
+                ('to_group', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='training.traininggroup')),
+                ('to_organization', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='organizations.organization')),
+            ],
+            options={
+                'db_table': 'city_committee_mobility_transition',
+                'indexes': [models.Index(fields=['snapshot', 'from_city'], name='city_commit_snapsho_c97879_idx'), models.Index(fields=['snapshot', 'to_city'], name='city_commit_snapsho_a91fd3_idx')],
+            },
+        ),
+    ]
@@ -1,4 +1,7 @@
 from .city_permission import CityPermission
 from .committee_staff import CommitteeStaff
 from .managed_event import ManagedEvent
-from .committee_registration import CommitteeRegistrationCode
\ No newline at end of file
+from .committee_registration import CommitteeRegistrationCode
+from .analytics_cube import AnalyticsCubeCell, AnalyticsCubeRefresh
+from .gto_plan import GtoPlan
+from .mobility import MobilitySnapshot, MobilityTransition
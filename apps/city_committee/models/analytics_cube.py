@@ -0,0 +1,53 @@
+# apps/city_committee/models/analytics_cube.py
+from django.db import models
+from apps.core.models.base import TimeStampedModel
+from apps.geography.models.city import City
+from apps.sports.models.sport import Sport
+
+
+class AnalyticsCubeCell(TimeStampedModel):
+    """Ячейка куба аналитики: город × вид спорта × возраст × пол × месяц.
+
+    Строится командой refresh_analytics_cube (apps.city_committee.analytics.cube).
+    athletes и enrollments — состояние на конец месяца, остальные показатели —
+    события за месяц.
+    """
+    city = models.ForeignKey(City, on_delete=models.CASCADE, related_name='+')
+    sport = models.ForeignKey(Sport, on_delete=models.CASCADE, related_name='+')
+    age_bucket = models.CharField(max_length=10)
+    gender = models.CharField(max_length=1, blank=True)  # '' — не указан
+    month = models.DateField()  # первое число месяца
+
+    athletes = models.PositiveIntegerField(default=0)
+    new_athletes = models.PositiveIntegerField(default=0)
+    enrollments = models.PositiveIntegerField(default=0)
+    new_enrollments = models.PositiveIntegerField(default=0)
+    attendance_total = models.PositiveIntegerField(default=0)
+    attendance_present = models.PositiveIntegerField(default=0)
+    event_participants = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'city_committee_analytics_cube'
+        verbose_name = 'Ячейка куба аналитики'
+        verbose_name_plural = 'Куб аналитики'
+        unique_together = ('city', 'month', 'sport', 'age_bucket', 'gender')
+        indexes = [
+            models.Index(fields=['month']),
+        ]
+
+
+class AnalyticsCubeRefresh(TimeStampedModel):
+    """Журнал обновлений куба; started_at последнего обновления — граница
+    для поиска изменённых данных при следующем инкрементальном обновлении"""
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField(null=True, blank=True)
+    full = models.BooleanField(default=False)
+    months = models.JSONField(default=list)
+    cells = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'city_committee_analytics_cube_refresh'
+        ordering = ['-started_at']
+
+    def __str__(self):
+        return f"{self.started_at:%Y-%m-%d %H:%M}: {len(self.months)} мес., {self.cells} ячеек"
@@ -0,0 +1,22 @@
+# apps/city_committee/models/gto_plan.py
+from django.db import models
+from apps.core.models.base import TimeStampedModel
+from apps.geography.models.city import City
+from apps.achievements.models.gto_result import GTO_LEVEL_CHOICES
+
+
+class GtoPlan(TimeStampedModel):
+    """План по знакам ГТО на год: по ступени или (ступень пуста) по городу в целом"""
+    city = models.ForeignKey(City, on_delete=models.CASCADE, related_name='gto_plans')
+    year = models.PositiveSmallIntegerField()
+    level = models.CharField(max_length=10, choices=GTO_LEVEL_CHOICES, blank=True)
+    target = models.PositiveIntegerField(help_text='Плановое число знаков за год')
+
+    class Meta:
+        db_table = 'city_committee_gto_plan'
+        verbose_name = 'План ГТО'
+        verbose_name_plural = 'Планы ГТО'
+        unique_together = ('city', 'year', 'level')
+
+    def __str__(self):
+        return f"{self.city.name}, {self.year}, {self.get_level_display() or 'все ступени'}: {self.target}"
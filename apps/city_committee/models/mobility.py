@@ -0,0 +1,54 @@
+# apps/city_committee/models/mobility.py
+from django.db import models
+from apps.core.models.base import TimeStampedModel
+from apps.geography.models.city import City
+from apps.organizations.models.organization import Organization
+from apps.training.models.group import TrainingGroup
+
+TRANSITION_KIND_CHOICES = [
+    ('entry', 'Первое зачисление'),
+    ('transfer', 'Переход в другую организацию'),
+    ('internal', 'Переход между группами организации'),
+    ('dropout', 'Уход из секций'),
+]
+
+
+class MobilitySnapshot(TimeStampedModel):
+    """Расчёт переходов спортсменов за период (apps.city_committee.analytics.mobility)"""
+    period_start = models.DateField()
+    period_end = models.DateField()
+    athletes = models.PositiveIntegerField(default=0)
+    enrollments = models.PositiveIntegerField(default=0)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'city_committee_mobility_snapshot'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.period_start} — {self.period_end}"
+
+
+class MobilityTransition(models.Model):
+    """Число переходов одного вида между парой «откуда → куда» в расчёте.
+
+    transfer — между организациями (группы не указываются), internal —
+    между группами одной организации, dropout — из группы в никуда,
+    entry — первое зачисление в организацию.
+    """
+    snapshot = models.ForeignKey(MobilitySnapshot, on_delete=models.CASCADE, related_name='transitions')
+    kind = models.CharField(max_length=10, choices=TRANSITION_KIND_CHOICES)
+    from_city = models.ForeignKey(City, on_delete=models.CASCADE, null=True, related_name='+')
+    from_organization = models.ForeignKey(Organization, on_delete=models.CASCADE, null=True, related_name='+')
+    from_group = models.ForeignKey(TrainingGroup, on_delete=models.CASCADE, null=True, related_name='+')
+    to_city = models.ForeignKey(City, on_delete=models.CASCADE, null=True, related_name='+')
+    to_organization = models.ForeignKey(Organization, on_delete=models.CASCADE, null=True, related_name='+')
+    to_group = models.ForeignKey(TrainingGroup, on_delete=models.CASCADE, null=True, related_name='+')
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'city_committee_mobility_transition'
+        indexes = [
+            models.Index(fields=['snapshot', 'from_city']),
+            models.Index(fields=['snapshot', 'to_city']),
+        ]
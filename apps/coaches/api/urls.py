@@ -2,7 +2,7 @@
 from django.urls import path
 from .views import (
     get_coach_groups, approve_athlete_enrollment, reject_athlete_enrollment, send_club_request,
-    search_clubs, get_coach_profile, get_coach_organizations, get_organization_groups,
+    search_clubs, search_nearby_clubs, get_coach_profile, get_coach_organizations, get_organization_groups,
     get_free_organizations, get_coach_requests_for_director, approve_coach_request_by_director,
     reject_coach_request_by_director, get_free_coaches_for_director, send_coach_invitation,
     get_coach_invitations, accept_coach_invitation, reject_coach_invitation
@@ -16,6 +16,7 @@ urlpatterns = [
     path('enrollments/<int:enrollment_id>/approve/', approve_athlete_enrollment, name='coach-approve-enrollment'),
     path('enrollments/<int:enrollment_id>/reject/', reject_athlete_enrollment, name='coach-reject-enrollment'),
     path('clubs/search/', search_clubs, name='coach-search-clubs'),
+    path('clubs/search/nearby/', search_nearby_clubs, name='coach-search-nearby-clubs'),
     path('clubs/request/', send_club_request, name='coach-send-request'),
     # Новые маршруты для системы заявок и приглашений
     path('free-organizations/', get_free_organizations, name='coach-free-organizations'),
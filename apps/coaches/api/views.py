@@ -9,9 +9,11 @@ from .serializers import (
     ClubRequestDetailSerializer
 )
 from apps.training.models import Enrollment
-from apps.notifications.models import Notification
+from apps.notifications.services import outbox
 from apps.coaches.models import ClubRequest, CoachInvitation
 from apps.organizations.models import Organization
+from apps.core.search.index import rank_queryset
+from apps.coaches.services import club_search
 from apps.organizations.staff.coach_membership import CoachMembership
 from django.utils import timezone
 
@@ -54,7 +56,7 @@ def approve_athlete_enrollment(request, enrollment_id):
 
         # Уведомление родителям и самому спортсмену
         athlete = enrollment.athlete
-        Notification.objects.create(
+        outbox.enqueue(
             recipient=athlete.user,
             notification_type='enrollment_approved',
             title='Вы зачислены в группу',
@@ -62,7 +64,7 @@ def approve_athlete_enrollment(request, enrollment_id):
         )
 
         # Уведомление: ознакомьтесь с мед. данными
-        Notification.objects.create(
+        outbox.enqueue(
             recipient=request.user,
             notification_type='medical_review',
             title='Ознакомьтесь с медицинскими данными ученика',
@@ -92,7 +94,7 @@ def reject_athlete_enrollment(request, enrollment_id):
         enrollment.status = 'rejected'
         enrollment.save()
 
-        Notification.objects.create(
+        outbox.enqueue(
             recipient=enrollment.athlete.user,
             notification_type='enrollment_rejected',
             title='Ваша заявка отклонена',
@@ -114,17 +116,35 @@ def search_clubs(request):
     city = request.query_params.get('city')
     sport_id = request.query_params.get('sport_id')
 
-    if name:
-        queryset = queryset.filter(name__icontains=name)
     if city:
         queryset = queryset.filter(city__name__icontains=city)
     if sport_id:
         queryset = queryset.filter(sport_directions__sport_id=sport_id)
+    if name:
+        # Полнотекстовый поиск с ранжированием по релевантности
+        queryset = rank_queryset(queryset, 'organization', name).order_by('-search_rank', 'name')
 
     serializer = ClubSearchSerializer(queryset.distinct(), many=True)
     return Response(serializer.data)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def search_nearby_clubs(request):
+    """Ближайшие клубы к точке: lat, lon, radius (км), limit, sport_id"""
+    try:
+        query = club_search.parse_query(request.query_params)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=400)
+
+    queryset = Organization.objects.select_related('city__region').prefetch_related('sport_directions__sport')
+    results = club_search.nearest_organizations(queryset, **query)
+    data = ClubSearchSerializer([org for org, _ in results], many=True).data
+    for item, (_, distance) in zip(data, results):
+        item['distance_km'] = round(distance, 2)
+    return Response(data)
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def send_club_request(request):
@@ -133,9 +153,9 @@ def send_club_request(request):
     if serializer.is_valid():
         request_obj = serializer.save()
         # Уведомление директору
-        from apps.notifications.models import Notification
+        from apps.notifications.services import outbox
         director = request_obj.organization.director.user
-        Notification.objects.create(
+        outbox.enqueue(
             recipient=director,
             notification_type='coach_request',
             title='Новая заявка от тренера',
@@ -375,7 +395,7 @@ def approve_coach_request_by_director(request, request_id):
         )
         
         # Уведомление тренеру
-        Notification.objects.create(
+        outbox.enqueue(
             recipient=coach.user,
             notification_type='coach_request_approved',
             title='Ваша заявка одобрена',
@@ -412,7 +432,7 @@ def reject_coach_request_by_director(request, request_id):
         club_request.save()
         
         # Уведомление тренеру
-        Notification.objects.create(
+        outbox.enqueue(
             recipient=club_request.coach.user,
             notification_type='coach_request_rejected',
             title='Ваша заявка отклонена',
@@ -477,7 +497,7 @@ def send_coach_invitation(request):
         invitation = serializer.save()
         
         # Уведомление тренеру
-        Notification.objects.create(
+        outbox.enqueue(
             recipient=invitation.coach.user,
             notification_type='coach_invitation',
             title='Приглашение на работу',
@@ -534,7 +554,7 @@ def accept_coach_invitation(request, invitation_id):
         
         # Уведомление директору
         director = invitation.organization.director.user
-        Notification.objects.create(
+        outbox.enqueue(
             recipient=director,
             notification_type='coach_invitation_accepted',
             title='Тренер принял приглашение',
@@ -566,7 +586,7 @@ def reject_coach_invitation(request, invitation_id):
         
         # Уведомление директору
         director = invitation.organization.director.user
-        Notification.objects.create(
+        outbox.enqueue(
             recipient=director,
             notification_type='coach_invitation_rejected',
             title='Тренер отклонил приглашение',
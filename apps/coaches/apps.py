@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class CoachesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.coaches'
+
+    def ready(self):
+        from apps.coaches.services.club_search import connect_signals
+        connect_signals()  # Точечное обновление индекса поиска ближайших клубов
@@ -0,0 +1,367 @@
+# apps/coaches/services/club_search.py
+"""
+Поиск ближайших клубов: «k ближайших организаций с видом спорта X в радиусе R км».
+
+Одобренные организации с координатами хранятся в памяти процесса в
+равномерной сетке (GridIndex): ячейка CELL_SIZE_DEG × CELL_SIZE_DEG градусов
+→ id организаций. Для каждого вида спорта ведётся своя сетка, поэтому фильтр
+по виду спорта не требует перебора чужих клубов. Запрос обходит кольца ячеек
+вокруг точки по мере удаления и останавливается, когда ближайшая точка
+следующего кольца дальше радиуса или дальше k-го найденного клуба;
+кандидаты ранжируются по расстоянию haversine.
+
+Индекс строится при первом запросе одним проходом по БД и дальше
+обновляется точечно: сохранение/удаление организации или её направления
+(сигналы) после коммита увеличивает общую версию в кэше CLUB_SEARCH_CACHE и
+записывает id изменённой организации в журнал. Перед запросом процесс
+сверяет версию и перечитывает из БД только организации из журнала — так
+изменения, сделанные в других процессах (воркерах), тоже подхватываются,
+если CLUB_SEARCH_CACHE общий для процессов (Redis). Если журнал неполон
+(записи истекли, кэш сброшен) или индексу больше CLUB_SEARCH_INDEX_MAX_AGE
+секунд, индекс строится заново: массовые операции (bulk_create, update)
+сигналов не отправляют.
+
+Кэш в памяти процесса (LocMemCache без REDIS_URL) журнал с другими
+процессами не разделяет: процесс видит только свои изменения, а чужие —
+после перестроения. Поэтому для такого кэша возраст индекса ограничен
+CLUB_SEARCH_LOCAL_INDEX_MAX_AGE (по умолчанию минута).
+"""
+import heapq
+import logging
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from apps.core.utils import cache as cache_utils
+from apps.organizations.models import Organization, SportDirection
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+# ~5.6 км по широте и ~3.2 км по долготе на широте Уфы
+CELL_SIZE_DEG = 0.05
+
+DEFAULT_RADIUS_KM = 10
+MAX_RADIUS_KM = 500
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+LOAD_CHUNK_SIZE = 2000
+VERSION_KEY = 'club_search:version'
+CHANGE_LOG_TIMEOUT = 60 * 60
+# Больше изменений с прошлой сверки — дешевле построить индекс заново
+MAX_CHANGES = 500
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Расстояние по дуге большого круга, км"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class GridIndex:
+    """Равномерная сетка точек: (вид спорта или None, ячейка) → id.
+
+    Ключ с None — все точки, с id вида спорта — точки с этим видом спорта.
+    Не потокобезопасна: блокировки — на стороне ClubIndex.
+    """
+
+    def __init__(self, cell_size=CELL_SIZE_DEG):
+        self.cell_size = cell_size
+        self.points = {}  # id → (lat, lon, frozenset(sport_ids))
+        self.cells = {}
+        self.sizes = {}  # вид спорта (или None) → число точек
+
+    def __len__(self):
+        return len(self.points)
+
+    def _cell(self, lat, lon):
+        return math.floor(lat / self.cell_size), math.floor(lon / self.cell_size)
+
+    def add(self, point_id, lat, lon, sport_ids=()):
+        self.remove(point_id)
+        sport_ids = frozenset(sport_ids)
+        self.points[point_id] = (lat, lon, sport_ids)
+        row, column = self._cell(lat, lon)
+        for layer in (None, *sport_ids):
+            self.cells.setdefault((layer, row, column), set()).add(point_id)
+            self.sizes[layer] = self.sizes.get(layer, 0) + 1
+
+    def remove(self, point_id):
+        point = self.points.pop(point_id, None)
+        if point is None:
+            return
+        lat, lon, sport_ids = point
+        row, column = self._cell(lat, lon)
+        for layer in (None, *sport_ids):
+            key = (layer, row, column)
+            self.cells[key].discard(point_id)
+            if not self.cells[key]:
+                del self.cells[key]
+            self.sizes[layer] -= 1
+
+    def _ring(self, layer, row, column, ring):
+        """Id точек в ячейках на расстоянии ring (по Чебышёву) от ячейки (row, column)"""
+        if ring == 0:
+            yield from self.cells.get((layer, row, column), ())
+            return
+        for d_column in range(-ring, ring + 1):
+            yield from self.cells.get((layer, row - ring, column + d_column), ())
+            yield from self.cells.get((layer, row + ring, column + d_column), ())
+        for d_row in range(-ring + 1, ring):
+            yield from self.cells.get((layer, row + d_row, column - ring), ())
+            yield from self.cells.get((layer, row + d_row, column + ring), ())
+
+    def nearest(self, lat, lon, k, radius_km, sport_id=None):
+        """До k ближайших точек в радиусе: [(расстояние км, id)] по возрастанию"""
+        best = []  # куча (-расстояние, -id): в вершине — самый дальний из найденных
+
+        def consider(point_ids):
+            for point_id in point_ids:
+                point_lat, point_lon, _ = self.points[point_id]
+                distance = haversine_km(lat, lon, point_lat, point_lon)
+                if distance > radius_km:
+                    continue
+                item = (-distance, -point_id)
+                if len(best) < k:
+                    heapq.heappush(best, item)
+                elif item > best[0]:
+                    heapq.heapreplace(best, item)
+
+        # Нижняя граница расстояния до точек кольца: кольцо ring отделено от
+        # ячейки запроса ring - 1 целыми ячейками; по долготе ячейка уже всего
+        # у дальнего от экватора края области поиска
+        edge_lat = min(abs(lat) + radius_km / KM_PER_DEGREE, 89.0)
+        step_km = self.cell_size * KM_PER_DEGREE * math.cos(math.radians(edge_lat))
+        rings = int(radius_km / step_km) + 2
+        layer = sport_id
+        if (2 * rings + 1) ** 2 > self.sizes.get(layer, 0):
+            # Ячеек в области поиска больше, чем точек, — дешевле перебрать точки
+            consider(
+                self.points if layer is None
+                else (point_id for point_id, point in self.points.items() if layer in point[2])
+            )
+        else:
+            row, column = self._cell(lat, lon)
+            for ring in range(rings + 1):
+                lower_bound = max(ring - 1, 0) * step_km
+                if lower_bound > radius_km or (len(best) == k and lower_bound > -best[0][0]):
+                    break
+                consider(self._ring(layer, row, column, ring))
+        return sorted((-distance, -point_id) for distance, point_id in best)
+
+
+def _alias():
+    return getattr(settings, 'CLUB_SEARCH_CACHE', 'default')
+
+
+def _cache():
+    return caches[_alias()]
+
+
+def max_age():
+    """Возраст индекса процесса, после которого он строится заново, секунд"""
+    if cache_utils.is_shared(_alias()):
+        return getattr(settings, 'CLUB_SEARCH_INDEX_MAX_AGE', 60 * 60)
+    # Изменения других процессов видны только после перестроения
+    return getattr(settings, 'CLUB_SEARCH_LOCAL_INDEX_MAX_AGE', 60)
+
+
+def _change_key(version):
+    return f'club_search:change:{version}'
+
+
+def shared_version():
+    """Общая версия индекса; None — ещё не было изменений (или кэш сброшен)"""
+    return _cache().get(VERSION_KEY)
+
+
+def _initial_version():
+    # Версия начинается со времени, чтобы после сброса кэша не совпасть с прежней
+    return int(time.time() * 1000)
+
+
+def publish_change(organization_id):
+    """Записать изменение организации в журнал и увеличить версию индекса"""
+    cache = _cache()
+    cache.add(VERSION_KEY, _initial_version(), None)
+    try:
+        version = cache.incr(VERSION_KEY)
+    except ValueError:
+        # Ключ пропал между add и incr — новая версия без журнала, процессы перестроят индекс
+        version = _initial_version()
+        cache.set(VERSION_KEY, version, None)
+        return version
+    cache.set(_change_key(version), organization_id, CHANGE_LOG_TIMEOUT)
+    return version
+
+
+def load_points(organization_ids=None):
+    """Координаты и виды спорта одобренных организаций: {id: (lat, lon, {sport_id})}"""
+    queryset = Organization.objects.filter(
+        status='approved', latitude__isnull=False, longitude__isnull=False
+    )
+    if organization_ids is not None:
+        queryset = queryset.filter(id__in=organization_ids)
+    points = {
+        org_id: (float(lat), float(lon), set())
+        for org_id, lat, lon in queryset.values_list('id', 'latitude', 'longitude')
+        .iterator(chunk_size=LOAD_CHUNK_SIZE)
+    }
+    directions = (
+        SportDirection.objects.filter(organization__in=queryset)
+        .values_list('organization_id', 'sport_id')
+        .iterator(chunk_size=LOAD_CHUNK_SIZE)
+    )
+    for org_id, sport_id in directions:
+        if org_id in points:
+            points[org_id][2].add(sport_id)
+    return points
+
+
+class ClubIndex:
+    """Индекс клубов процесса с синхронизацией по журналу изменений"""
+
+    def __init__(self):
+        self.grid = None
+        self.version = None
+        self.built_at = None
+        self.lock = threading.RLock()
+
+    def rebuild(self):
+        version = shared_version()
+        grid = GridIndex()
+        for org_id, (lat, lon, sport_ids) in load_points().items():
+            grid.add(org_id, lat, lon, sport_ids)
+        with self.lock:
+            self.grid, self.version, self.built_at = grid, version, time.monotonic()
+        return grid
+
+    def refresh(self, organization_ids):
+        """Перечитать организации из БД: обновить, неодобренные и удалённые — убрать"""
+        points = load_points(organization_ids)
+        with self.lock:
+            for org_id in organization_ids:
+                if org_id in points:
+                    lat, lon, sport_ids = points[org_id]
+                    self.grid.add(org_id, lat, lon, sport_ids)
+                else:
+                    self.grid.remove(org_id)
+
+    def sync(self):
+        """Привести индекс к общей версии: точечно по журналу или перестроением"""
+        if self.grid is None or time.monotonic() - self.built_at > max_age():
+            self.rebuild()
+            return
+        version = shared_version()
+        if version == self.version:
+            return
+        if version is None or self.version is None or not self.version < version <= self.version + MAX_CHANGES:
+            self.rebuild()
+            return
+        keys = [_change_key(number) for number in range(self.version + 1, version + 1)]
+        changes = _cache().get_many(keys)
+        if len(changes) < len(keys):
+            self.rebuild()
+            return
+        self.refresh(set(changes.values()))
+        self.version = version
+
+    def nearest(self, lat, lon, k=DEFAULT_LIMIT, radius_km=DEFAULT_RADIUS_KM, sport_id=None):
+        with self.lock:
+            self.sync()
+            return self.grid.nearest(lat, lon, k, radius_km, sport_id)
+
+
+index = ClubIndex()
+
+
+def nearest_clubs(latitude, longitude, radius_km=DEFAULT_RADIUS_KM, limit=DEFAULT_LIMIT, sport_id=None):
+    """Ближайшие одобренные клубы: [(organization_id, расстояние км)] по возрастанию"""
+    return [
+        (org_id, distance)
+        for distance, org_id in index.nearest(latitude, longitude, limit, radius_km, sport_id)
+    ]
+
+
+def nearest_organizations(queryset=None, **query):
+    """Ближайшие клубы объектами: [(Organization, расстояние км)].
+
+    Организации перечитываются из queryset (select_related/prefetch_related
+    под сериализатор) и повторно проверяются на одобрение.
+    """
+    results = nearest_clubs(**query)
+    queryset = queryset if queryset is not None else Organization.objects.all()
+    organizations = queryset.filter(status='approved').in_bulk([org_id for org_id, _ in results])
+    return [(organizations[org_id], distance) for org_id, distance in results if org_id in organizations]
+
+
+def parse_query(params):
+    """Параметры запроса (lat, lon, radius, limit, sport_id) → аргументы nearest_clubs.
+
+    ValueError — некорректные параметры.
+    """
+    try:
+        latitude = float(params['lat'])
+        longitude = float(params['lon'])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError('Укажите координаты lat и lon')
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValueError('Координаты вне допустимого диапазона')
+    try:
+        radius_km = float(params.get('radius', DEFAULT_RADIUS_KM))
+        limit = int(params.get('limit', DEFAULT_LIMIT))
+        sport_id = int(params['sport_id']) if params.get('sport_id') else None
+    except (TypeError, ValueError):
+        raise ValueError('radius, limit и sport_id должны быть числами')
+    if not 0 < radius_km <= MAX_RADIUS_KM:
+        raise ValueError(f'radius должен быть от 0 до {MAX_RADIUS_KM} км')
+    if not 0 < limit <= MAX_LIMIT:
+        raise ValueError(f'limit должен быть от 1 до {MAX_LIMIT}')
+    return {
+        'latitude': latitude, 'longitude': longitude,
+        'radius_km': radius_km, 'limit': limit, 'sport_id': sport_id,
+    }
+
+
+# === Сигналы ===
+
+def _publish_on_commit(organization_id):
+    def publish():
+        try:
+            publish_change(organization_id)
+        except Exception as e:
+            # Ошибка кэша не должна ломать сохранение; индекс перестроится по возрасту
+            logger.warning(f'Ошибка публикации изменения индекса клубов (organization:{organization_id}): {str(e)}')
+    transaction.on_commit(publish)
+
+
+def _on_organization_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    _publish_on_commit(instance.pk)
+
+
+def _on_sport_direction_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    _publish_on_commit(instance.organization_id)
+
+
+def connect_signals():
+    post_save.connect(_on_organization_change, sender=Organization, dispatch_uid='club_search_organization_save')
+    post_delete.connect(_on_organization_change, sender=Organization, dispatch_uid='club_search_organization_delete')
+    post_save.connect(_on_sport_direction_change, sender=SportDirection,
+                      dispatch_uid='club_search_sport_direction_save')
+    post_delete.connect(_on_sport_direction_change, sender=SportDirection,
+                        dispatch_uid='club_search_sport_direction_delete')
@@ -4,13 +4,22 @@ from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework import status
 from apps.core.models.news import NewsArticle
+from apps.core.search.index import rank_queryset
 
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_news_list(request):
-    """Получить список опубликованных новостей (публичный endpoint)"""
-    articles = NewsArticle.objects.filter(is_published=True).order_by('-published_at', '-created_at')
+    """Получить список опубликованных новостей (публичный endpoint)
+
+    Параметр search — полнотекстовый поиск с сортировкой по релевантности.
+    """
+    articles = NewsArticle.objects.filter(is_published=True).select_related('author')
+    search = request.query_params.get('search', '').strip()
+    if search:
+        articles = rank_queryset(articles, 'news', search).order_by('-search_rank', '-published_at')
+    else:
+        articles = articles.order_by('-published_at', '-created_at')
     
     data = []
     for article in articles:
@@ -6,4 +6,6 @@ class CoreConfig(AppConfig):
     name = 'apps.core'
     
     def ready(self):
-        import apps.core.signals  # Регистрируем сигналы для автоматического создания администратора
\ No newline at end of file
+        import apps.core.signals  # Регистрируем сигналы для автоматического создания администратора
+        from apps.core.search.signals import connect_signals
+        connect_signals()  # Обновление поискового индекса при сохранении объектов
\ No newline at end of file
@@ -0,0 +1,26 @@
+# apps/core/management/commands/rebuild_search_index.py
+"""
+Команда для пересборки полнотекстового поискового индекса
+Использование: python manage.py rebuild_search_index [--kind event]
+"""
+from django.core.management.base import BaseCommand
+
+from apps.core.search.documents import SEARCHABLE
+from apps.core.search.index import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает поисковый индекс мероприятий, организаций и новостей'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--kind',
+            action='append',
+            choices=list(SEARCHABLE),
+            help='Вид документов (можно указать несколько раз; по умолчанию все)',
+        )
+
+    def handle(self, *args, **options):
+        result = rebuild_index(options['kind'])
+        for kind, count in result.items():
+            self.stdout.write(self.style.SUCCESS(f'✓ {kind}: проиндексировано {count}'))
@@ -1,7 +1,43 @@
 # apps/core/middleware/audit.py
+import time
+
+from django.conf import settings
 from django.utils.deprecation import MiddlewareMixin
 
+from apps.audit.services import writer
+
+EXCLUDED_PREFIXES = tuple(getattr(settings, 'AUDIT_EXCLUDED_PATHS', ('/static/', '/media/', '/favicon.ico')))
+
+
 class AuditMiddleware(MiddlewareMixin):
+    """Аудит запросов: пользователь, метод и путь, статус, IP, User-Agent и время обработки.
+
+    Запись уходит в буфер apps.audit.services.writer и сохраняется фоновым
+    потоком пачками, поэтому запрос не ждёт БД. Отключается AUDIT_REQUESTS = False.
+    """
+
     def process_request(self, request):
-        # Пока пусто — логика аудита будет позже
-        pass
\ No newline at end of file
+        request._audit_started = time.perf_counter()
+
+    def process_response(self, request, response):
+        started = getattr(request, '_audit_started', None)
+        if started is None or not getattr(settings, 'AUDIT_REQUESTS', True):
+            return response
+        if request.path.startswith(EXCLUDED_PREFIXES):
+            return response
+
+        user = getattr(request, 'user', None)
+        match = getattr(request, 'resolver_match', None)
+        writer.record(
+            user=user if user is not None and user.is_authenticated else None,
+            action=f'http_{request.method.lower()}',
+            ip_address=writer.client_ip(request),
+            user_agent=request.META.get('HTTP_USER_AGENT', '')[:500],
+            details={
+                'path': request.path,
+                'status': response.status_code,
+                'duration_ms': round((time.perf_counter() - started) * 1000, 2),
+                'view': match.view_name if match else None,
+            },
+        )
+        return response
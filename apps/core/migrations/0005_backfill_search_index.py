@@ -0,0 +1,20 @@
+from django.db import migrations
+
+
+def backfill_search_index(apps, schema_editor):
+    """Проиндексировать уже существующие мероприятия, организации и новости"""
+    from apps.core.search.index import rebuild_index
+    rebuild_index(registry=apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_searchdocument'),
+        ('events', '0006_event_status_start_date_index'),
+        ('organizations', '0006_organizationrolerequest'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_search_index, migrations.RunPython.noop),
+    ]
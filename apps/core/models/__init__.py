@@ -2,4 +2,5 @@ from .audit_base import AuditBaseModel
 from .base import TimeStampedModel, SoftDeleteModel
 from .encryption import EncryptedFieldMixin, EncryptedTextField
 from .contact import ContactMessage
-from .news import NewsArticle
\ No newline at end of file
+from .news import NewsArticle
+from .search import SearchDocument
\ No newline at end of file
@@ -0,0 +1,22 @@
+# apps/core/models/search.py
+from django.db import models
+from apps.core.models.base import TimeStampedModel
+
+class SearchDocument(TimeStampedModel):
+    """Индексируемый документ полнотекстового поиска.
+
+    Хранит исходный текст объекта (мероприятия, организации, новости).
+    Поисковые структуры зависят от СУБД и создаются миграцией: на PostgreSQL —
+    генерируемая колонка tsvector с GIN-индексом, на SQLite — таблица FTS5.
+    """
+    kind = models.CharField(max_length=30)  # 'event', 'organization', 'news'
+    object_id = models.PositiveBigIntegerField()
+    title = models.CharField(max_length=255)
+    body = models.TextField(blank=True)
+
+    class Meta:
+        db_table = 'core_search_document'
+        unique_together = ('kind', 'object_id')
+
+    def __str__(self):
+        return f"{self.kind}:{self.object_id} {self.title}"
@@ -0,0 +1,9 @@
+# apps/core/search/__init__.py
+"""
+Полнотекстовый поиск по мероприятиям, организациям и новостям.
+
+Бэкенд выбирается настройкой SEARCH_BACKEND: PostgreSQL (tsvector + GIN,
+русская морфология) или SQLite FTS5 (с русским стеммером). Документы
+обновляются сигналами при сохранении объектов (см. signals.py).
+"""
+
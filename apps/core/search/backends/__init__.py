@@ -0,0 +1,23 @@
+# apps/core/search/backends/__init__.py
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+DEFAULT_BACKENDS = {
+    'postgresql': 'apps.core.search.backends.postgres.PostgresSearchBackend',
+    'sqlite': 'apps.core.search.backends.sqlite.SQLiteFTSBackend',
+}
+FALLBACK_BACKEND = 'apps.core.search.backends.simple.SimpleSearchBackend'
+
+_backend = None
+
+
+def get_backend():
+    """Бэкенд поиска из settings.SEARCH_BACKEND (по умолчанию — по типу СУБД)"""
+    global _backend
+    if _backend is None:
+        from django.db import connection
+        path = getattr(settings, 'SEARCH_BACKEND', None) or DEFAULT_BACKENDS.get(
+            connection.vendor, FALLBACK_BACKEND
+        )
+        _backend = import_string(path)()
+    return _backend
@@ -0,0 +1,65 @@
+# apps/core/search/backends/base.py
+from django.db import connection
+from django.db.models import FloatField, Value
+from django.db.models.expressions import RawSQL
+
+from apps.core.models.search import SearchDocument
+
+
+class BaseSearchBackend:
+    """Интерфейс бэкенда полнотекстового поиска.
+
+    Исходный текст хранится в SearchDocument; бэкенд отвечает за поисковые
+    структуры СУБД и ранжирование.
+    """
+
+    def index(self, kind, object_id, title, body):
+        """Добавить или обновить документ"""
+        document, _ = SearchDocument.objects.update_or_create(
+            kind=kind, object_id=object_id,
+            defaults={'title': title[:255], 'body': body}
+        )
+        return document
+
+    def remove(self, kind, object_id):
+        """Удалить документ из индекса"""
+        SearchDocument.objects.filter(kind=kind, object_id=object_id).delete()
+
+    def clear(self, kind):
+        """Удалить все документы вида kind"""
+        SearchDocument.objects.filter(kind=kind).delete()
+
+    def search(self, kind, query, limit):
+        """Список (object_id, rank) по убыванию релевантности"""
+        raise NotImplementedError
+
+    def match_sql(self, kind, query):
+        """(sql, params) подзапроса object_id совпавших документов; None — в запросе нет слов"""
+        raise NotImplementedError
+
+    def rank_sql(self, kind, query, column):
+        """(sql, params) скалярного подзапроса ранга документа объекта column
+        (квалифицированная колонка pk внешнего запроса)"""
+        raise NotImplementedError
+
+    def match_queryset(self, queryset, kind, query):
+        """queryset, ограниченный совпавшими документами (подзапрос в SQL, без лимита)"""
+        match = self.match_sql(kind, query)
+        if match is None:
+            return queryset.none()
+        return queryset.filter(pk__in=RawSQL(*match))
+
+    def empty_ranked(self, queryset):
+        """Пустой результат с аннотацией search_rank (сортировка по ней не ломается)"""
+        return queryset.none().annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    def rank_queryset(self, queryset, kind, query):
+        """match_queryset с аннотацией search_rank"""
+        match = self.match_sql(kind, query)
+        if match is None:
+            return self.empty_ranked(queryset)
+        meta = queryset.model._meta
+        column = f'{connection.ops.quote_name(meta.db_table)}.{connection.ops.quote_name(meta.pk.column)}'
+        return queryset.filter(pk__in=RawSQL(*match)).annotate(
+            search_rank=RawSQL(*self.rank_sql(kind, query, column), output_field=FloatField())
+        )
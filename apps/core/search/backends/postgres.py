@@ -0,0 +1,60 @@
+# apps/core/search/backends/postgres.py
+from django.db import connection
+
+from apps.core.models.search import SearchDocument
+from apps.core.search.stemmer import tokenize
+from .base import BaseSearchBackend
+
+SEARCH_CONFIG = 'russian'
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """Поиск на PostgreSQL: tsvector + GIN.
+
+    Колонка search_vector генерируется СУБД из title (вес A) и body (вес B)
+    с конфигурацией 'russian', поэтому индекс обновляется вместе с
+    SearchDocument. Слова запроса ищутся как префиксы (to_tsquery ':*'),
+    ранжирование — ts_rank_cd.
+    """
+
+    def _tsquery(self, query):
+        terms = tokenize(query)
+        if not terms:
+            return None
+        # tokenize оставляет только символы слов, поэтому синтаксис tsquery не нарушается
+        return ' & '.join(f'{term}:*' for term in terms)
+
+    def match_sql(self, kind, query):
+        tsquery = self._tsquery(query)
+        if tsquery is None:
+            return None
+        return (
+            f"SELECT object_id FROM {SearchDocument._meta.db_table} "
+            f"WHERE kind = %s AND search_vector @@ to_tsquery(%s, %s)",
+            [kind, SEARCH_CONFIG, tsquery],
+        )
+
+    def rank_sql(self, kind, query, column):
+        # Документ объекта находится по уникальному индексу (kind, object_id)
+        return (
+            f"(SELECT ts_rank_cd(d.search_vector, to_tsquery(%s, %s)) "
+            f"FROM {SearchDocument._meta.db_table} d WHERE d.kind = %s AND d.object_id = {column})",
+            [SEARCH_CONFIG, self._tsquery(query), kind],
+        )
+
+    def search(self, kind, query, limit):
+        tsquery = self._tsquery(query)
+        if tsquery is None:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT object_id, ts_rank_cd(search_vector, query) AS rank
+                FROM {SearchDocument._meta.db_table}, to_tsquery(%s, %s) query
+                WHERE kind = %s AND search_vector @@ query
+                ORDER BY rank DESC
+                LIMIT %s
+                """,
+                [SEARCH_CONFIG, tsquery, kind, limit]
+            )
+            return [(object_id, float(rank)) for object_id, rank in cursor.fetchall()]
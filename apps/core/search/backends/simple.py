@@ -0,0 +1,60 @@
+# apps/core/search/backends/simple.py
+from django.db.models import Case, FloatField, OuterRef, Q, Subquery, Value, When
+
+from apps.core.models.search import SearchDocument
+from apps.core.search.stemmer import tokenize
+from .base import BaseSearchBackend
+
+
+class SimpleSearchBackend(BaseSearchBackend):
+    """Запасной бэкенд без полнотекстового индекса (подстрока по SearchDocument).
+
+    Ранг — 2 за совпадение в заголовке и 1 в тексте для каждого слова запроса.
+    """
+
+    def _documents(self, kind, terms):
+        condition = Q()
+        for term in terms:
+            condition &= Q(title__icontains=term) | Q(body__icontains=term)
+        return SearchDocument.objects.filter(condition, kind=kind)
+
+    def match_queryset(self, queryset, kind, query):
+        terms = tokenize(query)
+        if not terms:
+            return queryset.none()
+        return queryset.filter(pk__in=self._documents(kind, terms).values('object_id'))
+
+    def rank_queryset(self, queryset, kind, query):
+        terms = tokenize(query)
+        if not terms:
+            return self.empty_ranked(queryset)
+        documents = self._documents(kind, terms)
+        rank = sum(
+            Case(
+                When(title__icontains=term, then=Value(2.0)),
+                default=Value(1.0),
+                output_field=FloatField(),
+            )
+            for term in terms
+        )
+        return queryset.filter(pk__in=documents.values('object_id')).annotate(
+            search_rank=Subquery(
+                documents.filter(object_id=OuterRef('pk')).annotate(rank=rank).values('rank')[:1],
+                output_field=FloatField(),
+            )
+        )
+
+    def search(self, kind, query, limit):
+        terms = tokenize(query)
+        if not terms:
+            return []
+        hits = []
+        documents = self._documents(kind, terms).values_list(
+            'object_id', 'title', 'body'
+        )[:limit]
+        for object_id, title, body in documents:
+            title, body = title.lower(), body.lower()
+            rank = sum(2 if term in title else 1 for term in terms)
+            hits.append((object_id, float(rank)))
+        hits.sort(key=lambda hit: -hit[1])
+        return hits
@@ -0,0 +1,98 @@
+# apps/core/search/backends/sqlite.py
+from django.db import connection, transaction
+
+from apps.core.models.search import SearchDocument
+from apps.core.search.stemmer import stem, stem_text, tokenize
+from .base import BaseSearchBackend
+
+FTS_TABLE = 'core_search_fts'
+
+# Вес заголовка относительно текста в bm25
+TITLE_WEIGHT = 10.0
+BODY_WEIGHT = 1.0
+
+
+class SQLiteFTSBackend(BaseSearchBackend):
+    """Поиск на SQLite FTS5.
+
+    В таблицу FTS5 (rowid = SearchDocument.id) пишется текст, приведённый
+    к основам слов русским стеммером; запрос стеммируется так же и ищется
+    по префиксам основ. Ранжирование — bm25 с повышенным весом заголовка.
+    """
+
+    def index(self, kind, object_id, title, body):
+        with transaction.atomic():
+            document = super().index(kind, object_id, title, body)
+            with connection.cursor() as cursor:
+                cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [document.id])
+                cursor.execute(
+                    f'INSERT INTO {FTS_TABLE} (rowid, title, body) VALUES (%s, %s, %s)',
+                    [document.id, stem_text(document.title), stem_text(document.body)]
+                )
+        return document
+
+    def remove(self, kind, object_id):
+        with transaction.atomic():
+            ids = list(SearchDocument.objects.filter(
+                kind=kind, object_id=object_id
+            ).values_list('id', flat=True))
+            self._delete_rows(ids)
+            super().remove(kind, object_id)
+
+    def clear(self, kind):
+        with transaction.atomic():
+            ids = list(SearchDocument.objects.filter(kind=kind).values_list('id', flat=True))
+            self._delete_rows(ids)
+            super().clear(kind)
+
+    def _delete_rows(self, ids):
+        if not ids:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [[i] for i in ids])
+
+    def _match(self, query):
+        stems = [stem(term) for term in tokenize(query)]
+        stems = [s for s in stems if s]
+        if not stems:
+            return None
+        # Каждое слово — префикс основы в кавычках: синтаксис FTS5 в запросе не интерпретируется
+        return ' AND '.join('"{}"*'.format(s.replace('"', '""')) for s in stems)
+
+    def match_sql(self, kind, query):
+        match = self._match(query)
+        if match is None:
+            return None
+        return (
+            f"SELECT d.object_id FROM {FTS_TABLE} "
+            f"JOIN {SearchDocument._meta.db_table} d ON d.id = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH %s AND d.kind = %s",
+            [match, kind],
+        )
+
+    def rank_sql(self, kind, query, column):
+        # Строка FTS находится по rowid документа объекта, MATCH нужен для bm25
+        return (
+            f"(SELECT -bm25({FTS_TABLE}, %s, %s) FROM {FTS_TABLE} "
+            f"JOIN {SearchDocument._meta.db_table} d ON d.id = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH %s AND d.kind = %s AND d.object_id = {column})",
+            [TITLE_WEIGHT, BODY_WEIGHT, self._match(query), kind],
+        )
+
+    def search(self, kind, query, limit):
+        match = self._match(query)
+        if match is None:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT d.object_id, -bm25({FTS_TABLE}, %s, %s) AS rank
+                FROM {FTS_TABLE}
+                JOIN {SearchDocument._meta.db_table} d ON d.id = {FTS_TABLE}.rowid
+                WHERE {FTS_TABLE} MATCH %s AND d.kind = %s
+                ORDER BY rank DESC
+                LIMIT %s
+                """,
+                [TITLE_WEIGHT, BODY_WEIGHT, match, kind, limit]
+            )
+            return [(object_id, float(rank)) for object_id, rank in cursor.fetchall()]
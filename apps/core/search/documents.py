@@ -0,0 +1,55 @@
+# apps/core/search/documents.py
+"""
+Описание индексируемых объектов: какие модели попадают в поиск и из каких
+полей собирается текст документа.
+"""
+from django.apps import apps
+
+
+def _join(*parts):
+    return '\n'.join(part for part in parts if part)
+
+
+def event_document(event):
+    return event.title, _join(
+        event.description,
+        event.venue,
+        event.city.name if event.city_id else '',
+        event.get_event_type_display(),
+    )
+
+
+def organization_document(organization):
+    sports = organization.sport_directions.select_related('sport').values_list('sport__name', flat=True)
+    return organization.name, _join(
+        organization.address,
+        organization.city.name if organization.city_id else '',
+        ' '.join(sports),
+    )
+
+
+def news_document(article):
+    return article.title, _join(article.excerpt, article.content)
+
+
+# kind -> (модель, функция документа, select_related для переиндексации)
+SEARCHABLE = {
+    'event': ('events.Event', event_document, ('city',)),
+    'organization': ('organizations.Organization', organization_document, ('city',)),
+    'news': ('core.NewsArticle', news_document, ()),
+}
+
+
+def get_model(kind):
+    return apps.get_model(SEARCHABLE[kind][0])
+
+
+def build_document(kind, obj):
+    """(title, body) документа для объекта"""
+    return SEARCHABLE[kind][1](obj)
+
+
+def reindex_queryset(kind, registry=None):
+    """Все объекты вида kind; registry — реестр моделей (в миграциях — исторический)"""
+    model_label, _, related = SEARCHABLE[kind]
+    return (registry or apps).get_model(model_label).objects.select_related(*related).order_by('pk')
@@ -0,0 +1,65 @@
+# apps/core/search/index.py
+from .backends import get_backend
+from .documents import SEARCHABLE, build_document, reindex_queryset
+
+# Максимум документов для search()/search_ids(); фильтрация querysets
+# (match_queryset, rank_queryset) выполняется в SQL и лимита не имеет
+SEARCH_RESULT_LIMIT = 500
+
+
+def search(kind, query, limit=SEARCH_RESULT_LIMIT):
+    """Список (object_id, rank) по убыванию релевантности"""
+    query = (query or '').strip()
+    if not query:
+        return []
+    return get_backend().search(kind, query, limit)
+
+
+def search_ids(kind, query, limit=SEARCH_RESULT_LIMIT):
+    """ID найденных объектов по убыванию релевантности"""
+    return [object_id for object_id, _ in search(kind, query, limit)]
+
+
+def match_queryset(queryset, kind, query):
+    """Отфильтровать queryset по совпадениям поиска (подзапрос к индексу, все совпадения)"""
+    return get_backend().match_queryset(queryset, kind, (query or '').strip())
+
+
+def rank_queryset(queryset, kind, query):
+    """Отфильтровать queryset по совпадениям поиска и добавить аннотацию search_rank.
+
+    Поиск выполняется подзапросом в том же SQL, поэтому фильтры queryset
+    (статус, город и т.п.) применяются до пагинации и совпадения не теряются.
+    """
+    return get_backend().rank_queryset(queryset, kind, (query or '').strip())
+
+
+def index_object(kind, obj):
+    """Добавить или обновить объект в индексе"""
+    title, body = build_document(kind, obj)
+    get_backend().index(kind, obj.pk, title, body)
+
+
+def remove_object(kind, object_id):
+    """Удалить объект из индекса"""
+    get_backend().remove(kind, object_id)
+
+
+def rebuild_index(kinds=None, batch_size=500, registry=None):
+    """Пересобрать индекс для указанных видов (по умолчанию — всех).
+
+    registry — реестр моделей, из которого читаются объекты (миграция
+    передаёт исторический). Возвращает словарь {kind: количество
+    проиндексированных объектов}.
+    """
+    backend = get_backend()
+    result = {}
+    for kind in kinds or SEARCHABLE:
+        backend.clear(kind)
+        count = 0
+        for obj in reindex_queryset(kind, registry).iterator(chunk_size=batch_size):
+            title, body = build_document(kind, obj)
+            backend.index(kind, obj.pk, title, body)
+            count += 1
+        result[kind] = count
+    return result
@@ -0,0 +1,50 @@
+# apps/core/search/signals.py
+import logging
+
+from django.db.models.signals import post_delete, post_save
+
+from .documents import SEARCHABLE, get_model
+from .index import index_object, remove_object
+
+logger = logging.getLogger(__name__)
+
+
+def _make_handlers(kind):
+    def on_save(sender, instance, raw=False, **kwargs):
+        if raw:
+            return
+        try:
+            index_object(kind, instance)
+        except Exception as e:
+            # Ошибка индексации не должна ломать сохранение объекта
+            logger.warning(f'Ошибка обновления поискового индекса ({kind}:{instance.pk}): {str(e)}')
+
+    def on_delete(sender, instance, **kwargs):
+        try:
+            remove_object(kind, instance.pk)
+        except Exception as e:
+            logger.warning(f'Ошибка удаления из поискового индекса ({kind}:{instance.pk}): {str(e)}')
+
+    return on_save, on_delete
+
+
+def _reindex_organization(sender, instance, raw=False, **kwargs):
+    """Виды спорта входят в документ организации — переиндексируем её"""
+    if raw:
+        return
+    try:
+        index_object('organization', instance.organization)
+    except Exception as e:
+        logger.warning(f'Ошибка обновления поискового индекса (organization:{instance.organization_id}): {str(e)}')
+
+
+def connect_signals():
+    for kind in SEARCHABLE:
+        model = get_model(kind)
+        on_save, on_delete = _make_handlers(kind)
+        post_save.connect(on_save, sender=model, weak=False, dispatch_uid=f'search_index_save_{kind}')
+        post_delete.connect(on_delete, sender=model, weak=False, dispatch_uid=f'search_index_delete_{kind}')
+
+    from apps.organizations.models import SportDirection
+    post_save.connect(_reindex_organization, sender=SportDirection, dispatch_uid='search_index_sport_direction_save')
+    post_delete.connect(_reindex_organization, sender=SportDirection, dispatch_uid='search_index_sport_direction_delete')
@@ -0,0 +1,157 @@
+# apps/core/search/stemmer.py
+"""
+Стеммер русского языка (алгоритм Snowball / Porter для русского).
+
+Используется бэкендами поиска, у которых нет встроенной русской морфологии
+(SQLite FTS5): и индексируемый текст, и запрос приводятся к основам слов,
+поэтому «соревнования» находится по запросу «соревнование».
+"""
+import re
+
+VOWELS = 'аеиоуыэюя'
+
+PERFECTIVE_GERUND_1 = ('вшись', 'вши', 'в')
+PERFECTIVE_GERUND_2 = ('ившись', 'ывшись', 'ивши', 'ывши', 'ив', 'ыв')
+
+ADJECTIVE = (
+    'ими', 'ыми', 'его', 'ого', 'ему', 'ому',
+    'ее', 'ие', 'ые', 'ое', 'ей', 'ий', 'ый', 'ой', 'ем', 'им', 'ым', 'ом',
+    'их', 'ых', 'ую', 'юю', 'ая', 'яя', 'ою', 'ею',
+)
+PARTICIPLE_1 = ('ем', 'нн', 'вш', 'ющ', 'щ')
+PARTICIPLE_2 = ('ивш', 'ывш', 'ующ')
+
+REFLEXIVE = ('ся', 'сь')
+
+VERB_1 = (
+    'ете', 'йте', 'ешь', 'нно',
+    'ла', 'на', 'ли', 'ем', 'ло', 'но', 'ет', 'ют', 'ны', 'ть',
+    'й', 'л', 'н',
+)
+VERB_2 = (
+    'ейте', 'уйте',
+    'ила', 'ыла', 'ена', 'ите', 'или', 'ыли', 'ило', 'ыло', 'ено', 'ует', 'уют',
+    'ены', 'ить', 'ыть', 'ишь',
+    'ей', 'уй', 'ил', 'ыл', 'им', 'ым', 'ен', 'ят', 'ит', 'ыт', 'ую',
+    'ю',
+)
+
+NOUN = (
+    'иями', 'ями', 'ами', 'ией', 'иям', 'ием', 'иях',
+    'ев', 'ов', 'ие', 'ье', 'еи', 'ии', 'ей', 'ой', 'ий', 'ям', 'ем', 'ам', 'ом',
+    'ах', 'ях', 'ию', 'ью', 'ия', 'ья',
+    'а', 'е', 'и', 'й', 'о', 'у', 'ы', 'ь', 'ю', 'я',
+)
+
+SUPERLATIVE = ('ейше', 'ейш')
+DERIVATIONAL = ('ость', 'ост')
+
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def _regions(word):
+    """Начала областей RV и R2 (индексы в слове)"""
+    rv = len(word)
+    for i, ch in enumerate(word):
+        if ch in VOWELS:
+            rv = i + 1
+            break
+
+    def next_region(start):
+        for i in range(start + 1, len(word)):
+            if word[i] not in VOWELS and word[i - 1] in VOWELS:
+                return i + 1
+        return len(word)
+
+    r1 = next_region(0)
+    r2 = next_region(r1)
+    return rv, r2
+
+
+def _strip(word, start, endings):
+    """Удалить самое длинное окончание из endings, лежащее целиком после start"""
+    for ending in sorted(endings, key=len, reverse=True):
+        if word.endswith(ending) and len(word) - len(ending) >= start:
+            return word[:-len(ending)], True
+    return word, False
+
+
+def _strip_after_a(word, start, endings):
+    """Удалить окончание группы 1, которому предшествует «а» или «я»"""
+    for ending in sorted(endings, key=len, reverse=True):
+        cut = len(word) - len(ending)
+        if word.endswith(ending) and cut - 1 >= start and word[cut - 1] in 'ая':
+            return word[:cut], True
+    return word, False
+
+
+def _strip_any(word, start, group_1, group_2):
+    """Удалить самое длинное окончание из двух групп (группа 1 — после а/я)"""
+    candidates = []
+    stripped, found = _strip_after_a(word, start, group_1)
+    if found:
+        candidates.append(stripped)
+    stripped, found = _strip(word, start, group_2)
+    if found:
+        candidates.append(stripped)
+    if not candidates:
+        return word, False
+    return min(candidates, key=len), True
+
+
+def _strip_adjectival(word, start):
+    word, found = _strip(word, start, ADJECTIVE)
+    if not found:
+        return word, False
+    word, _ = _strip_any(word, start, PARTICIPLE_1, PARTICIPLE_2)
+    return word, True
+
+
+def stem(word):
+    """Основа русского слова; нерусские слова возвращаются в нижнем регистре"""
+    word = word.lower().replace('ё', 'е')
+    if not re.search('[а-я]', word):
+        return word
+
+    rv, r2 = _regions(word)
+
+    # Шаг 1
+    word, found = _strip_any(word, rv, PERFECTIVE_GERUND_1, PERFECTIVE_GERUND_2)
+    if not found:
+        word, _ = _strip(word, rv, REFLEXIVE)
+        word, found = _strip_adjectival(word, rv)
+        if not found:
+            word, found = _strip_any(word, rv, VERB_1, VERB_2)
+            if not found:
+                word, _ = _strip(word, rv, NOUN)
+
+    # Шаг 2
+    if word.endswith('и') and len(word) - 1 >= rv:
+        word = word[:-1]
+
+    # Шаг 3
+    word, _ = _strip(word, r2, DERIVATIONAL)
+
+    # Шаг 4
+    if word.endswith('нн') and len(word) - 2 >= rv:
+        word = word[:-1]
+    else:
+        stripped, found = _strip(word, rv, SUPERLATIVE)
+        if found:
+            word = stripped
+            if word.endswith('нн') and len(word) - 2 >= rv:
+                word = word[:-1]
+        elif word.endswith('ь') and len(word) - 1 >= rv:
+            word = word[:-1]
+
+    return word
+
+
+def tokenize(text):
+    """Слова текста в нижнем регистре"""
+    return _WORD_RE.findall((text or '').lower())
+
+
+def stem_text(text):
+    """Текст, приведённый к последовательности основ через пробел"""
+    return ' '.join(stem(token) for token in tokenize(text))
@@ -0,0 +1,19 @@
+# apps/core/utils/cache.py
+"""
+Проверка, разделяется ли кэш между процессами.
+
+LocMemCache (по умолчанию без REDIS_URL) и DummyCache живут в памяти одного
+процесса: веб-воркеры, management-команды и обработчик outbox видят каждый
+свою копию. Данные, которые один процесс меняет, а другой читает (счётчики,
+журналы изменений), в таком кэше держать нельзя.
+"""
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+PROCESS_LOCAL_BACKENDS = (LocMemCache, DummyCache)
+
+
+def is_shared(alias):
+    """Разделяется ли кэш alias между процессами (Redis, Memcached, БД, файлы)"""
+    return not isinstance(caches[alias], PROCESS_LOCAL_BACKENDS)
@@ -0,0 +1,135 @@
+# apps/core/utils/pagination.py
+"""
+Курсорная (keyset) пагинация для API.
+
+Вместо OFFSET страница выбирается условием по ключу сортировки
+(например, ``(start_date, id)``), поэтому стоимость глубоких страниц
+не растёт с размером таблицы.
+"""
+import base64
+import json
+from datetime import date, datetime
+
+from django.db import connection
+from django.db.models import Q
+from django.utils.dateparse import parse_date, parse_datetime
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+APPROXIMATE_COUNT_CAP = 1000
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def parse_page_size(params, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """Размер страницы из параметров запроса, ограниченный сверху maximum"""
+    try:
+        page_size = int(params.get('page_size', default))
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(page_size, maximum))
+
+
+def parse_page(params):
+    """Номер страницы из параметров запроса (не меньше 1)"""
+    try:
+        return max(1, int(params.get('page', 1)))
+    except (TypeError, ValueError):
+        return 1
+
+
+def _dump_value(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    if isinstance(value, date):
+        return {'d': value.isoformat()}
+    return value
+
+
+def _load_value(value):
+    if isinstance(value, dict):
+        if 'dt' in value:
+            parsed = parse_datetime(value['dt'])
+        elif 'd' in value:
+            parsed = parse_date(value['d'])
+        else:
+            parsed = None
+        if parsed is None:
+            raise InvalidCursor('Неверный курсор')
+        return parsed
+    return value
+
+
+def encode_cursor(values):
+    """Закодировать значения ключа сортировки в непрозрачную строку"""
+    payload = json.dumps([_dump_value(v) for v in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token, size):
+    """Раскодировать курсор; при ошибке — InvalidCursor"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidCursor('Неверный курсор')
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor('Неверный курсор')
+    return [_load_value(v) for v in values]
+
+
+def _after(fields, values, descending):
+    """Условие «строго после курсора» для составного ключа сортировки"""
+    lookup = 'lt' if descending else 'gt'
+    condition = Q()
+    for i, field in enumerate(fields):
+        step = Q(**{f'{field}__{lookup}': values[i]})
+        for prev_field, prev_value in zip(fields[:i], values[:i]):
+            step &= Q(**{prev_field: prev_value})
+        condition |= step
+    return condition
+
+
+def keyset_paginate(queryset, fields, page_size, cursor=None, descending=False):
+    """Страница queryset по ключу fields (последнее поле должно быть уникальным).
+
+    Возвращает (items, next_cursor); next_cursor равен None на последней странице.
+    """
+    fields = list(fields)
+    if cursor:
+        queryset = queryset.filter(_after(fields, decode_cursor(cursor, len(fields)), descending))
+    prefix = '-' if descending else ''
+    queryset = queryset.order_by(*[f'{prefix}{field}' for field in fields])
+
+    items = list(queryset[:page_size + 1])
+    has_next = len(items) > page_size
+    items = items[:page_size]
+
+    next_cursor = None
+    if has_next and items:
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, field) for field in fields])
+    return items, next_cursor
+
+
+def approximate_count(queryset, cap=APPROXIMATE_COUNT_CAP):
+    """Приблизительное количество строк без полного COUNT(*).
+
+    На PostgreSQL берётся оценка планировщика, на остальных СУБД — подсчёт,
+    ограниченный cap строками. Возвращает (count, is_exact).
+    """
+    if connection.vendor == 'postgresql':
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows']), False
+
+    count = queryset.order_by()[:cap + 1].count()
+    if count > cap:
+        return cap, False
+    return count, True
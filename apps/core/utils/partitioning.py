@@ -0,0 +1,287 @@
+# apps/core/utils/partitioning.py
+"""
+Помесячное секционирование таблиц PostgreSQL (PARTITION BY RANGE по дате).
+
+Таблица модели переводится в секционированную командой один раз (в окно
+обслуживания — данные копируются), дальше по расписанию создаются секции
+на месяцы вперёд, а старые месяцы удаляются целиком через DROP TABLE
+вместо построчного DELETE. Django работает с такой таблицей как с обычной;
+первичный ключ на уровне БД становится (id, <колонка секционирования>).
+
+На остальных СУБД функции ничего не делают (is_supported() == False).
+"""
+from datetime import date, datetime, time
+
+from django.db import connection, transaction
+
+DEFAULT_PARTITION_SUFFIX = '_default'
+
+
+def is_supported():
+    return connection.vendor == 'postgresql'
+
+
+def month_start(value):
+    """Первое число месяца для date/datetime"""
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.replace(day=1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _as_date(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _starts_at_or_after(month, moment):
+    """Начинается ли месяц month не раньше moment (date или datetime)"""
+    if isinstance(moment, datetime):
+        return month > moment.date() or (month == moment.date() and moment.time() == time(0))
+    return month >= moment
+
+
+def partition_name(table, month):
+    return f'{table}_p{month:%Y%m}'
+
+
+def is_partitioned(table):
+    if not is_supported():
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_class WHERE relname = %s AND relkind = 'p'", [table]
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions(table):
+    """Помесячные секции таблицы: [(имя, первый день месяца)] по возрастанию"""
+    if not is_partitioned(table):
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = %s
+            """,
+            [table]
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    prefix = f'{table}_p'
+    partitions = []
+    for name in names:
+        suffix = name[len(prefix):]
+        if name.startswith(prefix) and len(suffix) == 6 and suffix.isdigit():
+            partitions.append((name, date(int(suffix[:4]), int(suffix[4:]), 1)))
+    return sorted(partitions, key=lambda item: item[1])
+
+
+def _partition_column(cursor, table):
+    """Колонка, по которой секционирована таблица"""
+    cursor.execute(
+        """
+        SELECT attribute.attname FROM pg_partitioned_table partitioned
+        JOIN pg_attribute attribute
+            ON attribute.attrelid = partitioned.partrelid AND attribute.attnum = partitioned.partattrs[0]
+        WHERE partitioned.partrelid = %s::regclass
+        """,
+        [table]
+    )
+    return cursor.fetchone()[0]
+
+
+def _default_has_rows(cursor, default, column, start, end):
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [f'"{default}"'])
+    if not cursor.fetchone()[0]:
+        return False
+    cursor.execute(
+        f'SELECT EXISTS (SELECT 1 FROM "{default}" WHERE "{column}" >= %s AND "{column}" < %s)',
+        [start, end]
+    )
+    return cursor.fetchone()[0]
+
+
+def _create_partition(cursor, table, name, month):
+    """Создать секцию месяца. Строки этого месяца, успевшие попасть в секцию
+    по умолчанию (секции не создавались вовремя), переносятся в новую:
+    иначе PostgreSQL отказывается создавать секцию, пересекающуюся с ними"""
+    start, end = month.isoformat(), add_months(month, 1).isoformat()
+    create = f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{table}" FOR VALUES FROM (\'{start}\') TO (\'{end}\')'
+    default = f'{table}{DEFAULT_PARTITION_SUFFIX}'
+    column = _partition_column(cursor, table)
+    if not _default_has_rows(cursor, default, column, start, end):
+        cursor.execute(create)
+        return
+    with transaction.atomic():
+        cursor.execute(f'ALTER TABLE "{table}" DETACH PARTITION "{default}"')
+        cursor.execute(create)
+        cursor.execute(
+            f'INSERT INTO "{name}" SELECT * FROM "{default}" WHERE "{column}" >= %s AND "{column}" < %s',
+            [start, end]
+        )
+        cursor.execute(f'DELETE FROM "{default}" WHERE "{column}" >= %s AND "{column}" < %s', [start, end])
+        cursor.execute(f'ALTER TABLE "{table}" ATTACH PARTITION "{default}" DEFAULT')
+
+
+def ensure_partitions(table, first_month, last_month):
+    """Создать недостающие секции с first_month по last_month включительно.
+
+    Возвращает имена созданных секций.
+    """
+    if not is_partitioned(table):
+        return []
+    existing = {name for name, _ in list_partitions(table)}
+    created = []
+    month = month_start(first_month)
+    last_month = month_start(last_month)
+    with connection.cursor() as cursor:
+        while month <= last_month:
+            name = partition_name(table, month)
+            if name not in existing:
+                _create_partition(cursor, table, name, month)
+                created.append(name)
+            month = add_months(month, 1)
+    return created
+
+
+def drop_partitions_before(table, month):
+    """Удалить секции целиком для месяцев раньше month. Возвращает их имена"""
+    dropped = []
+    with connection.cursor() as cursor:
+        for name, partition_month in list_partitions(table):
+            if partition_month < month_start(month):
+                cursor.execute(f'DROP TABLE "{name}"')
+                dropped.append(name)
+    return dropped
+
+
+def drop_empty_partitions_before(table, month):
+    """Удалить пустые секции месяцев раньше month. Возвращает их имена"""
+    dropped = []
+    with connection.cursor() as cursor:
+        for name, partition_month in list_partitions(table):
+            if partition_month >= month_start(month):
+                continue
+            cursor.execute(f'SELECT EXISTS (SELECT 1 FROM "{name}")')
+            if not cursor.fetchone()[0]:
+                cursor.execute(f'DROP TABLE "{name}"')
+                dropped.append(name)
+    return dropped
+
+
+def partitions_for_range(table, start=None, end=None):
+    """Имена секций, пересекающихся с полуинтервалом [start, end)"""
+    names = []
+    for name, month in list_partitions(table):
+        if start is not None and add_months(month, 1) <= month_start(start):
+            continue
+        if end is not None and _starts_at_or_after(month, end):
+            continue
+        names.append(name)
+    return names
+
+
+def convert_to_partitioned(table, column='created_at', months_ahead=3):
+    """Перевести обычную таблицу в секционированную по месяцам колонки column.
+
+    Таблица пересоздаётся: старая переименовывается, новая создаётся по её
+    образцу (LIKE) с PARTITION BY RANGE, создаются секции на весь диапазон
+    данных и months_ahead месяцев вперёд плюс секция по умолчанию, данные
+    копируются, индексы и внешние ключи переносятся, id продолжает нумерацию
+    из последовательности. Выполняется в одной транзакции и блокирует
+    таблицу на время копирования. Возвращает False, если таблица уже
+    секционирована.
+    """
+    if not is_supported():
+        raise RuntimeError('Секционирование поддерживается только на PostgreSQL')
+    if is_partitioned(table):
+        return False
+
+    old_table = f'{table}_unpartitioned'
+    sequence = f'{table}_id_seq'  # для IDENTITY; у serial — уже существующая
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT conname FROM pg_constraint WHERE contype = 'f' AND confrelid = %s::regclass",
+            [table]
+        )
+        referencing = [row[0] for row in cursor.fetchall()]
+        if referencing:
+            raise RuntimeError(
+                f'На таблицу {table} ссылаются внешние ключи ({", ".join(referencing)}): '
+                'секционирование невозможно'
+            )
+
+        cursor.execute(
+            """
+            SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint
+            WHERE conrelid = %s::regclass AND contype IN ('p', 'u', 'f')
+            """,
+            [table]
+        )
+        constraints = cursor.fetchall()
+        unique = [name for name, definition in constraints if definition.startswith('UNIQUE')]
+        if unique:
+            raise RuntimeError(
+                f'Уникальные ограничения {", ".join(unique)} не включают {column}: '
+                'секционирование невозможно'
+            )
+        constraint_names = {name for name, _ in constraints}
+        cursor.execute("SELECT indexname, indexdef FROM pg_indexes WHERE tablename = %s", [table])
+        indexes = [(name, definition) for name, definition in cursor.fetchall() if name not in constraint_names]
+
+        cursor.execute(
+            "SELECT attidentity FROM pg_attribute WHERE attrelid = %s::regclass AND attname = 'id'",
+            [table]
+        )
+        is_identity = bool(cursor.fetchone()[0])
+        cursor.execute(f'SELECT min("{column}"), max("{column}") FROM "{table}"')
+        first, last = cursor.fetchone()
+
+        # Старая таблица уступает имена новой
+        cursor.execute(f'ALTER TABLE "{table}" RENAME TO "{old_table}"')
+        for name, _ in constraints:
+            cursor.execute(f'ALTER TABLE "{old_table}" RENAME CONSTRAINT "{name}" TO "{name}_old"')
+        for name, _ in indexes:
+            cursor.execute(f'ALTER INDEX "{name}" RENAME TO "{name}_old"')
+        if is_identity:
+            # IDENTITY у секционированных таблиц есть только с PostgreSQL 17
+            cursor.execute(f'ALTER TABLE "{old_table}" ALTER COLUMN id DROP IDENTITY')
+        else:
+            cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [old_table])
+            sequence = cursor.fetchone()[0]
+
+        cursor.execute(
+            f'CREATE TABLE "{table}" (LIKE "{old_table}" INCLUDING DEFAULTS) PARTITION BY RANGE ("{column}")'
+        )
+        cursor.execute(f'ALTER TABLE "{table}" ADD PRIMARY KEY (id, "{column}")')
+        if is_identity:
+            cursor.execute(f'CREATE SEQUENCE {sequence}')
+        cursor.execute(f'ALTER SEQUENCE {sequence} OWNED BY "{table}".id')
+        cursor.execute(f"ALTER TABLE \"{table}\" ALTER COLUMN id SET DEFAULT nextval('{sequence}')")
+        cursor.execute(f'CREATE TABLE "{table}{DEFAULT_PARTITION_SUFFIX}" PARTITION OF "{table}" DEFAULT')
+
+        today = date.today()
+        ensure_partitions(
+            table,
+            month_start(first or today),
+            add_months(month_start(max(_as_date(last), today) if last else today), months_ahead)
+        )
+
+        cursor.execute(f'INSERT INTO "{table}" SELECT * FROM "{old_table}"')
+        cursor.execute(
+            f"SELECT setval('{sequence}', (SELECT coalesce(max(id), 0) + 1 FROM \"{table}\"), false)"
+        )
+        for name, definition in indexes:
+            cursor.execute(definition)
+        for name, definition in constraints:
+            if definition.startswith('FOREIGN KEY'):
+                cursor.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{name}" {definition}')
+        cursor.execute(f'DROP TABLE "{old_table}"')
+    return True
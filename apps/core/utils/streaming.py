@@ -0,0 +1,51 @@
+# apps/core/utils/streaming.py
+"""
+Потоковые ответы, не буферизуемые под ASGI.
+
+Синхронный итератор StreamingHttpResponse под ASGI Django отдаёт через
+sync_to_async(list): весь ответ собирается в памяти и только потом уходит
+клиенту. streaming_response под ASGI оборачивает синхронный генератор в
+асинхронный итератор, который получает каждый блок отдельным sync_to_async,
+поэтому в памяти только текущий блок. Под WSGI генератор отдаётся как есть.
+"""
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+
+_DONE = object()
+
+
+def _next(iterator):
+    return next(iterator, _DONE)
+
+
+async def aiter_sync(iterable):
+    """Асинхронный итератор по синхронному: каждый блок — в потоке запроса.
+
+    Блоки читаются в том же потоке, что и синхронный код запроса
+    (thread_sensitive), поэтому серверные курсоры и соединение с БД
+    остаются прежними. При обрыве генератор закрывается.
+    """
+    iterator = iter(iterable)
+    try:
+        while True:
+            chunk = await sync_to_async(_next)(iterator)
+            if chunk is _DONE:
+                return
+            yield chunk
+    finally:
+        close = getattr(iterator, 'close', None)
+        if close is not None:
+            await sync_to_async(close)()
+
+
+def is_asgi(request):
+    """Обслуживается ли запрос (Django или DRF) ASGI-сервером"""
+    return isinstance(getattr(request, '_request', request), ASGIRequest)
+
+
+def streaming_response(request, content, **kwargs):
+    """StreamingHttpResponse с content (синхронный итератор), потоковый и под ASGI"""
+    if is_asgi(request):
+        content = aiter_sync(content)
+    return StreamingHttpResponse(content, **kwargs)
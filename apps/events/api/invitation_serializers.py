@@ -30,3 +30,4 @@ class EventInvitationCreateSerializer(serializers.Serializer):
     organization_id = serializers.IntegerField(required=False, allow_null=True)
     message = serializers.CharField(required=False, allow_blank=True, allow_null=True)
     expires_at = serializers.DateTimeField(required=False, allow_null=True)
+    background = serializers.BooleanField(required=False, allow_null=True, default=None)
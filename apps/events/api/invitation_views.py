@@ -5,27 +5,27 @@ from rest_framework.response import Response
 from rest_framework import status
 from django.utils import timezone
 from datetime import timedelta
-from django.db import transaction
 from django.db.models import Q
 from apps.events.models import Event, EventInvitation, EventRegistration
-from apps.athletes.models import AthleteProfile
-from apps.coaches.models.coach_profile import CoachProfile
-from apps.training.models import TrainingGroup
 from apps.organizations.models import Organization
-from apps.notifications.models import Notification
+from apps.events.services import invitations
 from .invitation_serializers import EventInvitationSerializer, EventInvitationCreateSerializer
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def create_invitations(request):
-    """Создание приглашений на мероприятие"""
+    """Создание приглашений на мероприятие
+
+    Адресаты собираются и рассылаются пачками сервисом invitations. Большие
+    списки (или при background=true) ставятся в очередь воркера
+    process_notification_outbox, и ответ возвращается со статусом 202.
+    """
     serializer = EventInvitationCreateSerializer(data=request.data)
     if not serializer.is_valid():
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     data = serializer.validated_data
     event_id = data['event_id']
-    invitation_type = data['invitation_type']
     
     try:
         event = Event.objects.get(id=event_id, status='published')
@@ -33,241 +33,51 @@ def create_invitations(request):
         return Response({"error": "Мероприятие не найдено"}, status=404)
     
     user = request.user
-    created_invitations = []
     errors = []
     
     try:
-        with transaction.atomic():
-            # Приглашения для отдельных спортсменов
-            if data.get('athlete_ids'):
-                for athlete_id in data['athlete_ids']:
-                    try:
-                        athlete = AthleteProfile.objects.get(id=athlete_id)
-                        
-                        # Проверяем, не отправлено ли уже приглашение
-                        existing = EventInvitation.objects.filter(
-                            event=event,
-                            athlete=athlete,
-                            status='pending'
-                        ).exists()
-                        
-                        if existing:
-                            errors.append(f"Приглашение для {athlete.user.get_full_name()} уже отправлено")
-                            continue
-                        
-                        invitation = EventInvitation.objects.create(
-                            event=event,
-                            invitation_type='athlete',
-                            athlete=athlete,
-                            sent_by=user,
-                            message=data.get('message', ''),
-                            expires_at=data.get('expires_at')
-                        )
-                        created_invitations.append(invitation)
-                        
-                        # Создаём уведомление
-                        Notification.objects.create(
-                            user=athlete.user,
-                            title=f"Приглашение на мероприятие",
-                            message=f"Вас пригласили на мероприятие '{event.title}'. Проверьте раздел приглашений.",
-                            notification_type='event_invitation',
-                            related_object_id=invitation.id
-                        )
-                    except AthleteProfile.DoesNotExist:
-                        errors.append(f"Спортсмен с ID {athlete_id} не найден")
-            
-            # Приглашения для отдельных тренеров
-            if data.get('coach_ids'):
-                for coach_id in data['coach_ids']:
-                    try:
-                        coach = CoachProfile.objects.get(id=coach_id)
-                        
-                        existing = EventInvitation.objects.filter(
-                            event=event,
-                            coach=coach,
-                            status='pending'
-                        ).exists()
-                        
-                        if existing:
-                            errors.append(f"Приглашение для {coach.user.get_full_name()} уже отправлено")
-                            continue
-                        
-                        invitation = EventInvitation.objects.create(
-                            event=event,
-                            invitation_type='coach',
-                            coach=coach,
-                            sent_by=user,
-                            message=data.get('message', ''),
-                            expires_at=data.get('expires_at')
-                        )
-                        created_invitations.append(invitation)
-                        
-                        Notification.objects.create(
-                            user=coach.user,
-                            title=f"Приглашение на мероприятие",
-                            message=f"Вас пригласили на мероприятие '{event.title}' в качестве тренера.",
-                            notification_type='event_invitation',
-                            related_object_id=invitation.id
-                        )
-                    except CoachProfile.DoesNotExist:
-                        errors.append(f"Тренер с ID {coach_id} не найден")
-            
-            # Массовые приглашения для групп (тренер)
-            if data.get('group_ids'):
-                for group_id in data['group_ids']:
-                    try:
-                        group = TrainingGroup.objects.get(id=group_id)
-                        
-                        # Проверяем права (тренер может приглашать только свои группы)
-                        if hasattr(user, 'coach_profile') and group.coach != user.coach_profile:
-                            errors.append(f"У вас нет доступа к группе {group.name}")
-                            continue
-                        
-                        # Приглашаем всех активных спортсменов группы
-                        enrollments = group.enrollments.filter(status='active')
-                        for enrollment in enrollments:
-                            athlete = enrollment.athlete
-                            
-                            existing = EventInvitation.objects.filter(
-                                event=event,
-                                athlete=athlete,
-                                status='pending'
-                            ).exists()
-                            
-                            if existing:
-                                continue
-                            
-                            invitation = EventInvitation.objects.create(
-                                event=event,
-                                invitation_type='athlete',
-                                athlete=athlete,
-                                sent_by=user,
-                                message=data.get('message', ''),
-                                expires_at=data.get('expires_at'),
-                                group_id=group_id
-                            )
-                            created_invitations.append(invitation)
-                            
-                            Notification.objects.create(
-                                user=athlete.user,
-                                title=f"Приглашение на мероприятие",
-                                message=f"Вас пригласили на мероприятие '{event.title}' из группы {group.name}.",
-                                notification_type='event_invitation',
-                                related_object_id=invitation.id
-                            )
-                    except TrainingGroup.DoesNotExist:
-                        errors.append(f"Группа с ID {group_id} не найдена")
-            
-            # Массовые приглашения для всех групп организации (организация)
-            if data.get('organization_id'):
-                try:
-                    org = Organization.objects.get(id=data['organization_id'])
-                    
-                    # Проверяем права (директор может приглашать только из своей организации)
-                    if hasattr(user, 'director_role') and org.director != user.director_role:
-                        errors.append(f"У вас нет доступа к организации {org.name}")
-                        return Response({"error": "Нет доступа"}, status=403)
-                    
-                    # Приглашаем всех спортсменов и тренеров организации
-                    groups = org.groups.all()
-                    for group in groups:
-                        enrollments = group.enrollments.filter(status='active')
-                        for enrollment in enrollments:
-                            athlete = enrollment.athlete
-                            
-                            existing = EventInvitation.objects.filter(
-                                event=event,
-                                athlete=athlete,
-                                status='pending'
-                            ).exists()
-                            
-                            if not existing:
-                                invitation = EventInvitation.objects.create(
-                                    event=event,
-                                    invitation_type='athlete',
-                                    athlete=athlete,
-                                    sent_by=user,
-                                    message=data.get('message', ''),
-                                    expires_at=data.get('expires_at'),
-                                    organization_id=org.id
-                                )
-                                created_invitations.append(invitation)
-                                
-                                Notification.objects.create(
-                                    user=athlete.user,
-                                    title=f"Приглашение на мероприятие",
-                                    message=f"Вас пригласили на мероприятие '{event.title}' от организации {org.name}.",
-                                    notification_type='event_invitation',
-                                    related_object_id=invitation.id
-                                )
-                    
-                    # Приглашаем тренеров организации
-                    for group in groups:
-                        if group.coach:
-                            existing = EventInvitation.objects.filter(
-                                event=event,
-                                coach=group.coach,
-                                status='pending'
-                            ).exists()
-                            
-                            if not existing:
-                                invitation = EventInvitation.objects.create(
-                                    event=event,
-                                    invitation_type='coach',
-                                    coach=group.coach,
-                                    sent_by=user,
-                                    message=data.get('message', ''),
-                                    expires_at=data.get('expires_at'),
-                                    organization_id=org.id
-                                )
-                                created_invitations.append(invitation)
-                                
-                                Notification.objects.create(
-                                    user=group.coach.user,
-                                    title=f"Приглашение на мероприятие",
-                                    message=f"Вас пригласили на мероприятие '{event.title}' в качестве тренера от организации {org.name}.",
-                                    notification_type='event_invitation',
-                                    related_object_id=invitation.id
-                                )
-                except Organization.DoesNotExist:
-                    errors.append(f"Организация с ID {data['organization_id']} не найдена")
-            
-            # Приглашения для детей родителя
-            if hasattr(user, 'parent_profile'):
-                children = user.parent_profile.children.all()
-                for child_link in children:
-                    athlete = child_link.athlete
-                    
-                    existing = EventInvitation.objects.filter(
-                        event=event,
-                        athlete=athlete,
-                        status='pending'
-                    ).exists()
-                    
-                    if existing:
-                        continue
-                    
-                    invitation = EventInvitation.objects.create(
-                        event=event,
-                        invitation_type='athlete',
-                        athlete=athlete,
-                        sent_by=user,
-                        message=data.get('message', ''),
-                        expires_at=data.get('expires_at')
-                    )
-                    created_invitations.append(invitation)
-                    
-                    Notification.objects.create(
-                        user=athlete.user,
-                        title=f"Приглашение на мероприятие",
-                        message=f"Ваш родитель пригласил вас на мероприятие '{event.title}'.",
-                        notification_type='event_invitation',
-                        related_object_id=invitation.id
-                    )
+        # Массовые приглашения для всех групп организации (организация)
+        organization = None
+        if data.get('organization_id'):
+            try:
+                organization = Organization.objects.get(id=data['organization_id'])
+            except Organization.DoesNotExist:
+                errors.append(f"Организация с ID {data['organization_id']} не найдена")
+            else:
+                # Проверяем права (директор может приглашать только из своей организации)
+                if hasattr(user, 'director_role') and user.director_role.organization_id != organization.id:
+                    return Response({"error": "Нет доступа"}, status=403)
+        
+        targets, target_errors = invitations.collect_targets(
+            event,
+            user,
+            athlete_ids=data.get('athlete_ids') or [],
+            coach_ids=data.get('coach_ids') or [],
+            group_ids=data.get('group_ids') or [],
+            organization=organization
+        )
+        errors.extend(target_errors)
+        
+        count, queued = invitations.fan_out(
+            event,
+            user,
+            targets,
+            message=data.get('message', ''),
+            expires_at=data.get('expires_at'),
+            background=data.get('background')
+        )
+        
+        if queued:
+            return Response({
+                "message": f"Рассылка приглашений поставлена в очередь: {count}",
+                "queued_count": count,
+                "created_count": 0,
+                "errors": errors if errors else None
+            }, status=status.HTTP_202_ACCEPTED)
         
         return Response({
-            "message": f"Создано приглашений: {len(created_invitations)}",
-            "created_count": len(created_invitations),
+            "message": f"Создано приглашений: {count}",
+            "created_count": count,
             "errors": errors if errors else None
         }, status=status.HTTP_201_CREATED)
     
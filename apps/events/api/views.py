@@ -4,19 +4,40 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework import status
 from django.utils import timezone
-from django.db.models import Q
 from datetime import timedelta
 from .serializers import (
     EventSerializer, EventCreateSerializer,
     EventRegistrationSerializer, EventResultSerializer
 )
 from apps.events.models import Event, EventRegistration, EventResult
+from apps.events.services import eligibility
+from apps.core.search.index import match_queryset, rank_queryset
+from apps.core.utils.pagination import (
+    InvalidCursor, approximate_count, keyset_paginate, parse_page, parse_page_size
+)
+
+def _serialize_events(events):
+    """Сериализация страницы мероприятий с предзагрузкой категорий одним запросом"""
+    event_types = {event.event_type for event in events if event.event_type}
+    categories_map = {}
+    if event_types:
+        from apps.events.models import EventCategory
+        categories = EventCategory.objects.filter(name__in=event_types)
+        categories_map = {cat.name: cat for cat in categories}
+    return EventSerializer(events, many=True, context={'categories_map': categories_map}).data
+
 
 # === Список мероприятий ===
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def list_events(request):
-    """Список опубликованных мероприятий с пагинацией"""
+    """Список опубликованных мероприятий с пагинацией
+
+    По умолчанию — постраничная пагинация (page/page_size). Параметр cursor
+    (или pagination=cursor для первой страницы) включает курсорный режим по
+    (start_date, id); include_total=true добавляет приблизительное количество.
+    page_size ограничен MAX_PAGE_SIZE.
+    """
     try:
         events = Event.objects.filter(status='published').select_related('city', 'organizer_org', 'organizer_user').prefetch_related('age_groups')
         
@@ -27,29 +48,22 @@ def list_events(request):
         event_type = request.query_params.get('event_type')
         upcoming = request.query_params.get('upcoming', '').lower() == 'true'
         past = request.query_params.get('past', '').lower() == 'true'
-        sort_by = request.query_params.get('sort', 'start_date')  # start_date, title, city
+        sort_by = request.query_params.get('sort', 'relevance' if search else 'start_date')  # relevance, start_date, title, city
         order = request.query_params.get('order', 'desc')  # asc, desc
         
         if city:
             events = events.filter(city__name__icontains=city)
         
-        # Фильтр по виду спорта через описание или название мероприятия
+        # Фильтр по виду спорта через полнотекстовый поиск по мероприятию
         # (Event не имеет прямой связи с Sport)
         if sport:
-            events = events.filter(
-                Q(title__icontains=sport) |
-                Q(description__icontains=sport)
-            )
+            events = match_queryset(events, 'event', sport)
         
         if event_type:
             events = events.filter(event_type=event_type)
         
         if search:
-            events = events.filter(
-                Q(title__icontains=search) |
-                Q(description__icontains=search) |
-                Q(venue__icontains=search)
-            )
+            events = rank_queryset(events, 'event', search)
         
         # Фильтр по дате
         now = timezone.now()
@@ -69,31 +83,55 @@ def list_events(request):
         else:
             sort_field = 'start_date'
         
-        if order == 'desc':
-            sort_field = f'-{sort_field}'
-        
-        events = events.order_by(sort_field)
+        page_size = parse_page_size(request.query_params, default=12)
+        
+        # Курсорная пагинация по (start_date, id): стоимость не зависит от глубины страницы
+        cursor = request.query_params.get('cursor')
+        if cursor is not None or request.query_params.get('pagination') == 'cursor':
+            # Курсор построен только по дате: другие сортировки (и ранжирование
+            # поиска) в этом режиме не поддерживаются
+            if request.query_params.get('sort', 'start_date') != 'start_date':
+                return Response(
+                    {'error': 'В курсорном режиме поддерживается только sort=start_date'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            try:
+                paginated_events, next_cursor = keyset_paginate(
+                    events, ('start_date', 'id'), page_size,
+                    cursor=cursor or None, descending=(order == 'desc')
+                )
+            except InvalidCursor as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            
+            response_data = {
+                'results': _serialize_events(paginated_events),
+                'page_size': page_size,
+                'next_cursor': next_cursor,
+                'has_next': next_cursor is not None,
+            }
+            if request.query_params.get('include_total', '').lower() == 'true':
+                total, is_exact = approximate_count(events)
+                response_data['total'] = total
+                response_data['total_is_exact'] = is_exact
+            return Response(response_data)
+        
+        if sort_by == 'relevance' and search:
+            events = events.order_by('-search_rank', '-start_date', '-id')
+        else:
+            if order == 'desc':
+                sort_field = f'-{sort_field}'
+            events = events.order_by(sort_field, '-id' if order == 'desc' else 'id')
         
         # Пагинация
-        page = int(request.query_params.get('page', 1))
-        page_size = int(request.query_params.get('page_size', 12))
+        page = parse_page(request.query_params)
         total = events.count()
         start = (page - 1) * page_size
         end = start + page_size
         
         paginated_events = list(events[start:end])
-        # Предзагружаем категории для всех событий
-        event_types = {event.event_type for event in paginated_events if event.event_type}
-        categories_map = {}
-        if event_types:
-            from apps.events.models import EventCategory
-            categories = EventCategory.objects.filter(name__in=event_types)
-            categories_map = {cat.name: cat for cat in categories}
-        
-        serializer = EventSerializer(paginated_events, many=True, context={'categories_map': categories_map})
         
         return Response({
-            'results': serializer.data,
+            'results': _serialize_events(paginated_events),
             'total': total,
             'page': page,
             'page_size': page_size,
@@ -207,22 +245,10 @@ def register_for_event(request, event_id):
                 status=http_status.HTTP_400_BAD_REQUEST
             )
         
-        age = timezone.now().year - athlete.user.birth_date.year
-        if timezone.now().month < athlete.user.birth_date.month or \
-           (timezone.now().month == athlete.user.birth_date.month and timezone.now().day < athlete.user.birth_date.day):
-            age -= 1
-        
-        eligible = event.age_groups.filter(min_age__lte=age, max_age__gte=age).exists()
-        if not eligible:
-            # Формируем список допустимых возрастных групп
-            age_groups_text = []
-            for ag in event.age_groups.all():
-                if ag.min_age == ag.max_age:
-                    age_groups_text.append(f"{ag.min_age} лет")
-                else:
-                    age_groups_text.append(f"{ag.min_age}-{ag.max_age} лет")
-            
-            age_requirement = ", ".join(age_groups_text) if age_groups_text else "не указаны"
+        age_ranges = eligibility.load_age_ranges(event)
+        age = eligibility.calculate_age(athlete.user.birth_date)
+        if not eligibility.age_fits(age, age_ranges):
+            age_requirement = eligibility.format_age_ranges(age_ranges)
             return Response({
                 "error": f"Возраст не соответствует требованиям. Ваш возраст: {age} лет. Требуемый возраст: {age_requirement}"
             }, status=http_status.HTTP_400_BAD_REQUEST)
@@ -384,91 +410,65 @@ def upload_event_results(request, event_id):
         return Response({"error": "Мероприятие не найдено"}, status=404)
 
 
+def _managed_groups(user):
+    """Группы, спортсменов которых пользователь может регистрировать.
+
+    Тренер — группы из его активных членств в организациях, директор — все
+    группы его организации. Для остальных пользователей — None.
+    """
+    from apps.training.models import TrainingGroup
+
+    if hasattr(user, 'coach_profile'):
+        return TrainingGroup.objects.filter(
+            coachmembership__coach=user.coach_profile,
+            coachmembership__status='active'
+        ).distinct()
+    if hasattr(user, 'director_role'):
+        return TrainingGroup.objects.filter(organization_id=user.director_role.organization_id)
+    return None
+
+
 # === Получение доступных спортсменов для регистрации (тренер/директор) ===
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_available_athletes_for_event(request, event_id):
-    """Получить список доступных спортсменов для регистрации на мероприятие"""
+    """Получить список доступных спортсменов для регистрации на мероприятие
+
+    Спортсмены групп пользователя выбираются одним запросом, возрастной допуск
+    и наличие регистрации считаются сервисом eligibility пакетно.
+    """
     try:
         event = Event.objects.get(id=event_id)
-        
+
         # Получаем возрастные группы мероприятия
-        age_groups = event.age_groups.all()
-        if not age_groups.exists():
+        age_ranges = eligibility.load_age_ranges(event)
+        if not age_ranges:
             return Response({"error": "У мероприятия не указаны возрастные группы"}, status=400)
-        
-        # Определяем, кто может регистрировать
-        user = request.user
-        athletes = []
-        
-        if hasattr(user, 'coach_profile'):
-            # Тренер - спортсмены из его групп
-            from apps.coaches.models import TrainingGroup
-            groups = TrainingGroup.objects.filter(coach=user.coach_profile)
-            for group in groups:
-                enrollments = group.enrollments.filter(status='active')
-                for enrollment in enrollments:
-                    athlete = enrollment.athlete
-                    if athlete not in [a['athlete'] for a in athletes]:
-                        # Проверяем возраст
-                        if athlete.user.birth_date:
-                            age = timezone.now().year - athlete.user.birth_date.year
-                            if timezone.now().month < athlete.user.birth_date.month or \
-                               (timezone.now().month == athlete.user.birth_date.month and timezone.now().day < athlete.user.birth_date.day):
-                                age -= 1
-                            
-                            eligible = age_groups.filter(min_age__lte=age, max_age__gte=age).exists()
-                            
-                            already_registered = EventRegistration.objects.filter(
-                                event=event,
-                                athlete=athlete,
-                                status__in=['registered', 'confirmed']
-                            ).exists()
-                            
-                            athletes.append({
-                                'id': athlete.id,
-                                'full_name': athlete.user.get_full_name(),
-                                'age': age,
-                                'main_sport': athlete.main_sport.name if athlete.main_sport else None,
-                                'eligible': eligible,
-                                'already_registered': already_registered
-                            })
-        
-        elif hasattr(user, 'director_role'):
-            # Директор - все спортсмены из его организаций
-            from apps.organizations.models import Organization
-            organizations = Organization.objects.filter(director=user.director_role)
-            for org in organizations:
-                groups = org.groups.all()
-                for group in groups:
-                    enrollments = group.enrollments.filter(status='active')
-                    for enrollment in enrollments:
-                        athlete = enrollment.athlete
-                        if athlete not in [a['athlete'] for a in athletes]:
-                            # Проверяем возраст
-                            if athlete.user.birth_date:
-                                age = timezone.now().year - athlete.user.birth_date.year
-                                if timezone.now().month < athlete.user.birth_date.month or \
-                                   (timezone.now().month == athlete.user.birth_date.month and timezone.now().day < athlete.user.birth_date.day):
-                                    age -= 1
-                                
-                                eligible = age_groups.filter(min_age__lte=age, max_age__gte=age).exists()
-                                
-                                already_registered = EventRegistration.objects.filter(
-                                    event=event,
-                                    athlete=athlete,
-                                    status__in=['registered', 'confirmed']
-                                ).exists()
-                                
-                                athletes.append({
-                                    'id': athlete.id,
-                                    'full_name': athlete.user.get_full_name(),
-                                    'age': age,
-                                    'main_sport': athlete.main_sport.name if athlete.main_sport else None,
-                                    'eligible': eligible,
-                                    'already_registered': already_registered
-                                })
-        
+
+        groups = _managed_groups(request.user)
+        if groups is None:
+            return Response({"athletes": []})
+
+        from apps.athletes.models import AthleteProfile
+        candidates = list(AthleteProfile.objects.filter(
+            enrollments__group__in=groups,
+            enrollments__status='active',
+            user__birth_date__isnull=False
+        ).distinct().select_related('user', 'main_sport').order_by('id'))
+
+        checked = eligibility.classify_athletes(event, candidates, age_ranges=age_ranges)
+        athletes = [
+            {
+                'id': athlete.id,
+                'full_name': athlete.user.get_full_name(),
+                'age': checked['ages'][athlete.id],
+                'main_sport': athlete.main_sport.name if athlete.main_sport else None,
+                'eligible': athlete.id in checked['eligible'],
+                'already_registered': athlete.id in checked['already_registered']
+            }
+            for athlete in candidates
+        ]
+
         return Response({"athletes": athletes})
     except Event.DoesNotExist:
         return Response({"error": "Мероприятие не найдено"}, status=404)
@@ -482,38 +482,25 @@ def get_available_athletes_for_event(request, event_id):
 def get_available_groups_for_event(request, event_id):
     """Получить список доступных групп для регистрации на мероприятие"""
     try:
+        from django.db.models import Count, Q
+
         event = Event.objects.get(id=event_id)
-        user = request.user
+        managed = _managed_groups(request.user)
         groups = []
-        
-        if hasattr(user, 'coach_profile'):
-            from apps.coaches.models import TrainingGroup
-            coach_groups = TrainingGroup.objects.filter(coach=user.coach_profile)
-            for group in coach_groups:
-                athletes_count = group.enrollments.filter(status='active').count()
+
+        if managed is not None:
+            managed = managed.select_related('sport', 'age_level').annotate(
+                athletes_count=Count('enrollments', filter=Q(enrollments__status='active'), distinct=True)
+            ).order_by('id')
+            for group in managed:
                 groups.append({
                     'id': group.id,
                     'name': group.name,
                     'sport_name': group.sport.name if group.sport else None,
-                    'age_level': group.age_level or None,
-                    'athletes_count': athletes_count
+                    'age_level': group.age_level.name if group.age_level else None,
+                    'athletes_count': group.athletes_count
                 })
-        
-        elif hasattr(user, 'director_role'):
-            from apps.organizations.models import Organization
-            organizations = Organization.objects.filter(director=user.director_role)
-            for org in organizations:
-                org_groups = org.groups.all()
-                for group in org_groups:
-                    athletes_count = group.enrollments.filter(status='active').count()
-                    groups.append({
-                        'id': group.id,
-                        'name': group.name,
-                        'sport_name': group.sport.name if group.sport else None,
-                        'age_level': group.age_level or None,
-                        'athletes_count': athletes_count
-                    })
-        
+
         return Response({"groups": groups})
     except Event.DoesNotExist:
         return Response({"error": "Мероприятие не найдено"}, status=404)
@@ -525,79 +512,38 @@ def get_available_groups_for_event(request, event_id):
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def bulk_register_for_event(request, event_id):
-    """Массовая регистрация спортсменов или групп на мероприятие"""
+    """Массовая регистрация спортсменов или групп на мероприятие
+
+    Выполняется пакетно сервисом registration_flow; в ответе, помимо счётчика
+    и ошибок, возвращается отчёт по каждому спортсмену (поле report).
+    """
     try:
+        from apps.events.services import registration_flow
+
         event = Event.objects.get(id=event_id)
-        athlete_ids = request.data.get('athletes', [])
-        group_ids = request.data.get('groups', [])
-        
-        registered_count = 0
+        result = registration_flow.register_athletes(
+            event,
+            athlete_ids=request.data.get('athletes', []),
+            group_ids=request.data.get('groups', [])
+        )
+
         errors = []
-        
-        # Регистрация отдельных спортсменов
-        for athlete_id in athlete_ids:
-            try:
-                from apps.athletes.models import AthleteProfile
-                athlete = AthleteProfile.objects.get(id=athlete_id)
-                
-                # Проверка возраста
-                if athlete.user.birth_date:
-                    age = timezone.now().year - athlete.user.birth_date.year
-                    if timezone.now().month < athlete.user.birth_date.month or \
-                       (timezone.now().month == athlete.user.birth_date.month and timezone.now().day < athlete.user.birth_date.day):
-                        age -= 1
-                    
-                    eligible = event.age_groups.filter(min_age__lte=age, max_age__gte=age).exists()
-                    if not eligible:
-                        errors.append(f"{athlete.user.get_full_name()}: возраст не соответствует требованиям")
-                        continue
-                
-                registration, created = EventRegistration.objects.get_or_create(
-                    event=event,
-                    athlete=athlete,
-                    defaults={'status': 'registered'}
-                )
-                if created:
-                    registered_count += 1
-            except Exception as e:
-                errors.append(f"Ошибка регистрации спортсмена {athlete_id}: {str(e)}")
-        
-        # Регистрация групп
-        for group_id in group_ids:
-            try:
-                from apps.coaches.models import TrainingGroup
-                group = TrainingGroup.objects.get(id=group_id)
-                enrollments = group.enrollments.filter(status='active')
-                
-                for enrollment in enrollments:
-                    athlete = enrollment.athlete
-                    try:
-                        # Проверка возраста
-                        if athlete.user.birth_date:
-                            age = timezone.now().year - athlete.user.birth_date.year
-                            if timezone.now().month < athlete.user.birth_date.month or \
-                               (timezone.now().month == athlete.user.birth_date.month and timezone.now().day < athlete.user.birth_date.day):
-                                age -= 1
-                            
-                            eligible = event.age_groups.filter(min_age__lte=age, max_age__gte=age).exists()
-                            if not eligible:
-                                continue
-                        
-                        registration, created = EventRegistration.objects.get_or_create(
-                            event=event,
-                            athlete=athlete,
-                            defaults={'status': 'registered'}
-                        )
-                        if created:
-                            registered_count += 1
-                    except Exception:
-                        continue
-            except Exception as e:
-                errors.append(f"Ошибка регистрации группы {group_id}: {str(e)}")
-        
+        for item in result['report']:
+            if item['from_group']:
+                continue
+            if item['result'] == registration_flow.RESULT_INELIGIBLE:
+                errors.append(f"{item['full_name']}: возраст не соответствует требованиям")
+            elif item['result'] == registration_flow.RESULT_NOT_FOUND:
+                errors.append(f"Ошибка регистрации спортсмена {item['athlete_id']}: спортсмен не найден")
+        for group_id in result['missing_groups']:
+            errors.append(f"Ошибка регистрации группы {group_id}: группа не найдена")
+        for value in result['invalid_ids']:
+            errors.append(f"Неверный идентификатор: {value}")
+
         return Response({
-            "registered_count": registered_count,
-            "errors": errors if errors else None
+            "registered_count": result['registered_count'],
+            "errors": errors if errors else None,
+            "report": result['report']
         })
     except Event.DoesNotExist:
         return Response({"error": "Мероприятие не найдено"}, status=404)
@@ -0,0 +1,17 @@
+# Generated by Django 6.0.1 on 2026-10-18 10:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0005_rename_events_inv_status__idx_events_invi_status_19210a_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['status', 'start_date', 'id'], name='events_even_status_409aa9_idx'),
+        ),
+    ]
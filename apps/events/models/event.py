@@ -44,4 +44,8 @@ class Event(TimeStampedModel):
 
     class Meta:
         db_table = 'events_event'
-        ordering = ['-start_date']
\ No newline at end of file
+        ordering = ['-start_date']
+        indexes = [
+            # Курсорная пагинация каталога по (start_date, id)
+            models.Index(fields=['status', 'start_date', 'id']),
+        ]
\ No newline at end of file
@@ -0,0 +1,91 @@
+# apps/events/services/eligibility.py
+"""
+Проверка возрастного допуска спортсменов к мероприятию.
+
+Возрастные группы мероприятия загружаются один раз, возраст считается на
+одну дату для всех спортсменов, а уже зарегистрированные определяются одним
+IN-запросом — число запросов не зависит от количества спортсменов.
+"""
+from django.utils import timezone
+
+from apps.events.models import EventRegistration
+
+ACTIVE_REGISTRATION_STATUSES = ('registered', 'confirmed')
+
+
+def calculate_age(birth_date, on_date=None):
+    """Полных лет на дату on_date (по умолчанию — сегодня)"""
+    if birth_date is None:
+        return None
+    on_date = on_date or timezone.localdate()
+    age = on_date.year - birth_date.year
+    if (on_date.month, on_date.day) < (birth_date.month, birth_date.day):
+        age -= 1
+    return age
+
+
+def load_age_ranges(event):
+    """Возрастные диапазоны мероприятия списком (min_age, max_age) — один запрос"""
+    return list(event.age_groups.order_by('min_age', 'max_age').values_list('min_age', 'max_age'))
+
+
+def age_fits(age, age_ranges):
+    """Попадает ли возраст хотя бы в один диапазон"""
+    return age is not None and any(low <= age <= high for low, high in age_ranges)
+
+
+def format_age_ranges(age_ranges):
+    """Текст требований к возрасту: «10-12 лет, 14 лет»"""
+    parts = []
+    for low, high in age_ranges:
+        parts.append(f"{low} лет" if low == high else f"{low}-{high} лет")
+    return ", ".join(parts) if parts else "не указаны"
+
+
+def registered_athlete_ids(event, athlete_ids):
+    """Id спортсменов из athlete_ids с активной регистрацией на мероприятие"""
+    if not athlete_ids:
+        return set()
+    return set(EventRegistration.objects.filter(
+        event=event,
+        registration_type='athlete',
+        athlete_id__in=athlete_ids,
+        status__in=ACTIVE_REGISTRATION_STATUSES
+    ).values_list('athlete_id', flat=True))
+
+
+def classify_athletes(event, athletes, age_ranges=None, on_date=None):
+    """Разбить спортсменов на допущенных и не допущенных по возрасту.
+
+    ``athletes`` — профили спортсменов с загруженным user (select_related).
+    Возвращает словарь:
+      ages — {athlete_id: возраст или None};
+      eligible / ineligible — id с подходящим / неподходящим возрастом;
+      no_birth_date — id без даты рождения;
+      already_registered — id с активной регистрацией;
+      age_ranges — загруженные диапазоны.
+    """
+    if age_ranges is None:
+        age_ranges = load_age_ranges(event)
+    on_date = on_date or timezone.localdate()
+
+    ages = {}
+    eligible, ineligible, no_birth_date = set(), set(), set()
+    for athlete in athletes:
+        age = calculate_age(athlete.user.birth_date, on_date)
+        ages[athlete.id] = age
+        if age is None:
+            no_birth_date.add(athlete.id)
+        elif age_fits(age, age_ranges):
+            eligible.add(athlete.id)
+        else:
+            ineligible.add(athlete.id)
+
+    return {
+        'ages': ages,
+        'eligible': eligible,
+        'ineligible': ineligible,
+        'no_birth_date': no_birth_date,
+        'already_registered': registered_athlete_ids(event, list(ages)),
+        'age_ranges': age_ranges,
+    }
@@ -0,0 +1,292 @@
+# apps/events/services/invitations.py
+"""
+Массовая рассылка приглашений на мероприятие.
+
+Список адресатов (спортсмены и тренеры из id, групп, организации, детей
+родителя) собирается несколькими запросами, в каждом из которых сразу
+исключаются адресаты с уже ожидающим приглашением. Приглашения и уведомления
+создаются через bulk_create пачками по INVITATION_CHUNK_SIZE, каждая пачка —
+в своей короткой транзакции.
+
+Для больших организаций рассылка ставится в очередь NotificationOutbox
+задачей воркера process_notification_outbox: список адресатов сохраняется
+в записи, воркер создаёт приглашения в одной транзакции (пачки — точки
+сохранения) и при ошибке или падении повторяет задачу целиком. Адресаты,
+получившие приглашение после постановки в очередь, пропускаются.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils.dateparse import parse_datetime
+
+from apps.events.models import Event, EventInvitation
+
+INVITATION_CHUNK_SIZE = 500
+BACKGROUND_THRESHOLD = getattr(settings, 'EVENT_INVITATION_BACKGROUND_THRESHOLD', 2000)
+FAN_OUT_TASK = 'event_invitations'
+
+
+def _pending(event, field):
+    """Подзапрос «у адресата уже есть ожидающее приглашение на мероприятие»"""
+    return Exists(EventInvitation.objects.filter(
+        event=event,
+        status='pending',
+        **{field: OuterRef('pk')}
+    ))
+
+
+def _target(invitation_type, profile_id, user_id, body, group_id=None, organization_id=None):
+    return {
+        'invitation_type': invitation_type,
+        'profile_id': profile_id,
+        'user_id': user_id,
+        'body': body,
+        'group_id': group_id,
+        'organization_id': organization_id,
+    }
+
+
+def _add(targets, target):
+    """Добавить адресата, если он ещё не добавлен другим источником"""
+    targets.setdefault((target['invitation_type'], target['profile_id']), target)
+
+
+def _add_athletes_by_id(targets, event, athlete_ids, errors):
+    from apps.athletes.models import AthleteProfile
+
+    rows = AthleteProfile.objects.filter(id__in=athlete_ids).annotate(
+        has_pending=_pending(event, 'athlete')
+    ).select_related('user')
+    found = {athlete.id: athlete for athlete in rows}
+    for athlete_id in athlete_ids:
+        athlete = found.get(athlete_id)
+        if athlete is None:
+            errors.append(f"Спортсмен с ID {athlete_id} не найден")
+        elif athlete.has_pending:
+            errors.append(f"Приглашение для {athlete.user.get_full_name()} уже отправлено")
+        else:
+            _add(targets, _target(
+                'athlete', athlete.id, athlete.user_id,
+                f"Вас пригласили на мероприятие '{event.title}'. Проверьте раздел приглашений."
+            ))
+
+
+def _add_coaches_by_id(targets, event, coach_ids, errors):
+    from apps.coaches.models.coach_profile import CoachProfile
+
+    rows = CoachProfile.objects.filter(id__in=coach_ids).annotate(
+        has_pending=_pending(event, 'coach')
+    ).select_related('user')
+    found = {coach.id: coach for coach in rows}
+    for coach_id in coach_ids:
+        coach = found.get(coach_id)
+        if coach is None:
+            errors.append(f"Тренер с ID {coach_id} не найден")
+        elif coach.has_pending:
+            errors.append(f"Приглашение для {coach.user.get_full_name()} уже отправлено")
+        else:
+            _add(targets, _target(
+                'coach', coach.id, coach.user_id,
+                f"Вас пригласили на мероприятие '{event.title}' в качестве тренера."
+            ))
+
+
+def _add_groups(targets, event, user, group_ids, errors):
+    from apps.training.models import Enrollment, TrainingGroup
+
+    groups = {group.id: group for group in TrainingGroup.objects.filter(id__in=group_ids)}
+    allowed = set(groups)
+    # Тренер может приглашать только свои группы
+    if hasattr(user, 'coach_profile'):
+        allowed &= set(TrainingGroup.objects.filter(
+            id__in=group_ids,
+            coachmembership__coach=user.coach_profile,
+            coachmembership__status='active'
+        ).values_list('id', flat=True))
+    for group_id in group_ids:
+        if group_id not in groups:
+            errors.append(f"Группа с ID {group_id} не найдена")
+        elif group_id not in allowed:
+            errors.append(f"У вас нет доступа к группе {groups[group_id].name}")
+    if not allowed:
+        return
+
+    rows = Enrollment.objects.filter(
+        group_id__in=allowed,
+        status='active'
+    ).annotate(
+        has_pending=Exists(EventInvitation.objects.filter(
+            event=event, status='pending', athlete_id=OuterRef('athlete_id')
+        ))
+    ).filter(has_pending=False).values_list('athlete_id', 'athlete__user_id', 'group_id').order_by('group_id', 'athlete_id')
+    for athlete_id, user_id, group_id in rows:
+        _add(targets, _target(
+            'athlete', athlete_id, user_id,
+            f"Вас пригласили на мероприятие '{event.title}' из группы {groups[group_id].name}.",
+            group_id=group_id
+        ))
+
+
+def _add_organization(targets, event, organization):
+    from apps.athletes.models import AthleteProfile
+    from apps.coaches.models.coach_profile import CoachProfile
+
+    athletes = AthleteProfile.objects.filter(
+        enrollments__group__organization=organization,
+        enrollments__status='active'
+    ).annotate(has_pending=_pending(event, 'athlete')).filter(
+        has_pending=False
+    ).distinct().values_list('id', 'user_id').order_by('id')
+    for athlete_id, user_id in athletes:
+        _add(targets, _target(
+            'athlete', athlete_id, user_id,
+            f"Вас пригласили на мероприятие '{event.title}' от организации {organization.name}.",
+            organization_id=organization.id
+        ))
+
+    coaches = CoachProfile.objects.filter(
+        coach_memberships__organization=organization,
+        coach_memberships__status='active'
+    ).annotate(has_pending=_pending(event, 'coach')).filter(
+        has_pending=False
+    ).distinct().values_list('id', 'user_id').order_by('id')
+    for coach_id, user_id in coaches:
+        _add(targets, _target(
+            'coach', coach_id, user_id,
+            f"Вас пригласили на мероприятие '{event.title}' в качестве тренера от организации {organization.name}.",
+            organization_id=organization.id
+        ))
+
+
+def _add_children(targets, event, user):
+    from apps.athletes.models import AthleteProfile
+
+    children = AthleteProfile.objects.filter(
+        parent_links__parent=user,
+        parent_links__status='confirmed'
+    ).annotate(has_pending=_pending(event, 'athlete')).filter(
+        has_pending=False
+    ).distinct().values_list('id', 'user_id').order_by('id')
+    for athlete_id, user_id in children:
+        _add(targets, _target(
+            'athlete', athlete_id, user_id,
+            f"Ваш родитель пригласил вас на мероприятие '{event.title}'."
+        ))
+
+
+def collect_targets(event, user, athlete_ids=(), coach_ids=(), group_ids=(), organization=None):
+    """Собрать адресатов приглашений без уже приглашённых.
+
+    Возвращает (targets, errors): список словарей-адресатов и список ошибок
+    для ответа API.
+    """
+    targets = {}
+    errors = []
+    if athlete_ids:
+        _add_athletes_by_id(targets, event, list(athlete_ids), errors)
+    if coach_ids:
+        _add_coaches_by_id(targets, event, list(coach_ids), errors)
+    if group_ids:
+        _add_groups(targets, event, user, list(group_ids), errors)
+    if organization is not None:
+        _add_organization(targets, event, organization)
+    if hasattr(user, 'parent_profile'):
+        _add_children(targets, event, user)
+    return list(targets.values()), errors
+
+
+def create_invitations(event, sender_id, targets, message='', expires_at=None, chunk_size=INVITATION_CHUNK_SIZE):
+    """Создать приглашения и уведомления пачками. Возвращает число приглашений"""
+    from apps.notifications.services import outbox
+
+    created = 0
+    for start in range(0, len(targets), chunk_size):
+        chunk = targets[start:start + chunk_size]
+        invitations = [
+            EventInvitation(
+                event=event,
+                invitation_type=target['invitation_type'],
+                athlete_id=target['profile_id'] if target['invitation_type'] == 'athlete' else None,
+                coach_id=target['profile_id'] if target['invitation_type'] == 'coach' else None,
+                sent_by_id=sender_id,
+                message=message or '',
+                expires_at=expires_at,
+                group_id=target['group_id'],
+                organization_id=target['organization_id'],
+            )
+            for target in chunk
+        ]
+        with transaction.atomic():
+            invitations = EventInvitation.objects.bulk_create(invitations)
+            outbox.enqueue_many([
+                {
+                    'recipient_id': target['user_id'],
+                    'sender_id': sender_id,
+                    'notification_type': 'event_invitation',
+                    'title': "Приглашение на мероприятие",
+                    'body': target['body'],
+                    'related_object_id': invitation.id,
+                }
+                for target, invitation in zip(chunk, invitations)
+            ])
+        created += len(invitations)
+    return created
+
+
+def _without_pending(event, targets):
+    """Адресаты без ожидающего приглашения на мероприятие"""
+    pending = set()
+    rows = EventInvitation.objects.filter(event=event, status='pending').values_list(
+        'invitation_type', 'athlete_id', 'coach_id'
+    )
+    for invitation_type, athlete_id, coach_id in rows.iterator():
+        pending.add((invitation_type, athlete_id if invitation_type == 'athlete' else coach_id))
+    return [
+        target for target in targets
+        if (target['invitation_type'], target['profile_id']) not in pending
+    ]
+
+
+def run_fan_out_task(entry):
+    """Задача воркера outbox: создать приглашения из сохранённого списка адресатов"""
+    event = Event.objects.filter(id=entry.related_object_id).first()
+    if event is None:
+        return 0
+    expires_at = entry.context.get('expires_at')
+    return create_invitations(
+        event, entry.sender_id, _without_pending(event, entry.context.get('targets', [])),
+        message=entry.context.get('message', ''),
+        expires_at=parse_datetime(expires_at) if expires_at else None,
+    )
+
+
+def register_tasks():
+    from apps.notifications.services import outbox
+
+    outbox.register_task(FAN_OUT_TASK, run_fan_out_task)
+
+
+def fan_out(event, sender, targets, message='', expires_at=None, background=None):
+    """Разослать приглашения адресатам.
+
+    background=None — очередь воркера используется автоматически, если
+    адресатов не меньше BACKGROUND_THRESHOLD. Возвращает (count, queued):
+    число созданных (или поставленных в очередь) приглашений и признак очереди.
+    """
+    if background is None:
+        background = len(targets) >= BACKGROUND_THRESHOLD
+    if background and targets:
+        from apps.notifications.services import outbox
+
+        outbox.enqueue_task(
+            FAN_OUT_TASK, 'event_invitation',
+            sender_id=sender.id,
+            related_object_id=event.id,
+            context={
+                'targets': targets,
+                'message': message or '',
+                'expires_at': expires_at.isoformat() if expires_at else None,
+            },
+        )
+        return len(targets), True
+    return create_invitations(event, sender.id, targets, message=message, expires_at=expires_at), False
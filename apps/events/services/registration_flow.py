@@ -0,0 +1,150 @@
+# apps/events/services/registration_flow.py
+"""
+Пакетная регистрация спортсменов на мероприятие.
+
+Конвейер: кандидаты из списка id и из групп выбираются одним запросом,
+существующие регистрации отсекаются одним IN-запросом, новые создаются одним
+bulk_create с игнорированием конфликтов. Число запросов не зависит от
+количества спортсменов.
+"""
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.events.models import EventRegistration
+from . import eligibility
+
+REGISTRATION_BATCH_SIZE = 500
+
+# Итоговые статусы спортсмена в отчёте
+RESULT_REGISTERED = 'registered'
+RESULT_REACTIVATED = 'reactivated'
+RESULT_ALREADY_REGISTERED = 'already_registered'
+RESULT_INELIGIBLE = 'ineligible'
+RESULT_NOT_FOUND = 'not_found'
+
+
+def _normalize_ids(values):
+    """Привести id из запроса к int; возвращает (ids, invalid) с сохранением порядка"""
+    ids, invalid = [], []
+    for value in values or []:
+        try:
+            ids.append(int(value))
+        except (TypeError, ValueError):
+            invalid.append(value)
+    return list(dict.fromkeys(ids)), invalid
+
+
+def resolve_athletes(athlete_ids, group_ids):
+    """Спортсмены по id и активные участники групп — одним запросом.
+
+    Возвращает (athletes, from_groups): словарь {id: AthleteProfile} в порядке
+    id и множество id спортсменов, попавших в выборку только через группы.
+    """
+    from apps.athletes.models import AthleteProfile
+
+    if not athlete_ids and not group_ids:
+        return {}, set()
+
+    condition = Q(id__in=athlete_ids) | Q(
+        enrollments__group_id__in=group_ids,
+        enrollments__status='active'
+    )
+    athletes = {
+        athlete.id: athlete
+        for athlete in AthleteProfile.objects.filter(condition).distinct()
+        .select_related('user').order_by('id')
+    }
+    requested = set(athlete_ids)
+    return athletes, {athlete_id for athlete_id in athletes if athlete_id not in requested}
+
+
+def register_athletes(event, athlete_ids=(), group_ids=()):
+    """Зарегистрировать спортсменов и группы на мероприятие.
+
+    Спортсмены без даты рождения регистрируются без проверки возраста,
+    отменённые ранее регистрации восстанавливаются одним UPDATE.
+    Возвращает словарь:
+      report — список {'athlete_id', 'full_name', 'age', 'result'} по каждому спортсмену;
+      registered_count — количество новых и восстановленных регистраций;
+      missing_groups — id несуществующих групп;
+      invalid_ids — значения, не являющиеся id.
+    """
+    from apps.training.models import TrainingGroup
+
+    athlete_ids, invalid_athletes = _normalize_ids(athlete_ids)
+    group_ids, invalid_groups = _normalize_ids(group_ids)
+
+    existing_groups = set()
+    if group_ids:
+        existing_groups = set(TrainingGroup.objects.filter(id__in=group_ids).values_list('id', flat=True))
+    athletes, from_groups = resolve_athletes(athlete_ids, list(existing_groups))
+
+    age_ranges = eligibility.load_age_ranges(event)
+    today = timezone.localdate()
+
+    # Одним запросом — все регистрации кандидатов, включая отменённые
+    existing = dict(EventRegistration.objects.filter(
+        event=event,
+        registration_type='athlete',
+        athlete_id__in=list(athletes)
+    ).values_list('athlete_id', 'status')) if athletes else {}
+
+    report = []
+    to_create, to_reactivate = [], []
+    for athlete in athletes.values():
+        age = eligibility.calculate_age(athlete.user.birth_date, today)
+        if age is not None and not eligibility.age_fits(age, age_ranges):
+            result = RESULT_INELIGIBLE
+        elif athlete.id not in existing:
+            result = RESULT_REGISTERED
+            to_create.append(EventRegistration(
+                event=event,
+                registration_type='athlete',
+                athlete=athlete,
+                status='registered'
+            ))
+        elif existing[athlete.id] == 'cancelled':
+            result = RESULT_REACTIVATED
+            to_reactivate.append(athlete.id)
+        else:
+            result = RESULT_ALREADY_REGISTERED
+        report.append({
+            'athlete_id': athlete.id,
+            'full_name': athlete.user.get_full_name(),
+            'age': age,
+            'from_group': athlete.id in from_groups,
+            'result': result,
+        })
+
+    for athlete_id in athlete_ids:
+        if athlete_id not in athletes:
+            report.append({
+                'athlete_id': athlete_id,
+                'full_name': None,
+                'age': None,
+                'from_group': False,
+                'result': RESULT_NOT_FOUND,
+            })
+
+    with transaction.atomic():
+        if to_create:
+            EventRegistration.objects.bulk_create(
+                to_create,
+                batch_size=REGISTRATION_BATCH_SIZE,
+                ignore_conflicts=True
+            )
+        if to_reactivate:
+            EventRegistration.objects.filter(
+                event=event,
+                registration_type='athlete',
+                athlete_id__in=to_reactivate,
+                status='cancelled'
+            ).update(status='registered', updated_at=timezone.now())
+
+    return {
+        'report': report,
+        'registered_count': len(to_create) + len(to_reactivate),
+        'missing_groups': [group_id for group_id in group_ids if group_id not in existing_groups],
+        'invalid_ids': invalid_athletes + invalid_groups,
+    }
@@ -1,6 +1,8 @@
 # apps/notifications/admin.py
 from django.contrib import admin
-from .models import Notification, NotificationTemplate, NotificationSubscription
+from .models import (
+    Notification, NotificationTemplate, NotificationSubscription, NotificationOutbox, NotificationArchive
+)
 
 
 @admin.register(Notification)
@@ -32,3 +34,30 @@ class NotificationSubscriptionAdmin(admin.ModelAdmin):
     raw_id_fields = ('user',)
     date_hierarchy = 'created_at'
     readonly_fields = ('created_at', 'updated_at')
+
+
+@admin.register(NotificationOutbox)
+class NotificationOutboxAdmin(admin.ModelAdmin):
+    """Админка для очереди исходящих уведомлений"""
+    list_display = ('title', 'recipient', 'channel', 'status', 'attempts', 'available_at', 'created_at')
+    list_filter = ('status', 'channel', 'notification_type', 'created_at')
+    search_fields = ('recipient__email', 'title', 'body', 'last_error')
+    raw_id_fields = ('recipient', 'sender')
+    date_hierarchy = 'created_at'
+    readonly_fields = ('created_at', 'updated_at', 'locked_at', 'sent_at')
+
+
+@admin.register(NotificationArchive)
+class NotificationArchiveAdmin(admin.ModelAdmin):
+    """Админка для архива уведомлений (только просмотр)"""
+    list_display = ('recipient', 'notification_type', 'title', 'is_read', 'created_at', 'archived_at')
+    list_filter = ('notification_type', 'is_read')
+    search_fields = ('recipient__email', 'title')
+    raw_id_fields = ('recipient', 'sender')
+    date_hierarchy = 'created_at'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
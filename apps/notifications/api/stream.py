@@ -0,0 +1,140 @@
+# apps/notifications/api/stream.py
+"""
+Поток уведомлений в реальном времени (Server-Sent Events).
+
+Клиент открывает EventSource('/api/notifications/stream/') и получает события
+notification (новое уведомление и счётчик) и unread_count (изменение счётчика).
+Раз в NOTIFICATION_STREAM_HEARTBEAT секунд отправляется комментарий-пинг,
+чтобы прокси не закрывали соединение. id события — id последнего уведомления:
+после обрыва браузер переподключается с заголовком Last-Event-ID, и
+пропущенные уведомления досылаются из БД. Соединение закрывается сервером
+через NOTIFICATION_STREAM_MAX_AGE секунд, клиент переподключается сам —
+так нагрузка равномерно распределяется между процессами.
+
+Поток требует ASGI-сервера (config.asgi) и брокера, общего для процессов
+(Redis): уведомления создаёт воркер outbox в отдельном процессе. Под WSGI
+(runserver) или с брокером в памяти процесса ответ — 204 No Content: по
+спецификации SSE браузер после него не переподключается, и виджет
+переходит на опрос.
+
+Аутентификация — сессия или JWT в заголовке Authorization. Токен в
+параметре запроса не принимается: он попал бы в журналы доступа и аудита.
+"""
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+
+from apps.notifications import realtime
+from apps.notifications.models import Notification
+from apps.notifications.services import unread
+
+HEARTBEAT_SECONDS = getattr(settings, 'NOTIFICATION_STREAM_HEARTBEAT', 15)
+MAX_AGE_SECONDS = getattr(settings, 'NOTIFICATION_STREAM_MAX_AGE', 30 * 60)
+RETRY_MS = 5000
+REPLAY_LIMIT = 50
+
+
+def format_event(message):
+    """Сообщение брокера в текст SSE"""
+    lines = []
+    if message.get('id') is not None:
+        lines.append(f"id: {message['id']}")
+    if message.get('event'):
+        lines.append(f"event: {message['event']}")
+    lines.append('data: ' + json.dumps(message.get('data', {}), ensure_ascii=False))
+    return '\n'.join(lines) + '\n\n'
+
+
+def _parse_last_event_id(request):
+    value = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+
+def _authenticate_jwt(request):
+    """Пользователь по JWT из заголовка Authorization"""
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+    authentication = JWTAuthentication()
+    try:
+        result = authentication.authenticate(request)
+        return result[0] if result else None
+    except (InvalidToken, TokenError):
+        return None
+
+
+async def _get_user(request):
+    user = await request.auser()
+    if user.is_authenticated:
+        return user
+    user = await sync_to_async(_authenticate_jwt)(request)
+    if user is not None and user.is_active:
+        return user
+    return None
+
+
+def _missed(user_id, last_event_id):
+    """Уведомления после last_event_id (не больше REPLAY_LIMIT последних) и счётчик"""
+    notifications = []
+    if last_event_id is not None:
+        notifications = list(
+            Notification.objects.filter(recipient_id=user_id, id__gt=last_event_id)
+            .order_by('-id')[:REPLAY_LIMIT]
+        )
+        notifications.reverse()
+    return notifications, unread.get_count(user_id)
+
+
+async def _events(user_id, last_event_id):
+    # Подписка до чтения БД: событие, пришедшее во время досылки, не потеряется
+    subscription = realtime.get_broker().subscribe(user_id)
+    try:
+        yield f'retry: {RETRY_MS}\n\n'
+        notifications, count = await sync_to_async(_missed)(user_id, last_event_id)
+        replayed_id = last_event_id or 0
+        for notification in notifications:
+            yield format_event(realtime.notification_message(notification, count))
+            replayed_id = notification.id
+        yield format_event(realtime.unread_count_message(count))
+
+        deadline = time.monotonic() + MAX_AGE_SECONDS
+        while time.monotonic() < deadline:
+            message = await subscription.get(timeout=HEARTBEAT_SECONDS)
+            if message is None:
+                yield ': ping\n\n'
+                continue
+            if message.get('id') is not None and message['id'] <= replayed_id:
+                continue
+            yield format_event(message)
+    finally:
+        subscription.close()
+
+
+def _stream_response(content):
+    response = StreamingHttpResponse(content, content_type='text/event-stream; charset=utf-8')
+    response['Cache-Control'] = 'no-cache'
+    # nginx не должен буферизовать поток
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@require_GET
+async def notification_stream(request):
+    """SSE-поток уведомлений текущего пользователя"""
+    user = await _get_user(request)
+    if user is None:
+        return JsonResponse({"error": "Требуется аутентификация"}, status=401)
+
+    if not isinstance(request, ASGIRequest) or not realtime.is_shared():
+        # Событий воркера здесь не будет — клиент переходит на опрос
+        return HttpResponse(status=204)
+
+    return _stream_response(_events(user.id, _parse_last_event_id(request)))
@@ -3,14 +3,18 @@ from django.urls import path
 from .views import (
     list_notifications,
     mark_notification_read,
+    mark_notifications_read,
     list_subscriptions,
     update_subscription,
     get_unread_count
 )
+from .stream import notification_stream
 
 urlpatterns = [
     path('', list_notifications, name='notifications-list'),
+    path('read/', mark_notifications_read, name='notifications-mark-read'),
     path('<int:notification_id>/read/', mark_notification_read, name='notification-read'),
+    path('stream/', notification_stream, name='notifications-stream'),
     path('unread-count/', get_unread_count, name='notifications-unread-count'),
     path('subscriptions/', list_subscriptions, name='subscriptions-list'),
     path('subscriptions/<int:subscription_id>/', update_subscription, name='subscription-update'),
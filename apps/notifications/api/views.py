@@ -2,15 +2,57 @@
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from django.utils import timezone
 from .serializers import NotificationSerializer, SubscriptionSerializer
+from apps.notifications import realtime
 from apps.notifications.models import Notification, NotificationSubscription
+from apps.notifications.services import unread
+from apps.core.utils.pagination import InvalidCursor, keyset_paginate, parse_page_size
+
+def _parse_bool(value):
+    """'true'/'false' из параметра запроса; None — параметр не задан"""
+    if value is None or value == '':
+        return None
+    return str(value).lower() in ('1', 'true', 'yes')
+
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def list_notifications(request):
-    """Список уведомлений пользователя"""
-    notifications = Notification.objects.filter(recipient=request.user).order_by('-created_at')
-    return Response(NotificationSerializer(notifications, many=True).data)
+    """Список уведомлений пользователя с курсорной пагинацией
+
+    Порядок — от новых к старым по (created_at, id). Параметры: type (один
+    или несколько типов через запятую), is_read (true/false), unread_only,
+    page_size, cursor (значение next_cursor предыдущей страницы).
+    """
+    notifications = Notification.objects.filter(recipient=request.user)
+
+    types = [t for t in request.query_params.get('type', '').split(',') if t]
+    if types:
+        notifications = notifications.filter(notification_type__in=types)
+
+    is_read = _parse_bool(request.query_params.get('is_read'))
+    if _parse_bool(request.query_params.get('unread_only')):
+        is_read = False
+    if is_read is not None:
+        notifications = notifications.filter(is_read=is_read)
+
+    try:
+        items, next_cursor = keyset_paginate(
+            notifications,
+            ['created_at', 'id'],
+            parse_page_size(request.query_params),
+            cursor=request.query_params.get('cursor'),
+            descending=True
+        )
+    except InvalidCursor as e:
+        return Response({"error": str(e)}, status=400)
+
+    return Response({
+        "results": NotificationSerializer(items, many=True).data,
+        "next_cursor": next_cursor,
+        "unread_count": unread.get_count(request.user.id)
+    })
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -18,18 +60,60 @@ def mark_notification_read(request, notification_id):
     """Отметить уведомление как прочитанное"""
     try:
         notification = Notification.objects.get(id=notification_id, recipient=request.user)
-        notification.is_read = True
-        notification.save()
+        if not notification.is_read:
+            notification.is_read = True
+            notification.save(update_fields=['is_read', 'updated_at'])
+            unread.decrement(request.user.id)
+            realtime.publish_unread_count(request.user.id, unread.get_count(request.user.id))
         return Response({"message": "Уведомление прочитано"})
     except Notification.DoesNotExist:
         return Response({"error": "Уведомление не найдено"}, status=404)
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def mark_notifications_read(request):
+    """Отметить прочитанными выбранные (ids) или все (all=true) уведомления
+
+    Выполняется одним UPDATE; можно ограничить типом (type).
+    """
+    notifications = Notification.objects.filter(recipient=request.user, is_read=False)
+
+    if not _parse_bool(request.data.get('all')):
+        # Форма (QueryDict) передаёт список повторением ключа, JSON — массивом
+        ids = request.data.getlist('ids') if hasattr(request.data, 'getlist') else request.data.get('ids')
+        if not ids:
+            return Response({"error": "Укажите ids или all=true"}, status=400)
+        # Строку "123" нельзя перебирать посимвольно — это были бы id 1, 2 и 3
+        if not isinstance(ids, (list, tuple)) or any(isinstance(value, bool) for value in ids):
+            return Response({"error": "ids должен быть списком идентификаторов"}, status=400)
+        try:
+            ids = [int(value) for value in ids]
+        except (TypeError, ValueError):
+            return Response({"error": "ids должен быть списком идентификаторов"}, status=400)
+        notifications = notifications.filter(id__in=ids)
+
+    types = request.data.get('type')
+    if types:
+        notifications = notifications.filter(
+            notification_type__in=types if isinstance(types, list) else [types]
+        )
+
+    updated = notifications.update(is_read=True, updated_at=timezone.now())
+    unread.decrement(request.user.id, updated)
+    unread_count = unread.get_count(request.user.id)
+    if updated:
+        realtime.publish_unread_count(request.user.id, unread_count)
+    return Response({
+        "message": f"Отмечено прочитанными: {updated}",
+        "updated_count": updated,
+        "unread_count": unread_count
+    })
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_unread_count(request):
-    """Получить количество непрочитанных уведомлений"""
-    count = Notification.objects.filter(recipient=request.user, is_read=False).count()
-    return Response({"count": count})
+    """Получить количество непрочитанных уведомлений (из кэша счётчиков)"""
+    return Response({"count": unread.get_count(request.user.id)})
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -0,0 +1,34 @@
+# apps/notifications/channels/__init__.py
+"""
+Каналы доставки уведомлений (NotificationTemplate.channel).
+
+Бэкенд каждого канала задаётся в NOTIFICATION_CHANNEL_BACKENDS путём к классу
+(см. base.ChannelBackend); для тестов у каждого канала есть Fake-бэкенд.
+"""
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .base import ChannelBackend, DeliveryError, RateLimiter
+
+DEFAULT_BACKENDS = {
+    'system': 'apps.notifications.channels.system.SystemBackend',
+    'email': 'apps.notifications.channels.email.SMTPBackend',
+    'telegram': 'apps.notifications.channels.telegram.TelegramBackend',
+}
+
+_backends = {}
+
+
+def get_backend(name):
+    """Экземпляр бэкенда канала (один на процесс); для неизвестного — DeliveryError"""
+    if name not in _backends:
+        paths = {**DEFAULT_BACKENDS, **getattr(settings, 'NOTIFICATION_CHANNEL_BACKENDS', {})}
+        if name not in paths:
+            raise DeliveryError(f'Неизвестный канал: {name}', permanent=True)
+        _backends[name] = import_string(paths[name])()
+    return _backends[name]
+
+
+def reset_backends():
+    """Сбросить созданные бэкенды (после изменения настроек в тестах)"""
+    _backends.clear()
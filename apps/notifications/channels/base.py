@@ -0,0 +1,77 @@
+# apps/notifications/channels/base.py
+"""Базовый интерфейс бэкенда канала доставки и общие утилиты"""
+import threading
+import time
+
+
+class DeliveryError(Exception):
+    """Ошибка доставки.
+
+    permanent=True — повторная попытка бессмысленна (нет адреса и т.п.);
+    retry_after — сколько секунд канал просит подождать перед повтором.
+    """
+
+    def __init__(self, message, permanent=False, retry_after=None):
+        super().__init__(message)
+        self.permanent = permanent
+        self.retry_after = retry_after
+
+
+class ChannelBackend:
+    """Бэкенд канала доставки.
+
+    send_batch(messages) получает записи NotificationOutbox с подставленными
+    title/body (не больше batch_size за вызов) и возвращает список той же длины:
+    None для доставленного сообщения или исключение.
+    """
+    name = None
+    batch_size = 100
+
+    def send_batch(self, messages):
+        raise NotImplementedError
+
+
+class FakeBackendMixin:
+    """Локальный бэкенд для тестов: сообщения сохраняются в self.sent"""
+
+    def __init__(self):
+        self.sent = []
+
+    def record(self, message, **extra):
+        self.sent.append({
+            'recipient_id': message.recipient_id,
+            'title': message.title,
+            'body': message.body,
+            **extra,
+        })
+
+
+class RateLimiter:
+    """Ограничитель частоты: не больше rate событий в секунду (token bucket).
+
+    Общий для всех потоков процесса; clock и sleep подменяются в тестах.
+    """
+
+    def __init__(self, rate, burst=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = float(rate)
+        self.capacity = float(burst or rate)
+        self.tokens = self.capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Дождаться разрешения на одно событие. Возвращает время ожидания"""
+        with self._lock:
+            now = self.clock()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            wait = 0.0
+            if self.tokens < 1:
+                wait = (1 - self.tokens) / self.rate
+                self.sleep(wait)
+                self.updated = self.clock()
+                self.tokens = 1.0
+            self.tokens -= 1
+            return wait
@@ -0,0 +1,73 @@
+# apps/notifications/channels/email.py
+"""Email-канал: письма через EMAIL_BACKEND, одно SMTP-соединение на пачку"""
+from smtplib import SMTPServerDisconnected
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+
+from .base import ChannelBackend, DeliveryError, FakeBackendMixin
+
+
+class SMTPBackend(ChannelBackend):
+    """Письма пачки отправляются через одно открытое соединение.
+
+    При разрыве соединения оно переоткрывается один раз, ошибка отправки
+    отдельного письма не прерывает остальную пачку.
+    """
+    name = 'email'
+    batch_size = getattr(settings, 'NOTIFICATION_EMAIL_BATCH_SIZE', 100)
+    email_backend = None
+
+    def get_connection(self):
+        return get_connection(backend=self.email_backend, fail_silently=False)
+
+    def build_message(self, message, connection):
+        return EmailMessage(
+            subject=message.title,
+            body=message.body,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[message.recipient.email],
+            connection=connection
+        )
+
+    def send_batch(self, messages):
+        results = [None] * len(messages)
+        pending = []
+        for index, message in enumerate(messages):
+            if message.recipient.email:
+                pending.append(index)
+            else:
+                results[index] = DeliveryError('У пользователя не указан email', permanent=True)
+        if not pending:
+            return results
+
+        connection = self.get_connection()
+        try:
+            connection.open()
+            for index in pending:
+                email = self.build_message(messages[index], connection)
+                try:
+                    try:
+                        email.send()
+                    except SMTPServerDisconnected:
+                        connection.close()
+                        connection.open()
+                        email.send()
+                except Exception as e:
+                    results[index] = e
+        except Exception as e:
+            for index in pending:
+                if results[index] is None:
+                    results[index] = e
+        finally:
+            connection.close()
+        return results
+
+
+class FakeEmailBackend(FakeBackendMixin, SMTPBackend):
+    """Письма складываются в django.core.mail.outbox и в self.sent"""
+    email_backend = 'django.core.mail.backends.locmem.EmailBackend'
+
+    def build_message(self, message, connection):
+        self.record(message, to=message.recipient.email)
+        return super().build_message(message, connection)
@@ -0,0 +1,51 @@
+# apps/notifications/channels/system.py
+"""Системный канал: уведомление во входящих пользователя (Notification)"""
+import logging
+
+from apps.notifications import realtime
+from apps.notifications.models import Notification
+from apps.notifications.services import unread
+
+from .base import ChannelBackend, FakeBackendMixin
+
+logger = logging.getLogger(__name__)
+
+
+class SystemBackend(ChannelBackend):
+    """Входящие пользователя: вся пачка — одним bulk_create, плюс счётчики
+    непрочитанных и события для открытых потоков (SSE)"""
+    name = 'system'
+    batch_size = 1000
+
+    def send_batch(self, messages):
+        notifications = Notification.objects.bulk_create([
+            Notification(
+                recipient_id=message.recipient_id,
+                sender_id=message.sender_id,
+                notification_type=message.notification_type,
+                title=message.title,
+                body=message.body,
+                related_object_id=message.related_object_id
+            )
+            for message in messages
+        ])
+        # Уведомления уже записаны: ошибка кэша или брокера не должна сделать
+        # пачку недоставленной — иначе повтор создаст уведомления второй раз
+        try:
+            unread.increment(message.recipient_id for message in messages)
+        except Exception as e:
+            logger.warning(f'Ошибка обновления счётчиков непрочитанных: {str(e)}')
+        try:
+            realtime.publish_notifications(notifications)
+        except Exception as e:
+            logger.warning(f'Ошибка публикации уведомлений в реальном времени: {str(e)}')
+        return [None] * len(messages)
+
+
+class FakeSystemBackend(FakeBackendMixin, SystemBackend):
+    """Системный канал без записи в БД"""
+
+    def send_batch(self, messages):
+        for message in messages:
+            self.record(message)
+        return [None] * len(messages)
@@ -0,0 +1,132 @@
+# apps/notifications/channels/telegram.py
+"""Telegram-канал: сообщения от бота пользователям с привязанным telegram_id"""
+import json
+import time
+from http.client import HTTPException, HTTPSConnection
+
+from django.conf import settings
+
+from .base import ChannelBackend, DeliveryError, FakeBackendMixin, RateLimiter
+
+API_HOST = 'api.telegram.org'
+REQUEST_TIMEOUT = 10
+
+# Ограничения Bot API: около 30 сообщений в секунду всего и 1 в секунду в один чат
+GLOBAL_RATE = getattr(settings, 'TELEGRAM_RATE_LIMIT_PER_SECOND', 25)
+CHAT_INTERVAL = 1.0
+
+
+def format_text(message):
+    return f"{message.title}\n\n{message.body}" if message.title else message.body
+
+
+class TelegramBackend(ChannelBackend):
+    """Сообщения пачки идут через одно HTTPS keep-alive соединение.
+
+    Частота ограничена общим для процесса token bucket (GLOBAL_RATE в секунду)
+    и интервалом CHAT_INTERVAL между сообщениями в один чат. Ответ 429
+    останавливает пачку: оставшиеся сообщения возвращаются с retry_after.
+    """
+    name = 'telegram'
+    batch_size = 100
+    limiter = RateLimiter(GLOBAL_RATE)
+
+    def __init__(self):
+        self._last_by_chat = {}
+
+    def _wait_for_chat(self, chat_id):
+        last = self._last_by_chat.get(chat_id)
+        if last is not None:
+            delay = CHAT_INTERVAL - (time.monotonic() - last)
+            if delay > 0:
+                time.sleep(delay)
+        self._last_by_chat[chat_id] = time.monotonic()
+        if len(self._last_by_chat) > 10000:
+            horizon = time.monotonic() - CHAT_INTERVAL
+            self._last_by_chat = {
+                chat: moment for chat, moment in self._last_by_chat.items() if moment > horizon
+            }
+
+    def get_token(self):
+        return settings.TELEGRAM_BOT_TOKEN
+
+    def open(self):
+        return HTTPSConnection(API_HOST, timeout=REQUEST_TIMEOUT)
+
+    def post(self, connection, token, chat_id, text):
+        """Вызвать sendMessage; возвращает разобранный JSON-ответ"""
+        payload = json.dumps({'chat_id': chat_id, 'text': text})
+        connection.request(
+            'POST', f'/bot{token}/sendMessage', body=payload.encode(),
+            headers={'Content-Type': 'application/json'}
+        )
+        response = connection.getresponse()
+        return json.loads(response.read().decode() or '{}')
+
+    def send_batch(self, messages):
+        token = self.get_token()
+        if not token:
+            return [DeliveryError('TELEGRAM_BOT_TOKEN не задан')] * len(messages)
+
+        results = [None] * len(messages)
+        connection = self.open()
+        try:
+            for index, message in enumerate(messages):
+                chat_id = message.recipient.telegram_id
+                if not chat_id:
+                    results[index] = DeliveryError('У пользователя не привязан Telegram', permanent=True)
+                    continue
+
+                self.limiter.acquire()
+                self._wait_for_chat(chat_id)
+                try:
+                    try:
+                        result = self.post(connection, token, chat_id, format_text(message))
+                    except (HTTPException, ConnectionError):
+                        connection.close()
+                        connection = self.open()
+                        result = self.post(connection, token, chat_id, format_text(message))
+                except Exception as e:
+                    results[index] = e
+                    continue
+
+                if result.get('ok'):
+                    continue
+                retry_after = (result.get('parameters') or {}).get('retry_after')
+                error = DeliveryError(
+                    result.get('description', 'Ошибка Telegram API'),
+                    permanent=result.get('error_code') in (400, 403),
+                    retry_after=retry_after
+                )
+                results[index] = error
+                if retry_after:
+                    # Flood control: остаток пачки откладываем целиком
+                    for rest in range(index + 1, len(messages)):
+                        results[rest] = DeliveryError('Отложено из-за ограничения Telegram', retry_after=retry_after)
+                    break
+        finally:
+            connection.close()
+        return results
+
+
+class FakeTelegramBackend(FakeBackendMixin, TelegramBackend):
+    """Telegram без сети: соблюдает проверки и ограничения частоты, пишет в self.sent"""
+
+    def __init__(self):
+        FakeBackendMixin.__init__(self)
+        TelegramBackend.__init__(self)
+
+    def open(self):
+        return _FakeConnection()
+
+    def post(self, connection, token, chat_id, text):
+        self.sent.append({'chat_id': chat_id, 'text': text})
+        return {'ok': True}
+
+    def get_token(self):
+        return settings.TELEGRAM_BOT_TOKEN or 'fake-token'
+
+
+class _FakeConnection:
+    def close(self):
+        pass
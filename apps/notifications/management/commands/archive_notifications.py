@@ -0,0 +1,78 @@
+# apps/notifications/management/commands/archive_notifications.py
+"""
+Management команда — перенос устаревших уведомлений в архив
+Использование:
+    python manage.py archive_notifications                 # архивировать и почистить (для cron, раз в сутки)
+    python manage.py archive_notifications --dry-run       # только посчитать
+    python manage.py archive_notifications --partition     # PostgreSQL: перевести таблицы в помесячные секции
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.utils import partitioning
+from apps.notifications.services import retention
+
+
+class Command(BaseCommand):
+    help = 'Переносит прочитанные уведомления старше срока хранения в архив пачками'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=retention.BATCH_SIZE,
+            help=f'Размер пачки (по умолчанию {retention.BATCH_SIZE})',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать, сколько уведомлений будет перенесено',
+        )
+        parser.add_argument(
+            '--partition',
+            action='store_true',
+            help='Перевести рабочую таблицу и архив в помесячные секции (только PostgreSQL, '
+                 'блокирует таблицы на время копирования)',
+        )
+        parser.add_argument(
+            '--months-ahead',
+            type=int,
+            default=retention.PARTITION_MONTHS_AHEAD,
+            help=f'На сколько месяцев вперёд создавать секции (по умолчанию {retention.PARTITION_MONTHS_AHEAD})',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+
+        if options['dry_run']:
+            stats = retention.archive_expired(dry_run=True)
+            self.stdout.write(f"Будет перенесено в архив: {stats['archived']}")
+            return
+
+        if options['partition']:
+            if not partitioning.is_supported():
+                raise CommandError('Секционирование поддерживается только на PostgreSQL')
+            self.stdout.write('Перевод таблиц в помесячные секции...')
+            try:
+                converted = retention.enable_partitioning(options['months_ahead'])
+            except RuntimeError as e:
+                raise CommandError(str(e))
+            self.stdout.write(self.style.SUCCESS(
+                f"✓ Секционированы: {', '.join(converted) or 'нет (уже секционированы)'}"
+            ))
+
+        stats = retention.archive_expired(batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Перенесено в архив: {stats['archived']} (пачек: {stats['batches']})"
+        ))
+
+        deleted, dropped = retention.purge_archive(batch_size=batch_size)
+        if deleted or dropped:
+            self.stdout.write(f'  Удалено из архива: {deleted}, секций: {len(dropped)}')
+        purged = retention.purge_outbox(batch_size=batch_size)
+        if purged:
+            self.stdout.write(f'  Удалено отправленных записей outbox: {purged}')
+
+        if partitioning.is_supported():
+            created, dropped = retention.maintain_partitions(options['months_ahead'])
+            if created or dropped:
+                self.stdout.write(f'  Секций создано: {len(created)}, удалено пустых: {len(dropped)}')
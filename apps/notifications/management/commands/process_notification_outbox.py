@@ -0,0 +1,60 @@
+# apps/notifications/management/commands/process_notification_outbox.py
+"""
+Management команда — воркер доставки уведомлений из outbox
+Использование:
+    python manage.py process_notification_outbox            # постоянная работа
+    python manage.py process_notification_outbox --once     # разобрать очередь и выйти
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.notifications.services import outbox
+
+
+class Command(BaseCommand):
+    help = 'Доставляет уведомления из NotificationOutbox пачками с повторами'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=outbox.BATCH_SIZE,
+            help=f'Размер пачки (по умолчанию {outbox.BATCH_SIZE})',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Разобрать очередь один раз и завершиться',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=5.0,
+            help='Пауза между проверками пустой очереди, секунд (по умолчанию 5)',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+
+        if options['once']:
+            self._report(outbox.drain(batch_size=batch_size))
+            return
+
+        self.stdout.write('Воркер уведомлений запущен (Ctrl+C для остановки)')
+        try:
+            while True:
+                totals = outbox.drain(batch_size=batch_size)
+                if totals['batches']:
+                    self._report(totals)
+                else:
+                    time.sleep(options['sleep'])
+        except KeyboardInterrupt:
+            self.stdout.write('Воркер остановлен')
+
+    def _report(self, totals):
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Пачек: {totals['batches']}, отправлено: {totals['sent']}, "
+            f"развёрнуто рассылок: {totals['expanded']}, повтор: {totals['retried']}, "
+            f"ошибок: {totals['failed']}"
+        ))
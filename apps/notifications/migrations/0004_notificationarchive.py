@@ -0,0 +1,40 @@
+# Generated by Django 6.0.1 on 2026-10-18 11:17
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0003_notification_unread_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_id', models.PositiveBigIntegerField()),
+                ('notification_type', models.CharField(choices=[('medical_review', 'Ознакомьтесь с мед. данными'), ('enrollment_approved', 'Зачисление одобрено'), ('event_result', 'Результаты соревнований'), ('mass_notification', 'Массовое уведомление')], max_length=50)),
+                ('title', models.CharField(max_length=255)),
+                ('body', models.TextField()),
+                ('is_read', models.BooleanField(default=True)),
+                ('related_object_id', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(db_index=True)),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('recipient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_notifications', to=settings.AUTH_USER_MODEL)),
+                ('sender', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Архивное уведомление',
+                'verbose_name_plural': 'Архив уведомлений',
+                'db_table': 'notifications_notification_archive',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['recipient', 'created_at'], name='notificatio_recipie_712c4b_idx')],
+            },
+        ),
+    ]
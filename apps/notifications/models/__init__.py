@@ -1,3 +1,5 @@
 from .notification import Notification
 from .subscription import NotificationSubscription
-from .template import NotificationTemplate
\ No newline at end of file
+from .template import NotificationTemplate
+from .outbox import NotificationOutbox
+from .archive import NotificationArchive
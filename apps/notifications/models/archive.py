@@ -0,0 +1,34 @@
+# apps/notifications/models/archive.py
+from django.db import models
+from django.utils import timezone
+from apps.users.models.user import CustomUser
+from .notification import NOTIFICATION_TYPE_CHOICES
+
+
+class NotificationArchive(models.Model):
+    """Архивная копия уведомления, вынесенная из рабочей таблицы по сроку хранения.
+
+    created_at — время создания исходного уведомления, original_id — его id.
+    """
+    original_id = models.PositiveBigIntegerField()
+    recipient = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='archived_notifications')
+    sender = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    notification_type = models.CharField(max_length=50, choices=NOTIFICATION_TYPE_CHOICES)
+    title = models.CharField(max_length=255)
+    body = models.TextField()
+    is_read = models.BooleanField(default=True)
+    related_object_id = models.PositiveBigIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(db_index=True)
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'notifications_notification_archive'
+        verbose_name = 'Архивное уведомление'
+        verbose_name_plural = 'Архив уведомлений'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['recipient', 'created_at']),
+        ]
+
+    def __str__(self):
+        return self.title
@@ -21,4 +21,8 @@ class Notification(TimeStampedModel):
 
     class Meta:
         db_table = 'notifications_notification'
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+        indexes = [
+            # Пересчёт счётчика непрочитанных и список входящих
+            models.Index(fields=['recipient', 'is_read', 'created_at']),
+        ]
\ No newline at end of file
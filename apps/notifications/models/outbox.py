@@ -0,0 +1,54 @@
+# apps/notifications/models/outbox.py
+from django.db import models
+from django.utils import timezone
+from apps.core.models.base import TimeStampedModel
+from apps.users.models.user import CustomUser
+from .template import NOTIFICATION_CHANNEL_CHOICES
+
+OUTBOX_STATUS_CHOICES = [
+    ('pending', 'Ожидает отправки'),
+    ('processing', 'Отправляется'),
+    ('sent', 'Отправлено'),
+    ('failed', 'Ошибка'),
+]
+
+
+class NotificationOutbox(TimeStampedModel):
+    """Исходящее уведомление, ожидающее доставки воркером.
+
+    Записывается в той же транзакции, что и изменение, о котором уведомляем.
+    Запись без recipient — массовая рассылка: воркер разворачивает её по
+    условию audience в отдельные сообщения.
+    """
+    recipient = models.ForeignKey(
+        CustomUser, on_delete=models.CASCADE, null=True, blank=True, related_name='outbox_messages'
+    )
+    sender = models.ForeignKey(
+        CustomUser, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    audience = models.JSONField(default=dict, blank=True)
+    channel = models.CharField(max_length=20, choices=NOTIFICATION_CHANNEL_CHOICES, default='system')
+    template_name = models.CharField(max_length=100, blank=True)
+    context = models.JSONField(default=dict, blank=True)
+    notification_type = models.CharField(max_length=50)
+    title = models.CharField(max_length=255, blank=True)
+    body = models.TextField(blank=True)
+    related_object_id = models.PositiveBigIntegerField(null=True, blank=True)
+
+    status = models.CharField(max_length=20, choices=OUTBOX_STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        db_table = 'notifications_outbox'
+        verbose_name = 'Исходящее уведомление'
+        verbose_name_plural = 'Исходящие уведомления'
+        indexes = [
+            models.Index(fields=['status', 'available_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.title} ({self.get_channel_display()}, {self.get_status_display()})"
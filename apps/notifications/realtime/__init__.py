@@ -0,0 +1,107 @@
+# apps/notifications/realtime/__init__.py
+"""
+События для потока уведомлений в реальном времени (SSE, /api/notifications/stream/).
+
+Брокер задаётся NOTIFICATION_REALTIME_BACKEND (путь к классу): по умолчанию
+Redis pub/sub при заданном REDIS_URL, иначе брокер в памяти процесса
+(с ним поток не работает: уведомления создаёт отдельный процесс-воркер).
+Публикация выполняется после коммита транзакции, ошибки брокера только
+логируются — недоступность Redis не должна ломать доставку уведомлений.
+"""
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from .base import Broker, Subscription
+
+logger = logging.getLogger(__name__)
+
+EVENT_NOTIFICATION = 'notification'
+EVENT_UNREAD_COUNT = 'unread_count'
+
+_broker = None
+
+
+def _default_backend():
+    if getattr(settings, 'REDIS_URL', None):
+        return 'apps.notifications.realtime.redis_pubsub.RedisBroker'
+    return 'apps.notifications.realtime.memory.InProcessBroker'
+
+
+def get_broker():
+    """Брокер событий (один на процесс)"""
+    global _broker
+    if _broker is None:
+        _broker = import_string(getattr(settings, 'NOTIFICATION_REALTIME_BACKEND', None) or _default_backend())()
+    return _broker
+
+
+def is_shared():
+    """Доходят ли до веб-процессов события, опубликованные воркером outbox"""
+    return get_broker().shared
+
+
+def reset_broker():
+    """Сбросить брокер (после изменения настроек в тестах)"""
+    global _broker
+    if _broker is not None:
+        _broker.close()
+    _broker = None
+
+
+def notification_message(notification, unread_count=None):
+    """Событие о новом уведомлении; id события — id уведомления (для Last-Event-ID)"""
+    return {
+        'event': EVENT_NOTIFICATION,
+        'id': notification.id,
+        'data': {
+            'notification': {
+                'id': notification.id,
+                'title': notification.title,
+                'body': notification.body,
+                'notification_type': notification.notification_type,
+                'is_read': notification.is_read,
+                'created_at': notification.created_at.isoformat() if notification.created_at else None,
+            },
+            'unread_count': unread_count,
+        },
+    }
+
+
+def unread_count_message(count):
+    return {'event': EVENT_UNREAD_COUNT, 'data': {'count': count}}
+
+
+def publish_many(events):
+    """Опубликовать пары (user_id, message) после коммита текущей транзакции"""
+    events = list(events)
+    if not events:
+        return
+
+    def send():
+        try:
+            get_broker().publish_many(events)
+        except Exception:
+            logger.exception('Не удалось опубликовать %s событий уведомлений', len(events))
+
+    transaction.on_commit(send)
+
+
+def publish_notifications(notifications):
+    """Разослать события о созданных уведомлениях вместе с новыми счётчиками"""
+    from apps.notifications.services import unread
+
+    notifications = [notification for notification in notifications if notification.id]
+    if not notifications:
+        return
+    counts = unread.get_counts({notification.recipient_id for notification in notifications})
+    publish_many(
+        (notification.recipient_id, notification_message(notification, counts.get(notification.recipient_id)))
+        for notification in notifications
+    )
+
+
+def publish_unread_count(user_id, count):
+    publish_many([(user_id, unread_count_message(count))])
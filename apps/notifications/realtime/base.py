@@ -0,0 +1,95 @@
+# apps/notifications/realtime/base.py
+"""Базовые классы брокера событий для потока уведомлений (SSE)"""
+import asyncio
+import threading
+
+QUEUE_SIZE = 100
+
+
+class Subscription:
+    """Подписка одного SSE-соединения на события пользователя.
+
+    Очередь принадлежит event loop соединения; публикация из других потоков
+    передаётся в него через call_soon_threadsafe. Если клиент не успевает
+    читать, старые события вытесняются: состояние всё равно восстановится
+    по следующему событию со счётчиком.
+    """
+
+    def __init__(self, broker, user_id, loop):
+        self.broker = broker
+        self.user_id = user_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.dropped = 0
+
+    def offer(self, message):
+        """Положить событие в очередь (вызывается в потоке event loop)"""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+    async def get(self, timeout):
+        """Следующее событие или None, если за timeout секунд ничего не пришло"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class Broker:
+    """Брокер событий: publish — из любого (синхронного) кода, subscribe — из SSE-соединения.
+
+    Подписчики хранятся в памяти процесса; подкласс определяет, как событие
+    доходит до процесса с подписчиком (напрямую или через Redis).
+    Сообщение — словарь {'event': ..., 'data': {...}, 'id': ...}.
+    """
+
+    # Доходят ли события, опубликованные в другом процессе (воркере outbox)
+    shared = True
+
+    def __init__(self):
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id):
+        subscription = Subscription(self, user_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscribers.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscribers[subscription.user_id]
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(subscriptions) for subscriptions in self._subscribers.values())
+
+    def dispatch(self, user_id, message):
+        """Передать событие локальным подписчикам пользователя"""
+        with self._lock:
+            subscriptions = list(self._subscribers.get(user_id, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, message)
+            except RuntimeError:
+                # Event loop соединения уже закрыт
+                self.unsubscribe(subscription)
+
+    def publish_many(self, events):
+        """Опубликовать события: список пар (user_id, message)"""
+        raise NotImplementedError
+
+    def publish(self, user_id, message):
+        self.publish_many([(user_id, message)])
+
+    def close(self):
+        pass
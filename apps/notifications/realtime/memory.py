@@ -0,0 +1,17 @@
+# apps/notifications/realtime/memory.py
+"""Брокер в памяти процесса: для тестов и разработки.
+
+События воркера outbox (отдельного процесса) до веб-процессов не доходят,
+поэтому с этим брокером поток уведомлений не открывается (см. api.stream).
+"""
+from .base import Broker
+
+
+class InProcessBroker(Broker):
+    """События доходят только до подписчиков этого же процесса"""
+
+    shared = False
+
+    def publish_many(self, events):
+        for user_id, message in events:
+            self.dispatch(user_id, message)
@@ -0,0 +1,76 @@
+# apps/notifications/realtime/redis_pubsub.py
+"""
+Брокер через Redis pub/sub: воркер outbox и веб-процессы — разные процессы.
+
+Все события идут в один канал; каждый ASGI-процесс держит одно соединение
+подписки (фоновый поток) и раздаёт события своим SSE-клиентам, поэтому
+число соединений с Redis не зависит от числа открытых дашбордов.
+"""
+import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+
+from .base import Broker
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = getattr(settings, 'NOTIFICATION_REALTIME_CHANNEL', 'notifications:events')
+RECONNECT_DELAY = 5
+
+
+class RedisBroker(Broker):
+
+    def __init__(self, url=None, channel=CHANNEL):
+        super().__init__()
+        import redis
+
+        self.url = url or settings.REDIS_URL
+        self.channel = channel
+        self._redis = redis.Redis.from_url(self.url)
+        self._listener = None
+        self._stopped = threading.Event()
+
+    def publish_many(self, events):
+        pipeline = self._redis.pipeline(transaction=False)
+        for user_id, message in events:
+            pipeline.publish(self.channel, json.dumps({'user_id': user_id, 'message': message}))
+        pipeline.execute()
+
+    def subscribe(self, user_id):
+        self._ensure_listener()
+        return super().subscribe(user_id)
+
+    def _ensure_listener(self):
+        with self._lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(
+                    target=self._listen, name='notifications-redis-listener', daemon=True
+                )
+                self._listener.start()
+
+    def _listen(self):
+        """Читать канал и раздавать события; при обрыве — переподключение"""
+        while not self._stopped.is_set():
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(self.channel)
+                while not self._stopped.is_set():
+                    raw = pubsub.get_message(timeout=1.0)
+                    if raw is None:
+                        continue
+                    try:
+                        payload = json.loads(raw['data'])
+                        self.dispatch(payload['user_id'], payload['message'])
+                    except (ValueError, KeyError, TypeError):
+                        logger.warning('Некорректное событие в канале %s', self.channel)
+            except Exception:
+                logger.exception('Потеряно соединение с Redis, повтор через %s с', RECONNECT_DELAY)
+                time.sleep(RECONNECT_DELAY)
+            finally:
+                pubsub.close()
+
+    def close(self):
+        self._stopped.set()
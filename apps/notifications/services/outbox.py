@@ -0,0 +1,379 @@
+# apps/notifications/services/outbox.py
+"""
+Транзакционный outbox уведомлений.
+
+Код приложения не создаёт Notification и не отправляет письма сам, а пишет
+записи NotificationOutbox в той же транзакции, что и бизнес-изменение:
+откат транзакции отменяет и уведомление. Доставку выполняет воркер
+(команда process_notification_outbox): забирает пачки готовых записей,
+разворачивает массовые рассылки, отправляет через каналы и повторяет
+неудачные попытки с экспоненциальной задержкой.
+
+Через очередь же выполняются задачи, порождающие уведомления (например,
+рассылка приглашений): запись без получателя с audience={'task': имя}
+воркер разворачивает функцией, зарегистрированной register_task.
+"""
+import json
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.notifications.channels import DeliveryError, get_backend
+from apps.notifications.models import NotificationOutbox
+from . import templates
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHANNELS = tuple(getattr(settings, 'NOTIFICATION_DEFAULT_CHANNELS', ('system',)))
+BATCH_SIZE = getattr(settings, 'NOTIFICATION_OUTBOX_BATCH_SIZE', 200)
+EXPAND_CHUNK_SIZE = 1000
+MAX_ATTEMPTS = getattr(settings, 'NOTIFICATION_OUTBOX_MAX_ATTEMPTS', 5)
+RETRY_BASE_SECONDS = getattr(settings, 'NOTIFICATION_OUTBOX_RETRY_BASE_SECONDS', 30)
+RETRY_MAX_SECONDS = 3600
+LOCK_TIMEOUT = timedelta(minutes=10)
+
+# Задачи воркера: имя → функция(запись outbox), возвращающая число созданных записей
+_tasks = {}
+
+
+# === Постановка в очередь ===
+
+def _channels_for(template_name, channels):
+    if channels:
+        return list(channels)
+    if template_name:
+        template = templates.get_template(template_name)
+        if template is not None:
+            return [template.channel]
+    return list(DEFAULT_CHANNELS)
+
+
+def _build(fields, channels=None, template=None, context=None):
+    return [
+        NotificationOutbox(
+            channel=channel,
+            template_name=template or '',
+            context=context or {},
+            **fields
+        )
+        for channel in _channels_for(template, channels)
+    ]
+
+
+def enqueue(recipient, notification_type, title='', body='', sender=None,
+            related_object_id=None, channels=None, template=None, context=None):
+    """Поставить уведомление пользователю в очередь (по записи на канал).
+
+    template — имя NotificationTemplate: заголовок и текст будут отрисованы
+    воркером с context, а канал по умолчанию берётся из шаблона.
+    """
+    entries = _build({
+        'recipient': recipient,
+        'sender': sender,
+        'notification_type': notification_type,
+        'title': title,
+        'body': body,
+        'related_object_id': related_object_id,
+    }, channels=channels, template=template, context=context)
+    return NotificationOutbox.objects.bulk_create(entries)
+
+
+def enqueue_many(messages, channels=None):
+    """Поставить в очередь пачку уведомлений одним bulk_create.
+
+    messages — словари с ключами recipient или recipient_id, notification_type,
+    title, body и необязательными sender(_id), related_object_id, template, context.
+    """
+    entries = []
+    for message in messages:
+        message = dict(message)
+        template = message.pop('template', None)
+        context = message.pop('context', None)
+        entries.extend(_build(message, channels=channels, template=template, context=context))
+    return NotificationOutbox.objects.bulk_create(entries, batch_size=EXPAND_CHUNK_SIZE)
+
+
+def enqueue_broadcast(audience, notification_type, title='', body='', sender=None,
+                      channels=None, template=None, context=None):
+    """Поставить в очередь массовую рассылку одной записью.
+
+    audience: {'all': True} — все активные пользователи; {'roles': [...]} —
+    пользователи с активными ролями; {'user_ids': [...]} — явный список.
+    Рассылка разворачивается по получателям воркером.
+    """
+    if not audience:
+        raise ValueError('Не указаны получатели рассылки')
+    return NotificationOutbox.objects.bulk_create(_build({
+        'audience': audience,
+        'sender': sender,
+        'notification_type': notification_type,
+        'title': title,
+        'body': body,
+    }, channels=channels, template=template, context=context))
+
+
+def register_task(name, func):
+    """Зарегистрировать задачу, которую воркер выполнит вместо разворачивания рассылки"""
+    _tasks[name] = func
+
+
+def enqueue_task(name, notification_type, sender_id=None, related_object_id=None, context=None):
+    """Поставить в очередь задачу воркера одной записью.
+
+    Задача выполняется в транзакции разворачивания: ошибка откатывает её
+    целиком, и запись повторяется с задержкой, как неудачная доставка.
+    """
+    return NotificationOutbox.objects.create(
+        audience={'task': name},
+        sender_id=sender_id,
+        notification_type=notification_type,
+        related_object_id=related_object_id,
+        context=context or {},
+    )
+
+
+def resolve_audience(audience):
+    """Queryset активных пользователей, попадающих под условие audience"""
+    from apps.users.models import CustomUser
+
+    users = CustomUser.objects.filter(is_active=True)
+    if audience.get('all'):
+        return users
+    if 'user_ids' in audience:
+        users = users.filter(id__in=audience['user_ids'])
+    if audience.get('roles'):
+        users = users.filter(roles__role__in=audience['roles'], roles__is_active=True).distinct()
+    if 'user_ids' not in audience and not audience.get('roles'):
+        return users.none()
+    return users
+
+
+# === Доставка ===
+
+def retry_delay(attempts):
+    """Задержка перед повторной попыткой: 30 с, 60 с, 120 с… не больше часа"""
+    return timedelta(seconds=min(RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0), RETRY_MAX_SECONDS))
+
+
+def release_stale():
+    """Вернуть в очередь записи, зависшие в processing (воркер упал)"""
+    return NotificationOutbox.objects.filter(
+        status='processing',
+        locked_at__lt=timezone.now() - LOCK_TIMEOUT
+    ).update(status='pending', locked_at=None)
+
+
+def claim_batch(batch_size=BATCH_SIZE):
+    """Забрать пачку готовых к отправке записей и пометить их processing.
+
+    На PostgreSQL строки блокируются с SKIP LOCKED, поэтому несколько
+    воркеров не получают одни и те же записи.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            NotificationOutbox.objects.select_for_update(skip_locked=True)
+            .filter(status='pending', available_at__lte=now)
+            .order_by('available_at', 'id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return []
+        NotificationOutbox.objects.filter(id__in=ids, status='pending').update(
+            status='processing', locked_at=now
+        )
+    return list(
+        NotificationOutbox.objects.filter(id__in=ids, status='processing', locked_at=now)
+        .select_related('recipient')
+        .order_by('id')
+    )
+
+
+def expand_broadcast(entry):
+    """Развернуть массовую рассылку в записи по получателям (или выполнить
+    задачу воркера). Возвращает число созданных записей"""
+    task = entry.audience.get('task')
+    if task:
+        if task not in _tasks:
+            raise DeliveryError(f'Задача {task} не зарегистрирована', permanent=True)
+        return _tasks[task](entry)
+    recipient_ids = resolve_audience(entry.audience).order_by('id').values_list('id', flat=True)
+    total = 0
+    chunk = []
+
+    def flush():
+        NotificationOutbox.objects.bulk_create(chunk)
+        return len(chunk)
+
+    for recipient_id in recipient_ids.iterator(chunk_size=EXPAND_CHUNK_SIZE):
+        chunk.append(NotificationOutbox(
+            recipient_id=recipient_id,
+            sender_id=entry.sender_id,
+            channel=entry.channel,
+            template_name=entry.template_name,
+            context=entry.context,
+            notification_type=entry.notification_type,
+            title=entry.title,
+            body=entry.body,
+            related_object_id=entry.related_object_id,
+        ))
+        if len(chunk) >= EXPAND_CHUNK_SIZE:
+            total += flush()
+            chunk = []
+    if chunk:
+        total += flush()
+    return total
+
+
+def _render(entries):
+    """Подставить контекст в шаблоны; ошибки отрисовки — по записям.
+
+    Шаблоны пачки загружаются одним запросом, записи с одинаковым шаблоном и
+    контекстом (развёрнутая рассылка) отрисовываются одним render_batch,
+    где от получателя к получателю меняется только переменная user.
+    """
+    errors = {}
+    templated = [entry for entry in entries if entry.template_name]
+    if not templated:
+        return errors
+
+    loaded = templates.get_templates(entry.template_name for entry in templated)
+    groups = {}
+    for entry in templated:
+        template = loaded.get(entry.template_name)
+        if template is None:
+            if not entry.body:
+                errors[entry.id] = DeliveryError(f'Шаблон {entry.template_name} не найден', permanent=True)
+            continue
+        key = (entry.template_name, json.dumps(entry.context, sort_keys=True, default=str))
+        groups.setdefault(key, []).append(entry)
+
+    for (template_name, _), group in groups.items():
+        try:
+            rendered = templates.render_batch(
+                loaded[template_name],
+                [{'user': entry.recipient} for entry in group],
+                shared_context=group[0].context
+            )
+        except Exception as e:
+            for entry in group:
+                errors[entry.id] = DeliveryError(f'Ошибка шаблона: {e}', permanent=True)
+            continue
+        for entry, (subject, body) in zip(group, rendered):
+            entry.title = subject or entry.title
+            entry.body = body
+    return errors
+
+
+def deliver(entries):
+    """Отправить записи через бэкенды их каналов пачками по batch_size бэкенда.
+
+    Возвращает {id: None или исключение}.
+    """
+    results = _render(entries)
+    by_channel = {}
+    for entry in entries:
+        if entry.id not in results:
+            by_channel.setdefault(entry.channel, []).append(entry)
+
+    for channel_name, messages in by_channel.items():
+        try:
+            backend = get_backend(channel_name)
+        except Exception as e:
+            for message in messages:
+                results[message.id] = e
+            continue
+        for start in range(0, len(messages), backend.batch_size):
+            chunk = messages[start:start + backend.batch_size]
+            try:
+                channel_results = backend.send_batch(chunk)
+            except Exception as e:
+                channel_results = [e] * len(chunk)
+            for message, result in zip(chunk, channel_results):
+                results[message.id] = result
+    return results
+
+
+def _finish(entries, results):
+    """Сохранить итоги попытки: отправленные — одним UPDATE, остальные — bulk_update"""
+    now = timezone.now()
+    sent_ids = [entry.id for entry in entries if results.get(entry.id) is None]
+    failed = []
+    for entry in entries:
+        error = results.get(entry.id)
+        if error is None:
+            continue
+        entry.attempts += 1
+        entry.locked_at = None
+        entry.last_error = str(error)[:2000]
+        if getattr(error, 'permanent', False) or entry.attempts >= MAX_ATTEMPTS:
+            entry.status = 'failed'
+        else:
+            entry.status = 'pending'
+            delay = retry_delay(entry.attempts)
+            retry_after = getattr(error, 'retry_after', None)
+            if retry_after:
+                delay = max(delay, timedelta(seconds=retry_after))
+            entry.available_at = now + delay
+        failed.append(entry)
+
+    if sent_ids:
+        NotificationOutbox.objects.filter(id__in=sent_ids).update(
+            status='sent', sent_at=now, locked_at=None, attempts=F('attempts') + 1, updated_at=now
+        )
+    if failed:
+        NotificationOutbox.objects.bulk_update(
+            failed, ['status', 'attempts', 'available_at', 'locked_at', 'last_error', 'updated_at']
+        )
+    return len(sent_ids), sum(1 for entry in failed if entry.status == 'pending'), sum(
+        1 for entry in failed if entry.status == 'failed'
+    )
+
+
+def process_batch(batch_size=BATCH_SIZE):
+    """Обработать одну пачку очереди. Возвращает счётчики или None, если очередь пуста"""
+    entries = claim_batch(batch_size)
+    if not entries:
+        return None
+
+    stats = {'claimed': len(entries), 'expanded': 0, 'sent': 0, 'retried': 0, 'failed': 0}
+    broadcasts = [entry for entry in entries if entry.recipient_id is None]
+    direct = [entry for entry in entries if entry.recipient_id is not None]
+
+    for entry in broadcasts:
+        try:
+            with transaction.atomic():
+                stats['expanded'] += expand_broadcast(entry)
+                NotificationOutbox.objects.filter(id=entry.id).update(
+                    status='sent', sent_at=timezone.now(), locked_at=None
+                )
+        except Exception as e:
+            logger.exception('Ошибка разворачивания рассылки %s', entry.id)
+            sent, retried, failed = _finish([entry], {entry.id: e})
+            stats['retried'] += retried
+            stats['failed'] += failed
+
+    if direct:
+        sent, retried, failed = _finish(direct, deliver(direct))
+        stats['sent'] += sent
+        stats['retried'] += retried
+        stats['failed'] += failed
+    return stats
+
+
+def drain(batch_size=BATCH_SIZE, max_batches=None):
+    """Обрабатывать пачки, пока очередь не опустеет. Возвращает суммарные счётчики"""
+    release_stale()
+    totals = {'batches': 0, 'claimed': 0, 'expanded': 0, 'sent': 0, 'retried': 0, 'failed': 0}
+    while max_batches is None or totals['batches'] < max_batches:
+        stats = process_batch(batch_size)
+        if stats is None:
+            break
+        totals['batches'] += 1
+        for key, value in stats.items():
+            totals[key] += value
+    return totals
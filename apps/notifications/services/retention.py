@@ -0,0 +1,205 @@
+# apps/notifications/services/retention.py
+"""
+Сроки хранения уведомлений.
+
+Прочитанные уведомления старше срока своего типа (NOTIFICATION_RETENTION_DAYS)
+и непрочитанные старше NOTIFICATION_UNREAD_RETENTION_DAYS переносятся пачками
+в NotificationArchive: вставка в архив и удаление из рабочей таблицы — в одной
+транзакции на пачку, чтобы не держать длинных блокировок. На PostgreSQL пачка
+переносится одним запросом (DELETE … RETURNING внутри INSERT), а таблицы можно
+секционировать по месяцам (см. apps.core.utils.partitioning): тогда пустые
+старые секции рабочей таблицы и старые месяцы архива удаляются целиком.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.core.utils import partitioning
+from apps.notifications.models import Notification, NotificationArchive, NotificationOutbox
+from . import unread
+
+DEFAULT_RETENTION_DAYS = {'default': 180}
+BATCH_SIZE = 2000
+PARTITION_MONTHS_AHEAD = 3
+
+ARCHIVE_FIELDS = [
+    'recipient_id', 'sender_id', 'notification_type', 'title', 'body',
+    'is_read', 'related_object_id', 'created_at',
+]
+
+
+def retention_days():
+    """Сроки хранения прочитанных уведомлений по типам: {'default': 180, тип: дни}"""
+    return {**DEFAULT_RETENTION_DAYS, **getattr(settings, 'NOTIFICATION_RETENTION_DAYS', {})}
+
+
+def expired_q(now=None):
+    """Условие на уведомления, подлежащие архивированию, или None"""
+    now = now or timezone.now()
+    days = retention_days()
+    explicit = {key: value for key, value in days.items() if key != 'default'}
+
+    read = Q()
+    for notification_type, type_days in explicit.items():
+        if type_days is not None:
+            read |= Q(notification_type=notification_type, created_at__lt=now - timedelta(days=type_days))
+    if days.get('default') is not None:
+        read |= ~Q(notification_type__in=list(explicit)) & Q(created_at__lt=now - timedelta(days=days['default']))
+
+    condition = Q(is_read=True) & read if read else None
+    unread_days = getattr(settings, 'NOTIFICATION_UNREAD_RETENTION_DAYS', None)
+    if unread_days is not None:
+        stale_unread = Q(is_read=False, created_at__lt=now - timedelta(days=unread_days))
+        condition = condition | stale_unread if condition is not None else stale_unread
+    return condition
+
+
+def _move_batch(queryset, batch_size, now):
+    """Перенести в архив до batch_size строк queryset.
+
+    Возвращает (перенесено, id получателей непрочитанных, последняя пара (created_at, id)).
+    """
+    ordered = queryset.order_by('created_at', 'id')
+    if connection.vendor == 'postgresql':
+        return _move_batch_postgresql(ordered, batch_size, now)
+
+    rows = list(ordered.values('id', *ARCHIVE_FIELDS)[:batch_size])
+    if not rows:
+        return 0, set(), None
+    with transaction.atomic():
+        NotificationArchive.objects.bulk_create([
+            NotificationArchive(original_id=row['id'], archived_at=now, **{
+                field: row[field] for field in ARCHIVE_FIELDS
+            })
+            for row in rows
+        ])
+        Notification.objects.filter(id__in=[row['id'] for row in rows]).delete()
+    unread_recipients = {row['recipient_id'] for row in rows if not row['is_read']}
+    return len(rows), unread_recipients, (rows[-1]['created_at'], rows[-1]['id'])
+
+
+def _move_batch_postgresql(ordered, batch_size, now):
+    ids_sql, params = ordered.values('id')[:batch_size].query.sql_with_params()
+    source = Notification._meta.db_table
+    target = NotificationArchive._meta.db_table
+    columns = ', '.join(ARCHIVE_FIELDS)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            WITH moved AS (
+                DELETE FROM {source} WHERE id IN ({ids_sql})
+                RETURNING id, {columns}
+            )
+            INSERT INTO {target} (original_id, {columns}, archived_at)
+            SELECT id, {columns}, %s FROM moved
+            RETURNING original_id, recipient_id, is_read, created_at
+            """,
+            [*params, now]
+        )
+        rows = cursor.fetchall()
+    if not rows:
+        return 0, set(), None
+    last = max((created_at, original_id) for original_id, _, _, created_at in rows)
+    return len(rows), {recipient_id for _, recipient_id, is_read, _ in rows if not is_read}, last
+
+
+def archive_expired(batch_size=BATCH_SIZE, now=None, dry_run=False):
+    """Перенести устаревшие уведомления в архив пачками.
+
+    Возвращает {'archived': n, 'batches': n}. Счётчики непрочитанных
+    затронутых пользователей сбрасываются и пересчитаются при чтении.
+    """
+    now = now or timezone.now()
+    condition = expired_q(now)
+    stats = {'archived': 0, 'batches': 0}
+    if condition is None:
+        return stats
+
+    queryset = Notification.objects.filter(condition)
+    if dry_run:
+        stats['archived'] = queryset.count()
+        return stats
+
+    last = None
+    affected = set()
+    while True:
+        batch = queryset
+        if last is not None:
+            created_at, last_id = last
+            # Продолжаем после последней перенесённой строки: оставшиеся
+            # в начале индекса строки не просматриваются повторно
+            batch = batch.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=last_id))
+        moved, unread_recipients, last = _move_batch(batch, batch_size, now)
+        if not moved:
+            break
+        stats['archived'] += moved
+        stats['batches'] += 1
+        affected |= unread_recipients
+        if moved < batch_size:
+            break
+
+    for user_id in affected:
+        unread.reset(user_id)
+    return stats
+
+
+def _delete_in_batches(queryset, batch_size):
+    deleted = 0
+    while True:
+        ids = list(queryset.order_by('id').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += queryset.model.objects.filter(id__in=ids).delete()[0]
+
+
+def purge_archive(batch_size=BATCH_SIZE, now=None):
+    """Удалить архив старше NOTIFICATION_ARCHIVE_RETENTION_DAYS.
+
+    Возвращает (удалено строк, удалённые секции).
+    """
+    days = getattr(settings, 'NOTIFICATION_ARCHIVE_RETENTION_DAYS', None)
+    if days is None:
+        return 0, []
+    cutoff = (now or timezone.now()) - timedelta(days=days)
+    dropped = partitioning.drop_partitions_before(NotificationArchive._meta.db_table, cutoff)
+    deleted = _delete_in_batches(NotificationArchive.objects.filter(created_at__lt=cutoff), batch_size)
+    return deleted, dropped
+
+
+def purge_outbox(batch_size=BATCH_SIZE, now=None):
+    """Удалить отправленные записи outbox старше NOTIFICATION_OUTBOX_RETENTION_DAYS"""
+    days = getattr(settings, 'NOTIFICATION_OUTBOX_RETENTION_DAYS', None)
+    if days is None:
+        return 0
+    cutoff = (now or timezone.now()) - timedelta(days=days)
+    return _delete_in_batches(NotificationOutbox.objects.filter(status='sent', sent_at__lt=cutoff), batch_size)
+
+
+# === Секционирование (PostgreSQL) ===
+
+def partitioned_tables():
+    return [Notification._meta.db_table, NotificationArchive._meta.db_table]
+
+
+def enable_partitioning(months_ahead=PARTITION_MONTHS_AHEAD):
+    """Перевести рабочую таблицу и архив в помесячные секции. Возвращает переведённые"""
+    return [
+        table for table in partitioned_tables()
+        if partitioning.convert_to_partitioned(table, 'created_at', months_ahead)
+    ]
+
+
+def maintain_partitions(months_ahead=PARTITION_MONTHS_AHEAD, now=None):
+    """Создать секции на months_ahead месяцев вперёд и удалить пустые прошлые
+    секции рабочей таблицы. Возвращает (созданные, удалённые)"""
+    current = partitioning.month_start(now or timezone.now())
+    created = []
+    for table in partitioned_tables():
+        created += partitioning.ensure_partitions(
+            table, current, partitioning.add_months(current, months_ahead)
+        )
+    dropped = partitioning.drop_empty_partitions_before(Notification._meta.db_table, current)
+    return created, dropped
@@ -0,0 +1,87 @@
+# apps/notifications/services/templates.py
+"""
+Отрисовка шаблонов уведомлений (NotificationTemplate).
+
+Шаблон компилируется один раз на процесс и хранится в кэше по ключу
+(id, updated_at): изменение шаблона в админке меняет updated_at, и при
+следующем обращении компилируется новая версия. Массовая отрисовка
+использует один общий контекст, в который для каждого получателя
+временно добавляются только его собственные переменные.
+"""
+import threading
+from collections import OrderedDict
+
+from django.template import Context, Engine
+
+from apps.notifications.models import NotificationTemplate
+
+CACHE_SIZE = 256
+
+# Уведомления — обычный текст, HTML-экранирование не нужно
+ENGINE = Engine(autoescape=False)
+
+_compiled = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_template(name):
+    """Активный шаблон по имени или None"""
+    return NotificationTemplate.objects.filter(name=name, is_active=True).first()
+
+
+def get_templates(names):
+    """Активные шаблоны по именам одним запросом: {name: template}"""
+    return {
+        template.name: template
+        for template in NotificationTemplate.objects.filter(name__in=set(names), is_active=True)
+    }
+
+
+def compile_template(template):
+    """Скомпилированные (subject, body) шаблона из кэша процесса"""
+    key = (template.id, template.updated_at)
+    with _lock:
+        compiled = _compiled.get(key)
+        if compiled is not None:
+            _compiled.move_to_end(key)
+            return compiled
+
+    compiled = (
+        ENGINE.from_string(template.subject_template) if template.subject_template else None,
+        ENGINE.from_string(template.body_template),
+    )
+    with _lock:
+        # Старые версии этого шаблона больше не понадобятся
+        for stale in [cached for cached in _compiled if cached[0] == template.id and cached != key]:
+            del _compiled[stale]
+        _compiled[key] = compiled
+        while len(_compiled) > CACHE_SIZE:
+            _compiled.popitem(last=False)
+    return compiled
+
+
+def clear_cache():
+    with _lock:
+        _compiled.clear()
+
+
+def render(template, context):
+    """Вернуть (subject, body), отрисованные с контекстом context"""
+    return render_batch(template, [{}], shared_context=context)[0]
+
+
+def render_batch(template, recipients, shared_context=None):
+    """Отрисовать шаблон для списка получателей.
+
+    recipients — список словарей с переменными конкретного получателя
+    (например {'user': user}); shared_context — общие для всех переменные.
+    Возвращает список (subject, body) в том же порядке.
+    """
+    subject_template, body_template = compile_template(template)
+    context = Context(shared_context or {}, autoescape=False)
+    results = []
+    for variables in recipients:
+        with context.push(variables):
+            subject = subject_template.render(context) if subject_template else ''
+            results.append((subject, body_template.render(context)))
+    return results
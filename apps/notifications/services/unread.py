@@ -0,0 +1,126 @@
+# apps/notifications/services/unread.py
+"""
+Кэшированные счётчики непрочитанных уведомлений.
+
+Счётчик пользователя хранится в кэше NOTIFICATION_COUNTER_CACHE (память
+процесса или Redis — задаётся в CACHES). Создание уведомлений увеличивает
+счётчик, прочтение — уменьшает; если ключа нет (истёк, сброшен), он
+пересчитывается одним COUNT по индексу (recipient, is_read, created_at).
+Инкремент не создаёт отсутствующий ключ, поэтому счётчик не может
+«начаться» с неполного значения.
+
+Уведомления создаёт отдельный процесс (process_notification_outbox), поэтому
+счётчики кэшируются только в кэше, общем для процессов. Если
+NOTIFICATION_COUNTER_CACHE — память процесса (LocMemCache без REDIS_URL),
+кэш не используется и каждое чтение — COUNT по индексу.
+"""
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count
+
+from apps.core.utils import cache as cache_utils
+from apps.notifications.models import Notification
+
+COUNTER_TIMEOUT = 60 * 60
+
+
+def _alias():
+    return getattr(settings, 'NOTIFICATION_COUNTER_CACHE', 'default')
+
+
+def _cache():
+    return caches[_alias()]
+
+
+def enabled():
+    """Кэшируются ли счётчики: только в кэше, общем для процессов"""
+    return cache_utils.is_shared(_alias())
+
+
+def _count(user_id):
+    return Notification.objects.filter(recipient_id=user_id, is_read=False).count()
+
+
+def _key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def recount(user_id):
+    """Пересчитать счётчик по БД и записать в кэш"""
+    count = _count(user_id)
+    if enabled():
+        _cache().set(_key(user_id), count, COUNTER_TIMEOUT)
+    return count
+
+
+def get_count(user_id):
+    """Количество непрочитанных уведомлений пользователя"""
+    if not enabled():
+        return _count(user_id)
+    count = _cache().get(_key(user_id))
+    if count is None or count < 0:
+        return recount(user_id)
+    return count
+
+
+def get_counts(user_ids):
+    """Счётчики нескольких пользователей: {user_id: count}.
+
+    Закэшированные значения читаются одним get_many, отсутствующие
+    пересчитываются одним сгруппированным запросом.
+    """
+    user_ids = list(user_ids)
+    cache = _cache() if enabled() else None
+    cached = cache.get_many([_key(user_id) for user_id in user_ids]) if cache is not None else {}
+    counts = {}
+    missing = []
+    for user_id in user_ids:
+        count = cached.get(_key(user_id))
+        if count is None or count < 0:
+            missing.append(user_id)
+        else:
+            counts[user_id] = count
+    if missing:
+        recounted = dict.fromkeys(missing, 0)
+        recounted.update(
+            Notification.objects.filter(recipient_id__in=missing, is_read=False)
+            .values('recipient_id')
+            .annotate(count=Count('id'))
+            .order_by()
+            .values_list('recipient_id', 'count')
+        )
+        if cache is not None:
+            cache.set_many({_key(user_id): count for user_id, count in recounted.items()}, COUNTER_TIMEOUT)
+        counts.update(recounted)
+    return counts
+
+
+def _add(user_id, delta):
+    if not enabled():
+        return
+    cache = _cache()
+    try:
+        value = cache.incr(_key(user_id), delta)
+    except ValueError:
+        # Ключа нет — значение пересчитается при следующем чтении
+        return
+    if value < 0:
+        cache.delete(_key(user_id))
+
+
+def increment(recipient_ids):
+    """Учесть новые непрочитанные уведомления (id получателей, с повторами)"""
+    for user_id, count in Counter(recipient_ids).items():
+        _add(user_id, count)
+
+
+def decrement(user_id, count=1):
+    """Учесть прочтение count уведомлений пользователя"""
+    if count:
+        _add(user_id, -count)
+
+
+def reset(user_id):
+    _cache().delete(_key(user_id))
@@ -11,7 +11,7 @@ from apps.organizations.api.organization_role_serializers import (
     OrganizationRoleRequestReviewSerializer
 )
 from apps.users.models import UserRole
-from apps.notifications.models import Notification
+from apps.notifications.services import outbox
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -25,7 +25,7 @@ def create_organization_role_request(request):
         from apps.users.models import CustomUser
         admins = CustomUser.objects.filter(roles__role='admin_rb', roles__is_active=True).distinct()
         for admin in admins:
-            Notification.objects.create(
+            outbox.enqueue(
                 recipient=admin,
                 notification_type='org_role_request',
                 title='Новая заявка на роль организации',
@@ -96,7 +96,7 @@ def review_organization_role_request(request, request_id):
             )
             
             # Отправляем уведомление пользователю
-            Notification.objects.create(
+            outbox.enqueue(
                 recipient=role_request.user,
                 notification_type='org_role_approved',
                 title='Заявка на роль организации одобрена!',
@@ -106,7 +106,7 @@ def review_organization_role_request(request, request_id):
             role_request.rejection_reason = rejection_reason
             
             # Отправляем уведомление пользователю
-            Notification.objects.create(
+            outbox.enqueue(
                 recipient=role_request.user,
                 notification_type='org_role_rejected',
                 title='Заявка на роль организации отклонена',
@@ -3,7 +3,6 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework import status
-from django.db.models import Q
 from .serializers import (
     OrganizationCreateSerializer,
     OrganizationModerationSerializer,
@@ -11,6 +10,7 @@ from .serializers import (
     OrganizationDetailSerializer
 )
 from apps.organizations.models import Organization
+from apps.core.search.index import rank_queryset
 from apps.organizations.services.moderation import approve_organization
 from apps.coaches.models import ClubRequest, CoachProfile
 from apps.organizations.staff.coach_membership import CoachMembership
@@ -25,7 +25,7 @@ def list_organizations(request):
     city = request.query_params.get('city')
     sport = request.query_params.get('sport')
     search = request.query_params.get('search', '').strip()
-    sort_by = request.query_params.get('sort', 'name')  # name, city, created_at
+    sort_by = request.query_params.get('sort', 'relevance' if search else 'name')  # relevance, name, city, created_at
     order = request.query_params.get('order', 'asc')  # asc, desc
     
     if city:
@@ -38,11 +38,7 @@ def list_organizations(request):
         ).distinct()
     
     if search:
-        organizations = organizations.filter(
-            Q(name__icontains=search) |
-            Q(address__icontains=search) |
-            Q(description__icontains=search)
-        )
+        organizations = rank_queryset(organizations, 'organization', search)
     
     # Сортировка
     sort_field = sort_by
@@ -55,10 +51,12 @@ def list_organizations(request):
     else:
         sort_field = 'name'
     
-    if order == 'desc':
-        sort_field = f'-{sort_field}'
-    
-    organizations = organizations.order_by(sort_field)
+    if sort_by == 'relevance' and search:
+        organizations = organizations.order_by('-search_rank', 'name')
+    else:
+        if order == 'desc':
+            sort_field = f'-{sort_field}'
+        organizations = organizations.order_by(sort_field)
     
     # Пагинация
     page = int(request.query_params.get('page', 1))
@@ -1,7 +1,7 @@
 # apps/organizations/services/moderation.py
 from django.utils import timezone
 from apps.users.models import UserRole
-from apps.notifications.models import Notification
+from apps.notifications.services import outbox
 
 def approve_organization(organization, moderator_user):
     """Одобрить организацию и назначить роль director"""
@@ -31,7 +31,7 @@ def approve_organization(organization, moderator_user):
     Director.objects.get_or_create(user=user, defaults={'organization': organization})
 
     # Уведомление
-    Notification.objects.create(
+    outbox.enqueue(
         recipient=user,
         notification_type='org_approved',
         title='Ваша организация одобрена!',
@@ -6,6 +6,7 @@ from rest_framework import status
 from .serializers import ChildLinkRequestSerializer, ChildProfileSerializer
 from apps.parents.models import ParentChildLink
 from apps.attendance.models import AttendanceRecord
+from apps.attendance.services.statistics import aggregate_attendance, summarize
 from apps.events.models import EventRegistration
 
 @api_view(['POST'])
@@ -52,19 +53,15 @@ def get_child_profile(request, child_id):
         serializer = ChildProfileSerializer(child)
         data = serializer.data
         
-        # Добавляем статистику посещаемости
-        attendance_records = AttendanceRecord.objects.filter(
-            athlete=child
-        ).select_related('group', 'session')
-        
-        total_sessions = attendance_records.count()
-        attended_sessions = attendance_records.filter(attended=True).count()
-        attendance_rate = (attended_sessions / total_sessions * 100) if total_sessions > 0 else 0
+        # Добавляем статистику посещаемости (один агрегирующий запрос)
+        attendance = summarize(aggregate_attendance(
+            AttendanceRecord.objects.filter(athlete=child), 'athlete'
+        ).get(child.id, {}))
         
         data['attendance_stats'] = {
-            'total_sessions': total_sessions,
-            'attended_sessions': attended_sessions,
-            'attendance_rate': round(attendance_rate, 2)
+            'total_sessions': attendance['total'],
+            'attended_sessions': attendance['present'],
+            'attendance_rate': attendance['attendance_rate']
         }
         
         # Добавляем информацию о мероприятиях
@@ -3,6 +3,14 @@ ASGI config for config project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Поток уведомлений /api/notifications/stream/ (SSE) держит соединение открытым,
+поэтому в продакшене приложение запускается ASGI-сервером, например:
+
+    uvicorn config.asgi:application --workers 4
+
+Поток работает только с общим брокером событий (Redis, REDIS_URL). Под WSGI
+или без Redis он отвечает 204, и клиент переходит на опрос.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
 """
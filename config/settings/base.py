@@ -112,6 +112,69 @@ else:
         }
     }
 
+# Полнотекстовый поиск (apps/core/search): tsvector + GIN на PostgreSQL, FTS5 на SQLite
+SEARCH_BACKEND = os.getenv('SEARCH_BACKEND') or (
+    'apps.core.search.backends.postgres.PostgresSearchBackend'
+    if DB_ENGINE == 'postgresql'
+    else 'apps.core.search.backends.sqlite.SQLiteFTSBackend'
+)
+
+# Кэш: Redis при заданном REDIS_URL, иначе память процесса
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Алиас кэша для счётчиков непрочитанных уведомлений. Кэш должен быть общим для
+# процессов (Redis): с памятью процесса счётчики не кэшируются и читаются COUNT'ом
+NOTIFICATION_COUNTER_CACHE = os.getenv('NOTIFICATION_COUNTER_CACHE', 'default')
+
+# Сроки хранения прочитанных уведомлений в рабочей таблице, дней (по типам;
+# None — хранить бессрочно). Старые переносит в архив команда archive_notifications
+NOTIFICATION_RETENTION_DAYS = {
+    'default': 180,
+    'mass_notification': 30,
+}
+# Непрочитанные уходят в архив только после этого срока (None — никогда)
+NOTIFICATION_UNREAD_RETENTION_DAYS = 365
+# Срок хранения архива (None — бессрочно) и отправленных записей outbox
+NOTIFICATION_ARCHIVE_RETENTION_DAYS = None
+NOTIFICATION_OUTBOX_RETENTION_DAYS = 14
+
+# Аудит запросов: записи копятся в буфере процесса и сохраняются фоновым
+# потоком пачками (apps.audit.services.writer)
+AUDIT_REQUESTS = os.getenv('AUDIT_REQUESTS', 'True') == 'True'
+AUDIT_BUFFER_SIZE = 10000
+AUDIT_BATCH_SIZE = 500
+AUDIT_FLUSH_INTERVAL = 1.0
+# Срок хранения аудита в месяцах: старые помесячные таблицы удаляет prune_audit_logs
+AUDIT_RETENTION_MONTHS = int(os.getenv('AUDIT_RETENTION_MONTHS', '12'))
+# Адреса/сети обратных прокси (через запятую), чьему X-Forwarded-For доверяет аудит;
+# без них IP клиента — REMOTE_ADDR
+AUDIT_TRUSTED_PROXIES = [value.strip() for value in os.getenv('AUDIT_TRUSTED_PROXIES', '').split(',') if value.strip()]
+
+# Кэш отчётов аналитики (apps.city_committee.analytics): алиас и время жизни, секунд
+ANALYTICS_CACHE = os.getenv('ANALYTICS_CACHE', 'default')
+ANALYTICS_CACHE_TIMEOUT = 15 * 60
+
+# Индекс поиска ближайших клубов (apps.coaches.services.club_search): алиас кэша
+# для журнала изменений и максимальный возраст индекса процесса, секунд. Журнал
+# доходит до других процессов только через общий кэш (Redis); с кэшем в памяти
+# процесса индекс перестраивается через CLUB_SEARCH_LOCAL_INDEX_MAX_AGE
+CLUB_SEARCH_CACHE = os.getenv('CLUB_SEARCH_CACHE', 'default')
+CLUB_SEARCH_INDEX_MAX_AGE = 60 * 60
+CLUB_SEARCH_LOCAL_INDEX_MAX_AGE = 60
+
 # Авторизация
 AUTH_USER_MODEL = 'users.CustomUser'
 AUTHENTICATION_BACKENDS = [
@@ -179,6 +242,12 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # ... остальные настройки ...
 
 # Логирование (базовая конфигурация)
+# Файлы ротируются по размеру: django.log → django.log.1 … (читает admin_rb log_reader).
+# При нескольких процессах-воркерах надёжнее внешний logrotate и WatchedFileHandler
+DJANGO_LOG_FILE = BASE_DIR / 'logs' / 'django.log'
+LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', 10 * 1024 * 1024))
+LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', 5))
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -191,14 +260,20 @@ LOGGING = {
     'handlers': {
         'file': {
             'level': 'INFO',
-            'class': 'logging.FileHandler',
-            'filename': BASE_DIR / 'logs' / 'django.log',
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': DJANGO_LOG_FILE,
+            'maxBytes': LOG_MAX_BYTES,
+            'backupCount': LOG_BACKUP_COUNT,
+            'encoding': 'utf-8',
             'formatter': 'verbose',
         },
         'audit': {
             'level': 'INFO',
-            'class': 'logging.FileHandler',
+            'class': 'logging.handlers.RotatingFileHandler',
             'filename': BASE_DIR / 'logs' / 'audit.log',
+            'maxBytes': LOG_MAX_BYTES,
+            'backupCount': LOG_BACKUP_COUNT,
+            'encoding': 'utf-8',
             'formatter': 'verbose',
         },
     },